@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark reading of compressed feature files
+
+Compares streaming decompression (PLPParser reading a gzip/bzip2/xz file
+directly) with the usual workflow (decompress to a temporary file first,
+then read the temporary file). Each method runs in its own process so
+that its maximum resident set size can be reported.
+
+    $ python bench_compressed.py --size 100 --repeat 5
+    $ python bench_compressed.py /path/to/features.plp.gz
+"""
+
+import os
+import sys
+import time
+import gzip
+import shutil
+import struct
+import resource
+import tempfile
+import multiprocessing
+import numpy as np
+from argparse import ArgumentParser
+from pyannote.parser.plp import PLPParser
+from pyannote.parser.compressed import open_file, get_compression
+
+argparser = ArgumentParser(
+    description='Benchmark streaming decompression of feature files '
+                'against decompression to a temporary file.')
+argparser.add_argument('path', nargs='?', default=None,
+                       help='compressed PLP file. Defaults to a synthetic '
+                            'gzip compressed file.')
+argparser.add_argument('--size', type=int, default=100,
+                       help='decompressed size of synthetic file, in MB '
+                            '(default: 100).')
+argparser.add_argument('--repeat', type=int, default=5,
+                       help='number of runs per method (default: 5).')
+
+try:
+    args = argparser.parse_args()
+except Exception, e:
+    sys.exit(e)
+
+
+def generate(path, size, dimension=39):
+    """Generate synthetic gzip compressed PLP file (one record)"""
+    count = (size << 20) // (4 * dimension)
+    with gzip.open(path, 'wb') as f:
+        f.write(struct.pack('<iii', 1, dimension, count))
+        # smooth-ish features so that they are (somewhat) compressible
+        chunk = 1 << 16
+        for i in range(0, count, chunk):
+            n = min(chunk, count - i)
+            data = np.arange(i, i + n, dtype='<f4')[:, np.newaxis]
+            data = np.round(np.sin(data / 100.) * 10.) + \
+                np.arange(dimension, dtype='<f4')
+            f.write(data.astype('<f4').tostring())
+
+
+def streaming(path):
+    return PLPParser().read(path)
+
+
+def temporary(path):
+    fd, tmp = tempfile.mkstemp(suffix='.plp')
+    os.close(fd)
+    try:
+        with open_file(path) as src:
+            with open(tmp, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        return PLPParser().read(tmp)
+    finally:
+        os.remove(tmp)
+
+
+def run(method, path, queue):
+    start = time.time()
+    feature = method(path)
+    duration = time.time() - start
+    nbytes = feature.data.nbytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((duration, nbytes, rss))
+
+
+def benchmark(method, path, repeat):
+    results = []
+    for _ in range(repeat):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=run,
+                                          args=(method, path, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return results
+
+
+tmp = None
+path = args.path
+if path is None:
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, 'synthetic.plp.gz')
+    generate(path, args.size)
+
+try:
+
+    print '%s (%s, %.1fMB)' % (path, get_compression(path),
+                              os.path.getsize(path) / float(1 << 20))
+
+    for name, method in [('streaming', streaming),
+                         ('temporary file', temporary)]:
+        results = benchmark(method, path, args.repeat)
+        durations = [d for d, _, _ in results]
+        nbytes = results[0][1]
+        rss = max(r for _, _, r in results)
+        print '%-15s %6.3fs (best %.3fs) %7.1fMB/s  max RSS %dMB' % (
+            name, np.mean(durations), min(durations),
+            nbytes / min(durations) / (1 << 20), rss >> 10)
+
+finally:
+    if tmp is not None:
+        shutil.rmtree(tmp)
@@ -34,6 +34,8 @@ from pyannote.metric.detection import DetectionErrorRate
 from pyannote.metric.identification import IdentificationErrorRate, \
     IdentificationPrecision, \
     IdentificationRecall
+from pyannote.metric.parallel import evaluate
+from pyannote.metric.bootstrap import pairwise_significance
 
 from pyannote.parser.annotation import AnnotationParser
 from pyannote.parser.timeline import TimelineParser
@@ -46,8 +48,8 @@ from argparse import ArgumentParser
 
 def run(args):
 
-    # metrics is a dictionary of dictionary
-    # metrics[metricName][hypothesisNumber] = metricInstance
+    # metrics is a list of list
+    # metrics[hypothesisNumber] = [metricInstance, ...]
 
     # M is a DataFrame
     # - index: (hypothesis file, uri) pairs
@@ -56,13 +58,14 @@ def run(args):
     kwargs = {}
     # kwargs = {'unknown': args.anonymous}
 
-    metrics = {}
+    # instantiate one metric per hypothesis
+    metrics = [[Metric(**kwargs) for Metric in args.requested]
+               for _ in args.hypothesis]
+
     columns = []
     for Metric in args.requested:
         # get metric name
         metricName = Metric.metric_name()
-        # instantiate one metric per hypothesis
-        metrics[metricName] = {h: Metric(**kwargs) for h, (_, _) in enumerate(args.hypothesis)}
         # add metric name
         columns.append(metricName)
         columns.extend(['%s | %s' % (metricName, componentName)
@@ -84,8 +87,9 @@ def run(args):
     else:
         modality = None
 
-    # process each URI, one after the other
-    for u, uri in enumerate(uris):
+    # load reference and hypotheses for one URI
+    # (called by evaluation worker processes)
+    def load(uri):
 
         # read reference for current URI
         ref = args.groundtruth(uri=uri, modality=modality)
@@ -119,8 +123,10 @@ def run(args):
                 ref = ref.crop(overlap.gaps(focus=ref.coverage()),
                                mode='intersection')
 
+        hyps = []
+
         # process each hypothesis file, one after the other
-        for h, (path, hypothesis) in enumerate(args.hypothesis):
+        for path, hypothesis in args.hypothesis:
 
             # read hypothesis for current URI
             # hyp = hypothesis(uri=uri, modality=ref.modality)
@@ -137,11 +143,21 @@ def run(args):
                     hyp = hyp.crop(overlap.gaps(focus=hyp.coverage()),
                                    mode='intersection')
 
-            # compute
-            for metricName, metric in metrics.iteritems():
-                details = metric[h](ref, hyp, detailed=True)
-                # M[name][uri, path] = details[metric[h].name]
-                for componentName, value in details.iteritems():
+            hyps.append(hyp)
+
+        return ref, hyps
+
+    # process URIs in parallel (results come back in order)
+    results = evaluate(uris, load, metrics, n_jobs=args.jobs)
+
+    for u, (uri, details) in enumerate(results):
+
+        for h, (path, _) in enumerate(args.hypothesis):
+
+            for metric, detail in zip(metrics[h], details[h]):
+                metricName = metric.name
+                # M[name][uri, path] = details[metric.name]
+                for componentName, value in detail.iteritems():
                     if componentName == metricName:
                         M = M.set_value((path, uri), metricName, value)
                     else:
@@ -149,14 +165,14 @@ def run(args):
                                         '%s | %s' % (metricName, componentName),
                                         value)
 
-            pb.update(u*len(args.hypothesis)+h+1)
+        pb.update((u+1)*len(args.hypothesis))
 
     pb.finish()
 
     # compute global (ie. combined) metric value
-    for metricName, metric in metrics.iteritems():
-        for h, (path, _) in enumerate(args.hypothesis):
-            M = M.set_value((path, '/all'), metricName, abs(metric[h]))
+    for h, (path, _) in enumerate(args.hypothesis):
+        for metric in metrics[h]:
+            M = M.set_value((path, '/all'), metric.name, abs(metric))
 
     with args.dump() as f:
         M.to_csv(f, index_label=['hypothesis', 'uri'], header=True, index=True)
@@ -224,18 +240,25 @@ def view(args):
     # perform statistical significance tests on metric values
     # create a directed graph with one vertex per hypothesis file
     # directed edges mean source is significantly better than target
+    if args.test == 'permutation':
+        # all pairs at once
+        P = pairwise_significance(np.array([run for _, run in runs]))
+
     G = nx.DiGraph(name=metricName)
     for r, (path, run) in enumerate(runs):
         value = aggregated[path]
         G.add_node(path, **{metricName: value})
-        for (other_path, other_run) in runs[r+1:]:
+        for o, (other_path, other_run) in enumerate(runs[r+1:], start=r+1):
             other_value = aggregated[other_path]
-            _, p = scipy.stats.wilcoxon(run, other_run)
+            if args.test == 'permutation':
+                p = P[r, o]
+            else:
+                _, p = scipy.stats.wilcoxon(run, other_run)
             if p < 0.05:
                 if value < other_value:
-                    G.add_edge(path, other_path, wilcoxon=p)
+                    G.add_edge(path, other_path, **{args.test: p})
                 else:
-                    G.add_edge(other_path, path, wilcoxon=p)
+                    G.add_edge(other_path, path, **{args.test: p})
 
     nx.write_gpickle(G, '/tmp/significance.nxg')
 
@@ -295,6 +318,10 @@ runparser.add_argument('--no-overlap', action='store_true', help=description)
 description = 'print value of error rate components.'
 runparser.add_argument('--components', action='store_true', help=description)
 
+description = 'number of parallel jobs (default to 1). use -1 for all cores.'
+runparser.add_argument('--jobs', metavar='N', type=int, default=1,
+                       help=description)
+
 description = 'choose evaluated modality in case reference contains several.'
 runparser.add_argument('--modality', metavar='MODALITY', type=str,
                        default=pyannote.cli.SUPPRESS, help=description)
@@ -368,9 +395,15 @@ viewparser.add_argument('--aggregate', default='combine',
                         choices=('combine', 'average', 'median', 'geometric', 'harmonic'),
                         help=description)
 
-description = 'display output of Wilcoxon significance test'
+description = 'display output of significance test'
 viewparser.add_argument('--significance', action='store_true', help=description)
 
+description = ('select significance test (Wilcoxon signed-rank test or '
+               'paired approximate randomization test).')
+viewparser.add_argument('--test', default='wilcoxon',
+                        choices=('wilcoxon', 'permutation'),
+                        help=description)
+
 description = 'display only N best runs (default to 10)'
 viewparser.add_argument('--best', type=int, default=10, help=description)
 
@@ -22,7 +22,7 @@ import itertools
 import numpy as np
 from pyannote.base.annotation import Unknown
 from pyannote.stats.llr import LLRLinearRegression, LLRIsotonicRegression
-from pyannote.stats.llr import logsumexp
+from pyannote.stats.llr import llr2posterior
 
 
 class AuthenticationCalibration(object):
@@ -165,17 +165,16 @@ class AuthenticationCalibration(object):
 
         Parameters
         ----------
-        llr :
+        llr : numpy array
+            Log-likelihood ratios, overwritten by posterior probabilities.
+        priors : numpy array
+            Known target priors
+        unknown_prior : float
+            Unknown target prior
 
         """
-        denominator = (
-            unknown_prior +
-            np.exp(logsumexp(llr, b=priors, axis=1))
-        )
-
-        posteriors = ((priors * np.exp(llr)).T / denominator).T
-
-        return posteriors
+        return llr2posterior(llr, priors,
+                             unknown_prior=unknown_prior, out=llr)
 
     def apply(self, scores):
         """
@@ -188,9 +187,6 @@ class AuthenticationCalibration(object):
         assert scores.labels() == self.targets, "\n%s\n%s" % (
             scores.labels(), self.targets)
 
-        # get log-likelihood ratio from raw scores
-        llr = scores.apply(self.llr.toLogLikelihoodRatio)
-
         # reduce Unknown prior to 0. in case of close-set classification
         unknown_prior = self.priors.get(Unknown, 0.)
         if self.open_set is False:
@@ -215,6 +211,10 @@ class AuthenticationCalibration(object):
             if self.open_set is False:
                 priors = priors + self.priors.get(Unknown, 0.)/n_targets
 
-        # compute posterior from LLR directly on the internal numpy array
-        func = lambda x: self._llr2posterior(x, priors, unknown_prior)
-        return llr.apply(func)
+        # compute log-likelihood ratio from raw scores, then posteriors,
+        # directly on the internal numpy array (in one pass)
+        func = lambda x: self._llr2posterior(
+            np.ascontiguousarray(self.llr.toLogLikelihoodRatio(x),
+                                 dtype=np.float64),
+            priors, unknown_prior)
+        return scores.apply(func)
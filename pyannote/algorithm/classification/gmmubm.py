@@ -25,7 +25,7 @@ import numpy as np
 import sklearn
 
 from pyannote import Timeline, Annotation, Scores, Unknown
-from pyannote.stats.llr import logsumexp
+from pyannote.stats.llr import llr2posterior
 from pyannote.stats.lbg import LBG
 
 
@@ -377,8 +377,8 @@ class ClassificationGMMUBM(object):
                 _segmentation[s, '_'] = Unknown()
             segmentation = _segmentation
 
-        # create empty scores to hold all scores
-        scores = Scores(uri=segmentation.uri, modality=segmentation.modality)
+        # (segment, track, target, score) tuples
+        segments, tracks, targets, values = [], [], [], []
 
         # UBM log-likelihood
         ubm_ll = self.ubm.score(features.data)
@@ -405,17 +405,20 @@ class ClassificationGMMUBM(object):
 
                 i0, n = features.sliding_window.segmentToRange(segment)
                 # TODO: factorize mean() by h-stacking llr
-                scores[segment, track, target] = np.mean(llr[i0:i0+n])
+                segments.append(segment)
+                tracks.append(track)
+                targets.append(target)
+                values.append(np.mean(llr[i0:i0+n]))
 
-        return scores
+        # build all scores at once
+        return Scores.from_arrays(segments, tracks, targets, values,
+                                  uri=segmentation.uri,
+                                  modality=segmentation.modality)
 
     def _llr2posterior(self, llr, priors, unknown_prior):
-        denominator = (
-            unknown_prior +
-            np.exp(logsumexp(llr, b=priors, axis=1))
-        )
-        posteriors = ((priors * np.exp(llr)).T / denominator).T
-        return posteriors
+        # llr is a temporary array: compute posteriors in place
+        return llr2posterior(llr, priors,
+                             unknown_prior=unknown_prior, out=llr)
 
     def predict_proba(self, segmentation, features):
         """Compute posterior probabilities
@@ -20,6 +20,10 @@
 
 import numpy as np
 from munkres import Munkres
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
 from base import BaseMapper
 from pyannote.base.mapping import OneToOneMapping
 from pyannote.base.matrix import get_cooccurrence_matrix
@@ -38,6 +42,11 @@ class HungarianMapper(BaseMapper):
         This parameter controls how K is computed.
         Defaults to :class:`pyannote.base.matrix.get_cooccurrence_matrix`,
         i.e. total cooccurence duration
+    backend : {'scipy', 'munkres'}, optional
+        Assignment solver. Defaults to 'scipy' (i.e. vectorized
+        scipy.optimize.linear_sum_assignment, working directly on
+        rectangular matrices) when available, and to pure-Python 'munkres'
+        otherwise.
 
     Examples
     --------
@@ -78,9 +87,21 @@ class HungarianMapper(BaseMapper):
     pyannote.base.matrix.LabelMatrix
 
     """
-    def __init__(self, cost=None):
+    def __init__(self, cost=None, backend=None):
         super(HungarianMapper, self).__init__()
 
+        if backend is None:
+            backend = 'munkres' if linear_sum_assignment is None else 'scipy'
+
+        if backend == 'scipy' and linear_sum_assignment is None:
+            raise ValueError(
+                'scipy backend requires scipy.optimize.linear_sum_assignment.')
+
+        if backend not in ['scipy', 'munkres']:
+            raise ValueError('unknown backend "%s".' % backend)
+
+        self.backend = backend
+
         # Hungarian association solver / Munkres algorithm
         self.__munkres = Munkres()
 
@@ -100,18 +121,31 @@ class HungarianMapper(BaseMapper):
         rows = matrix.get_rows()
         cols = matrix.get_columns()
 
-        # Cost matrix
-        N = max(nCols, nRows)
-        C = np.zeros((N, N))
-        C[:nCols, :nRows] = (np.max(matrix.df.values) - matrix.df.values).T
+        if self.backend == 'scipy':
+
+            # Optimal one-to-one mapping
+            # (no need for a square matrix)
+            if nRows * nCols:
+                K = matrix.df.values
+                A, B = linear_sum_assignment(np.max(K) - K)
+                for a, b in zip(A, B):
+                    if K[a, b] > 0:
+                        M += ([rows[a]], [cols[b]])
+
+        else:
+
+            # Cost matrix
+            N = max(nCols, nRows)
+            C = np.zeros((N, N))
+            C[:nCols, :nRows] = (np.max(matrix.df.values) - matrix.df.values).T
 
-        # Optimal one-to-one mapping
-        mapping = self.__munkres.compute(C)
+            # Optimal one-to-one mapping
+            mapping = self.__munkres.compute(C)
 
-        for b, a in mapping:
-            if (b < nCols) and (a < nRows):
-                if matrix[rows[a], cols[b]] > 0:
-                    M += ([rows[a]], [cols[b]])
+            for b, a in mapping:
+                if (b < nCols) and (a < nRows):
+                    if matrix[rows[a], cols[b]] > 0:
+                        M += ([rows[a]], [cols[b]])
 
         # A --> NoMatch
         for alabel in set(rows)-M.left_set:
@@ -18,9 +18,7 @@
 #     You should have received a copy of the GNU General Public License
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
-import pickle
 import logging
-import datetime
 import itertools
 import numpy as np
 from pyannote import Segment
@@ -33,6 +31,7 @@ from pyannote.base.scores import Scores
 from pyannote.base.matrix import LabelMatrix
 from pyannote.algorithm.calibration.clustering import ClusteringCalibration
 from pyannote.algorithm.calibration.authentication import AuthenticationCalibration
+from pyannote.algorithm.util.model import save_model, load_model
 
 
 class PIGEdgeIOMixin:
@@ -47,18 +46,16 @@ class PIGEdgeIOMixin:
         Parameters
         ----------
         path : str
+            Path to model directory (see pyannote.algorithm.util.model)
         description : str, optional
             Optional description (e.g. of the training set)
         """
 
         data = {
             self.SELF: self,
-            self.CREATED: datetime.datetime.today(),
-            self.DESCRIPTION: description,
         }
 
-        with open(path, mode='w') as f:
-            pickle.dump(data, f)
+        save_model(path, data, description=description)
 
     @classmethod
     def load(cls, path):
@@ -67,10 +64,10 @@ class PIGEdgeIOMixin:
         Parameters
         ----------
         path : str
+            Path to model directory (or legacy pickled file)
         """
 
-        with open(path, mode='r') as f:
-            data = pickle.load(f)
+        data = load_model(path)
 
         # --- logging -----------------------------------------------------
         logging.info('Created: %s' % data[cls.CREATED].isoformat())
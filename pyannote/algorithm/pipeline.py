@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pickle
+import logging
+
+from joblib.hashing import NumpyHasher
+from joblib.memory import MemorizedFunc
+
+from pyannote import Segment, Timeline, Annotation, Unknown
+from pyannote.algorithm.speech import SpeechActivityDetection
+from pyannote.algorithm.diarization.bic import BICClustering
+
+
+class _Hasher(NumpyHasher):
+    """Hasher ignoring joblib caching wrappers (whose cache directory
+    is usually a random temporary directory)"""
+
+    def save(self, obj):
+        if isinstance(obj, MemorizedFunc):
+            obj = obj.func
+        NumpyHasher.save(self, obj)
+
+
+def _hash(obj):
+    return _Hasher(hash_name='md5').hash(obj)
+
+
+def _dump(result, path):
+    """Save Timeline or Annotation to file"""
+
+    if isinstance(result, Timeline):
+        data = (Timeline, result.uri, None,
+                [(s.start, s.end, None, None) for s in result])
+    else:
+        data = (Annotation, result.uri, result.modality,
+                [(s.start, s.end, t, l)
+                 for s, t, l in result.itertracks(label=True)])
+
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(path, mode='wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(path):
+    """Load Timeline or Annotation from file"""
+
+    with open(path, mode='rb') as f:
+        klass, uri, modality, tracks = pickle.load(f)
+
+    if klass is Timeline:
+        return Timeline(
+            segments=[Segment(start, end) for start, end, _, _ in tracks],
+            uri=uri)
+
+    # make sure unpickled Unknown labels do not collide
+    # with those created in this process
+    unknowns = {}
+
+    result = Annotation(uri=uri, modality=modality)
+    for start, end, track, label in tracks:
+        if isinstance(label, Unknown):
+            label = unknowns.setdefault(label.ID, Unknown())
+        result[Segment(start, end), track] = label
+
+    return result
+
+
+class DiarizationPipeline(object):
+    """Speech activity detection, speech turn segmentation, BIC clustering
+    and (optionally) speaker identification
+
+    Features are extracted only once per file and per feature extractor.
+    When `cache_dir` is provided, the output of each stage is stored on disk,
+    using the file and a hash of the parameters of this stage and of all
+    upstream stages as key: changing the parameters of one stage only
+    triggers the (re-)computation of this stage and of downstream stages.
+
+    Example
+    -------
+
+    >>> sad = SpeechActivityDetection.load('sad')
+    >>> seg = SpeechTurnSegmentation()
+    >>> pipeline = DiarizationPipeline(sad, seg, cache_dir='/tmp/cache')
+    >>> diarization = pipeline.apply(pathToWavFile)
+
+    Parameters
+    ----------
+    sad : SpeechActivityDetection
+    segmentation : SpeechTurnSegmentation
+    identification : SpeakerIdentification, optional
+        When provided, clusters are identified.
+    covariance_type : {'diag', 'full'}, optional
+        BIC clustering covariance type. Defaults to 'full'.
+    penalty_coef : float, optional
+        BIC clustering penalty coefficient. Defaults to 3.5.
+    feature : optional
+        Features used for BIC clustering.
+        Defaults to speech turn segmentation features.
+    cache_dir : str, optional
+        Path to directory where stage outputs are cached.
+        Defaults to no caching.
+    """
+
+    SAD = 'sad'
+    SEGMENTATION = 'segmentation'
+    CLUSTERING = 'clustering'
+    IDENTIFICATION = 'identification'
+
+    def __init__(
+        self, sad, segmentation, identification=None,
+        covariance_type='full', penalty_coef=3.5, feature=None,
+        cache_dir=None
+    ):
+
+        super(DiarizationPipeline, self).__init__()
+
+        self.sad = sad
+        self.segmentation = segmentation
+        self.identification = identification
+
+        self.covariance_type = covariance_type
+        self.penalty_coef = penalty_coef
+        if feature is None:
+            feature = segmentation.feature
+        self.feature = feature
+
+        self.cache_dir = cache_dir
+
+    def _get_stages(self):
+        """(name, parameters hash) of each stage, in order"""
+
+        stages = [
+            (self.SAD, _hash((self.sad.hmm, self.sad.feature))),
+            (self.SEGMENTATION, _hash((self.segmentation.segmentation,
+                                       self.segmentation.feature))),
+            (self.CLUSTERING, _hash((self.covariance_type,
+                                     self.penalty_coef,
+                                     self.feature))),
+        ]
+
+        if self.identification is not None:
+            stages.append(
+                (self.IDENTIFICATION, _hash((self.identification.gmm_ubm,
+                                             self.identification.feature))))
+
+        return stages
+
+    def _get_keys(self, wav):
+        """Cache key of each stage"""
+
+        # file
+        key = _hash((os.path.realpath(wav), os.path.getmtime(wav)))
+
+        keys = {}
+        for name, parameters in self._get_stages():
+            # hash of upstream parameters
+            key = _hash((key, parameters))
+            keys[name] = key
+
+        return keys
+
+    def _run(self, name, key, func, wav=None, uri=None):
+        """Run stage `name` (or load its cached output)
+
+        `uri` is not part of the cache key: it is set on loaded results.
+        """
+
+        if self.cache_dir is None:
+            return func()
+
+        path = os.path.join(self.cache_dir, name, key + '.pkl')
+
+        if os.path.isfile(path):
+            # --- logging -----------------------------------------------------
+            logging.debug('%s: using cached %s' % (wav, name))
+            # -----------------------------------------------------------------
+            result = _load(path)
+            result.uri = uri
+            return result
+
+        result = func()
+        _dump(result, path)
+        return result
+
+    def apply(self, wav, uri=None):
+        """Process .wav file
+
+        Parameters
+        ----------
+        wav : str
+            Path to processed .wav file.
+        uri : str, optional
+            Resource identifier.
+
+        Returns
+        -------
+        annotation : Annotation
+            Speaker diarization (or identification) result.
+        """
+
+        keys = self._get_keys(wav)
+
+        # features are extracted lazily, once per feature extractor
+        features = {}
+
+        def get_features(extractor):
+            key = _hash(extractor)
+            if key not in features:
+                features[key] = extractor.extract(wav)
+            return features[key]
+
+        def run(name, func):
+            return self._run(name, keys[name], func, wav=wav, uri=uri)
+
+        # speech activity detection
+        def sad():
+            detection = self.sad.apply(
+                features=get_features(self.sad.feature))
+            speech = detection.label_timeline(SpeechActivityDetection.SPEECH)
+            speech.uri = uri
+            return speech
+
+        speech = run(self.SAD, sad)
+
+        # speech turn segmentation
+        def segmentation():
+            turns = self.segmentation.apply(
+                features=get_features(self.segmentation.feature),
+                speech=speech)
+            turns.uri = uri
+            return turns
+
+        turns = run(self.SEGMENTATION, segmentation)
+
+        # BIC clustering (one initial cluster per speech turn)
+        def clustering():
+            annotation = Annotation(uri=uri)
+            for segment in turns:
+                annotation[segment, '_'] = Unknown()
+            bic = BICClustering(
+                covariance_type=self.covariance_type,
+                penalty_coef=self.penalty_coef)
+            return bic(annotation, feature=get_features(self.feature))
+
+        clusters = run(self.CLUSTERING, clustering)
+
+        if self.identification is None:
+            return clusters
+
+        # speaker identification
+        def identification():
+            return self.identification.apply(
+                clusters,
+                features=get_features(self.identification.feature))
+
+        return run(self.IDENTIFICATION, identification)
@@ -19,17 +19,111 @@
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import os
+import atexit
+import shutil
 import logging
+import tempfile
 import itertools
 
 import numpy as np
-from scipy.ndimage.filters import median_filter
 from sklearn.hmm import GMMHMM
+from joblib import Parallel, delayed
 
 from pyannote.stats.lbg import LBG
+from pyannote.stats.llr import logsumexp
+from pyannote.stats.viterbi import viterbi_decoding
 from pyannote import Segment, Annotation, Unknown
 
 
+def _fit_gmm(path, indices, n_components, covariance_type, sampling):
+    """Train one state GMM with LBG (meant to run in a worker process)
+
+    Parameters
+    ----------
+    path : str
+        Path to memory-mapped (.npy) features.
+    indices : numpy array
+        Indices of the training feature vectors.
+    """
+
+    lbg = LBG(
+        n_components=n_components,
+        covariance_type=covariance_type,
+        sampling=sampling,
+        n_iter=10,
+        disturb=0.05
+    )
+
+    data = np.load(path, mmap_mode='r')
+    return lbg.apply(np.take(data, indices, axis=0))
+
+
+def _get_statistics(hmm, path, start, end):
+    """Baum-Welch sufficient statistics for one sequence
+    (meant to run in a worker process)
+
+    Parameters
+    ----------
+    hmm : GMMHMM
+        Current HMM.
+    path : str
+        Path to memory-mapped (.npy) features.
+    start, end : int
+        Sequence is made of feature vectors start to end (excluded).
+
+    Returns
+    -------
+    logprob : float
+        Log-probability of the sequence.
+    stats : dict
+        Sufficient statistics.
+    """
+
+    obs = np.array(np.load(path, mmap_mode='r')[start:end])
+
+    stats = hmm._initialize_sufficient_statistics()
+
+    framelogprob = hmm._compute_log_likelihood(obs)
+    logprob, fwdlattice = hmm._do_forward_pass(framelogprob)
+    bwdlattice = hmm._do_backward_pass(framelogprob)
+    gamma = fwdlattice + bwdlattice
+    posteriors = np.exp(gamma.T - logsumexp(gamma, axis=1)).T
+
+    hmm._accumulate_sufficient_statistics(
+        stats, obs, framelogprob, posteriors,
+        fwdlattice, bwdlattice, hmm.params)
+
+    return logprob, stats
+
+
+def _get_emission(gmms, data, batch_size):
+    """Emission log-likelihoods of each state GMM
+
+    Parameters
+    ----------
+    gmms : list
+        One GMM per state.
+    data : (n_samples, n_features) array
+    batch_size : int
+        Process at most `batch_size` samples at once.
+
+    Returns
+    -------
+    emission : (n_samples, n_states) array
+    """
+
+    n_samples = data.shape[0]
+    emission = np.empty((n_samples, len(gmms)), dtype=np.float64)
+
+    for i in xrange(0, n_samples, batch_size):
+        batch = data[i:i+batch_size]
+        for s, gmm in enumerate(gmms):
+            emission[i:i+batch_size, s] = gmm.score(batch)
+
+    return emission
+
+
 class SegmentationHMM(object):
 
     """HMM-based segmentation with Viterbi decoding
@@ -45,17 +139,30 @@ class SegmentationHMM(object):
         `sampling` samples per component. A few hundreds samples per component
         should be a reasonable rule of thumb.
         The final estimation steps always use the whole sample set.
-    min_duration : float, optional
-        Filter out segments shorter than `min_duration` seconds
+    min_duration : float or dict, optional
+        Minimum duration of segments (in seconds), enforced during Viterbi
+        decoding. Use a {target: min_duration} dictionary to set a different
+        minimum duration for each state.
     n_jobs : int
         Number of parallel jobs for GMM estimation
-        (default is one core)
+        (default is one core). Use -1 for all cores.
+    parallel_baum_welch : bool, optional
+        When True, Baum-Welch statistics of each training file are
+        accumulated in `n_jobs` worker processes and reduced at the end of
+        each iteration. Defaults to False (i.e. use GMMHMM.fit).
+    batch_size : int, optional
+        Compute emission log-likelihoods by batches of `batch_size` samples.
+    cache : bool, optional
+        Whether to cache emission log-likelihoods (True) or not (False).
+        Defaults to False. Cached emissions are stored in a temporary
+        directory, emptied by `fit` and removed at exit.
 
     """
 
     def __init__(
         self, n_components=1, covariance_type='diag', sampling=0,
-        min_duration=None, n_jobs=1
+        min_duration=None, n_jobs=1, parallel_baum_welch=False,
+        batch_size=10000, cache=False
     ):
 
         super(SegmentationHMM, self).__init__()
@@ -63,9 +170,26 @@ class SegmentationHMM(object):
         self.covariance_type = covariance_type
         self.sampling = sampling
         self.n_jobs = n_jobs
+        self.parallel_baum_welch = parallel_baum_welch
         self.min_duration = min_duration
+        self.batch_size = batch_size
         self.gmm = {}
 
+        self._get_emission = _get_emission
+
+        if cache:
+
+            # initialize cache
+            from joblib import Memory
+            cache_dir = tempfile.mkdtemp()
+            memory = Memory(location=cache_dir, verbose=0)
+
+            # cache emission computation
+            self._get_emission = memory.cache(_get_emission)
+
+            # do not leave cached emissions behind
+            atexit.register(shutil.rmtree, cache_dir, True)
+
     def _get_targets(self, reference):
         """Get list of targets from training data
 
@@ -91,25 +215,102 @@ class SegmentationHMM(object):
 
         return sorted(targets)
 
-    def _get_gmm(self, reference, features, target):
+    def _get_indices(self, reference, features, offsets, target):
+        """Indices of `target` feature vectors in concatenated features"""
+
+        indices = []
+
+        for r, f, offset in itertools.izip(reference, features, offsets):
+
+            n = f.getNumber()
+
+            # use target regions only
+            for segment in r.label_coverage(target):
+                i0, i = f.sliding_window.segmentToRange(segment)
+                indices.append(offset + np.arange(
+                    min(n, max(0, i0)), min(n, max(0, i0+i))))
 
-        # gather target data
-        data = np.vstack([
-            f.crop(r.label_coverage(target))  # use target regions only
-            for r, f in itertools.izip(reference, features)
-        ])
+        if not indices:
+            return np.array([], dtype=int)
 
-        lbg = LBG(
-            n_components=self.n_components,
-            covariance_type=self.covariance_type,
-            sampling=self.sampling,
-            n_iter=10,
-            disturb=0.05
-        )
+        return np.hstack(indices)
 
-        gmm = lbg.apply(data)
+    def _dump(self, features):
+        """Concatenate features into a temporary memory-mapped .npy file
 
-        return gmm
+        Returns
+        -------
+        path : str
+            Path to temporary .npy file (to be removed by the caller)
+        offsets : list
+            Index of the first feature vector of each file.
+        """
+
+        lengths = [f.getNumber() for f in features]
+        offsets = list(np.cumsum([0] + lengths[:-1]))
+
+        shape = (sum(lengths), features[0].getDimension())
+        dtype = features[0].data.dtype
+
+        fd, path = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+        data = np.lib.format.open_memmap(
+            path, mode='w+', dtype=dtype, shape=shape)
+        for f, offset, length in itertools.izip(features, offsets, lengths):
+            data[offset:offset+length] = f.data
+        data.flush()
+        del data
+
+        return path, offsets
+
+    def _fit_hmm(self, path, offsets, lengths):
+        """Baum-Welch HMM training with one job per training file"""
+
+        hmm = self.hmm
+
+        # uniform initial state and transition probabilities
+        n_states = hmm.n_components
+        if 's' in hmm.init_params:
+            hmm.startprob_ = np.tile(1. / n_states, n_states)
+        if 't' in hmm.init_params:
+            hmm.transmat_ = np.tile(1. / n_states, (n_states, n_states))
+
+        parallel = Parallel(n_jobs=self.n_jobs)
+
+        logprob = []
+
+        for i in range(hmm.n_iter):
+
+            # expectation step (one job per file)
+            results = parallel(
+                delayed(_get_statistics)(hmm, path, offset, offset+length)
+                for offset, length in itertools.izip(offsets, lengths))
+
+            # reduce sufficient statistics
+            stats = hmm._initialize_sufficient_statistics()
+            for _, _stats in results:
+                for key, value in _stats.iteritems():
+                    # GMMHMM per-state statistics (e.g. 'means') are lists
+                    # of arrays: sum them element-wise, do not concatenate
+                    if isinstance(value, list):
+                        stats[key] = [a + b for a, b in itertools.izip(
+                            stats[key], value)]
+                    else:
+                        stats[key] = stats[key] + value
+            logprob.append(np.sum([lpr for lpr, _ in results]))
+
+            # --- logging -----------------------------------------------------
+            logging.debug("HMM iter %d logprob = %f" % (i+1, logprob[-1]))
+            # -----------------------------------------------------------------
+
+            # check for convergence
+            if i > 0 and abs(logprob[-1] - logprob[-2]) < hmm.thresh:
+                break
+
+            # maximization step
+            hmm._do_mstep(stats, hmm.params)
+
+        return hmm
 
     def fit(self, reference, features):
         """Train HMM segmentation
@@ -124,6 +325,10 @@ class SegmentationHMM(object):
             Generates features synchronized with `reference`
         """
 
+        # emissions cached by previously trained models are now useless
+        if hasattr(self._get_emission, 'clear'):
+            self._get_emission.clear(warn=False)
+
         # gather training data
         reference = list(reference)
         features = list(features)
@@ -131,43 +336,99 @@ class SegmentationHMM(object):
         # gather target list
         self.targets = self._get_targets(reference)
 
-        # train each state
-        for target in self.targets:
-            logging.info('training {%s} GMM' % str(target))
-            self.gmm[target] = self._get_gmm(reference, features, target)
-
-        # train HMM
-        logging.info('training %d-states HMM' % len(self.targets))
-        self.hmm = GMMHMM(
-            n_components=len(self.targets),
-            gmms=[self.gmm[target] for target in self.targets],
-            init_params='st', params='st'
-        )
-        self.hmm.fit([f.data for f in features])
+        # concatenate all features, once and for all, into a memory-mapped
+        # file shared by all worker processes
+        path, offsets = self._dump(features)
+
+        try:
+
+            # train each state (one job per state)
+            logging.info('training %d GMMs' % len(self.targets))
+            gmms = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_gmm)(
+                    path,
+                    self._get_indices(reference, features, offsets, target),
+                    self.n_components, self.covariance_type, self.sampling)
+                for target in self.targets)
+            self.gmm = dict(itertools.izip(self.targets, gmms))
+
+            # train HMM
+            logging.info('training %d-states HMM' % len(self.targets))
+            self.hmm = GMMHMM(
+                n_components=len(self.targets),
+                gmms=[self.gmm[target] for target in self.targets],
+                init_params='st', params='st'
+            )
+
+            if self.parallel_baum_welch:
+                lengths = [f.getNumber() for f in features]
+                self._fit_hmm(path, offsets, lengths)
+            else:
+                self.hmm.fit([f.data for f in features])
+
+        finally:
+            os.remove(path)
 
         return self
 
-    def apply(self, features):
-        """
+    def get_emission(self, features):
+        """Compute emission log-likelihoods
+
         Parameters
         ----------
         features : SlidingWindowFeatures
+
+        Returns
+        -------
+        emission : (n_samples, n_states) array
+            Log-likelihood of each sample for each state (in the order of
+            `targets`).
         """
+        gmms = [self.gmm[target] for target in self.targets]
+        return self._get_emission(gmms, features.data, self.batch_size)
+
+    def _get_min_duration(self, features):
+        """Minimum duration of each state, in number of samples"""
+
+        if not self.min_duration:
+            return None
 
-        # predict state sequences
-        sequence = self.hmm.predict(features.data)
+        min_duration = self.min_duration
+        if not isinstance(min_duration, dict):
+            min_duration = {target: min_duration for target in self.targets}
+
+        n = []
+        for target in self.targets:
+            duration = min_duration.get(target, 0.)
+            if duration:
+                _, i = features.sliding_window.segmentToRange(
+                    Segment(0, duration))
+            else:
+                i = 1
+            n.append(i)
+
+        return np.array(n, dtype=int)
+
+    def apply(self, features, emission=None):
+        """
+        Parameters
+        ----------
+        features : SlidingWindowFeatures
+        emission : (n_samples, n_states) array, optional
+            Precomputed emission log-likelihoods (see `get_emission`).
+        """
 
-        # median filtering to get rid of short segments
-        if self.min_duration:
+        if emission is None:
+            emission = self.get_emission(features)
 
-            if len(self.targets) > 2:
-                raise NotImplementedError(
-                    'min_duration is not supported with more than 2 states.'
-                )
+        with np.errstate(divide='ignore'):
+            transition = np.log(self.hmm.transmat_)
+            initial = np.log(self.hmm.startprob_)
 
-            dummy = Segment(0, self.min_duration)
-            _, n = features.sliding_window.segmentToRange(dummy)
-            sequence = median_filter(sequence, size=2*n+1)
+        # Viterbi decoding with minimum duration constraints
+        sequence = viterbi_decoding(
+            emission, transition, initial=initial,
+            min_duration=self._get_min_duration(features))
 
         # start initial segment
         start = 0
@@ -189,7 +450,10 @@ class SegmentationHMM(object):
             label = self.targets[sequence[i+1]]
             start = end
 
-        segment = Segment(segment.end, features.getExtent().end)
+        if start == 0:
+            segment = features.getExtent()
+        else:
+            segment = Segment(segment.end, features.getExtent().end)
         segmentation[segment, '_'] = label
 
         return segmentation
@@ -20,9 +20,8 @@
 
 
 import sys
-import pickle
-import datetime
 import itertools
+from pyannote.algorithm.util.model import save_model, load_model
 from pyannote.algorithm.segmentation import SegmentationGaussianDivergence
 
 
@@ -169,6 +168,7 @@ class SpeechActivityDetection(object):
         Parameters
         ----------
         path : str
+            Path to model directory (see pyannote.algorithm.util.model)
         description : str, optional
             Optional description (e.g. of the training set)
 
@@ -177,12 +177,9 @@ class SpeechActivityDetection(object):
         data = {
             self.HMM: self.hmm,
             self.FEATURE: self.feature,
-            self.CREATED: datetime.datetime.today(),
-            self.DESCRIPTION: description,
         }
 
-        with open(path, mode='w') as f:
-            pickle.dump(data, f)
+        save_model(path, data, description=description)
 
     @classmethod
     def load(cls, path, cache=False):
@@ -191,13 +188,13 @@ class SpeechActivityDetection(object):
         Parameters
         ----------
         path : str
+            Path to model directory (or legacy pickled model file)
         cache : bool, optional
             Whether to cache feature extraction (True) or not (False).
             Defaults to False.
         """
 
-        with open(path, mode='r') as f:
-            data = pickle.load(f)
+        data = load_model(path)
 
         sys.stdout.write('Created: %s\n' % data[cls.CREATED].isoformat())
         if data[cls.DESCRIPTION]:
@@ -321,6 +318,7 @@ class SpeechTurnSegmentation(object):
         Parameters
         ----------
         path : str
+            Path to model directory (see pyannote.algorithm.util.model)
         description : str, optional
             Optional description (e.g. of the training set)
 
@@ -329,12 +327,9 @@ class SpeechTurnSegmentation(object):
         data = {
             self.SEGMENTATION: self.segmentation,
             self.FEATURE: self.feature,
-            self.CREATED: datetime.datetime.today(),
-            self.DESCRIPTION: description,
         }
 
-        with open(path, mode='w') as f:
-            pickle.dump(data, f)
+        save_model(path, data, description=description)
 
     @classmethod
     def load(cls, path, cache=False):
@@ -343,13 +338,13 @@ class SpeechTurnSegmentation(object):
         Parameters
         ----------
         path : str
+            Path to model directory (or legacy pickled model file)
         cache : bool, optional
             Whether to cache feature extraction (True) or not (False).
             Defaults to False.
         """
 
-        with open(path, mode='r') as f:
-            data = pickle.load(f)
+        data = load_model(path)
 
         sys.stdout.write('Created: %s\n' % data[cls.CREATED].isoformat())
         if data[cls.DESCRIPTION]:
@@ -510,6 +505,7 @@ class SpeakerIdentification(object):
         Parameters
         ----------
         path : str
+            Path to model directory (see pyannote.algorithm.util.model)
         description : str, optional
             Optional description (e.g. of the training set)
 
@@ -518,12 +514,9 @@ class SpeakerIdentification(object):
         data = {
             self.GMMUBM: self.gmm_ubm,
             self.FEATURE: self.feature,
-            self.CREATED: datetime.datetime.today(),
-            self.DESCRIPTION: description,
         }
 
-        with open(path, mode='w') as f:
-            pickle.dump(data, f)
+        save_model(path, data, description=description)
 
     @classmethod
     def load(cls, path, cache=False):
@@ -532,13 +525,13 @@ class SpeakerIdentification(object):
         Parameters
         ----------
         path : str
+            Path to model directory (or legacy pickled model file)
         cache : bool, optional
             Whether to cache feature extraction (True) or not (False).
             Defaults to False.
         """
 
-        with open(path, mode='r') as f:
-            data = pickle.load(f)
+        data = load_model(path)
 
         sys.stdout.write('Created: %s\n' % data[cls.CREATED].isoformat())
         if data[cls.DESCRIPTION]:
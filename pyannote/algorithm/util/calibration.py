@@ -254,10 +254,14 @@ class IDScoreCalibration(object):
             Scores converted to probabilities
 
         """
-        probs = Scores(uri=scores.uri, modality=scores.modality)
+        segments, tracks, targets, values = [], [], [], []
         for s, t in scores.itertracks():
             prob = self._s2p(scores.get_track_scores(s,t))
             for target, p in prob.iteritems():
-                probs[s,t,target] = p
-        return probs
+                segments.append(s)
+                tracks.append(t)
+                targets.append(target)
+                values.append(p)
+        return Scores.from_arrays(segments, tracks, targets, values,
+                                  uri=scores.uri, modality=scores.modality)
 
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Versioned model file format
+
+A model is saved as a directory containing
+
+  - `manifest.json`: format version, creation date, description and the
+    list of parameter arrays (name, dtype and shape),
+  - `arrays/*.npy`: one .npy member per parameter array (GMM means,
+    covariances and weights, HMM transition matrices, etc.),
+  - `model.pkl`: everything else (i.e. the model structure), where each
+    parameter array is replaced by a reference to its .npy member.
+
+Parameter arrays are loaded with `mmap_mode='r'`: they are only paged in when
+actually needed and are shared by all processes loading the same model.
+Loaded models are also cached in-process (keyed by path and modification
+time), so that loading the same model twice is almost free: only the model
+structure is copied (parameter arrays are shared).
+"""
+
+import os
+import copy
+import json
+import pickle
+import datetime
+import numpy as np
+
+VERSION = 1
+
+MANIFEST = 'manifest.json'
+STRUCTURE = 'model.pkl'
+ARRAYS = 'arrays'
+
+CREATED = 'created'
+DESCRIPTION = 'description'
+
+# {path: (mtime, data, arrays)}
+_cache = {}
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler storing numeric arrays as separate .npy members"""
+
+    def __init__(self, f, directory):
+        pickle.Pickler.__init__(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.arrays = []
+        # keep a reference to already stored arrays so that their id
+        # cannot be reused during pickling
+        self._stored = {}
+
+    def persistent_id(self, obj):
+
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject:
+            return None
+
+        if id(obj) in self._stored:
+            return self._stored[id(obj)][1]
+
+        name = '%04d.npy' % len(self.arrays)
+        np.save(os.path.join(self.directory, ARRAYS, name), np.asarray(obj))
+        self.arrays.append({
+            'name': name,
+            'dtype': obj.dtype.str,
+            'shape': list(obj.shape)
+        })
+        self._stored[id(obj)] = (obj, name)
+
+        return name
+
+
+def save_model(path, data, description=''):
+    """Save model to directory
+
+    Parameters
+    ----------
+    path : str
+        Path to (created if needed) model directory.
+    data : dict
+        Model components.
+    description : str, optional
+        Optional description (e.g. of the training set)
+    """
+
+    directory = os.path.join(path, ARRAYS)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(os.path.join(path, STRUCTURE), mode='wb') as f:
+        pickler = _Pickler(f, path)
+        pickler.dump(data)
+
+    manifest = {
+        'version': VERSION,
+        CREATED: datetime.datetime.today().isoformat(),
+        DESCRIPTION: description,
+        ARRAYS: pickler.arrays,
+    }
+
+    # manifest is written last: its modification time
+    # is used to invalidate the in-process cache
+    with open(os.path.join(path, MANIFEST), mode='w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _load(path):
+
+    with open(os.path.join(path, MANIFEST), mode='r') as f:
+        manifest = json.load(f)
+
+    if manifest['version'] > VERSION:
+        raise IOError(
+            '%s: unsupported model format version (%d).' % (
+                path, manifest['version']))
+
+    arrays = {}
+    for array in manifest[ARRAYS]:
+        name = array['name']
+        arrays[name] = np.load(
+            os.path.join(path, ARRAYS, name), mmap_mode='r')
+
+    with open(os.path.join(path, STRUCTURE), mode='rb') as f:
+        unpickler = pickle.Unpickler(f)
+        unpickler.persistent_load = arrays.__getitem__
+        data = unpickler.load()
+
+    created = manifest[CREATED]
+    data[CREATED] = datetime.datetime.strptime(
+        created, '%Y-%m-%dT%H:%M:%S.%f' if '.' in created
+        else '%Y-%m-%dT%H:%M:%S')
+    data[DESCRIPTION] = manifest[DESCRIPTION]
+
+    return data, arrays.values()
+
+
+def load_model(path):
+    """Load model from file
+
+    Parameters
+    ----------
+    path : str
+        Path to model directory (or to legacy pickled model file).
+
+    Returns
+    -------
+    data : dict
+        Model components, plus creation date (CREATED) and
+        description (DESCRIPTION).
+
+    Notes
+    -----
+    Models are cached in-process: loading the same (unmodified) model twice
+    does not read it again. Each call returns its own copy of the model
+    structure (which can therefore be modified, e.g. re-fitted, without
+    affecting other callers) but parameter arrays are shared by all copies
+    and are read-only.
+    """
+
+    path = os.path.realpath(path)
+
+    # legacy format (pickled dictionary)
+    if os.path.isfile(path):
+        with open(path, mode='r') as f:
+            return pickle.load(f)
+
+    mtime = os.path.getmtime(os.path.join(path, MANIFEST))
+
+    cached = _cache.get(path, None)
+    if cached is None or cached[0] != mtime:
+        _cache[path] = (mtime, ) + _load(path)
+
+    _, data, arrays = _cache[path]
+
+    # deep copy everything but (memory-mapped) parameter arrays
+    return copy.deepcopy(data, {id(array): array for array in arrays})
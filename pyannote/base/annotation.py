@@ -105,9 +105,44 @@ class Annotation(object):
         -------
 
         """
+        return cls.from_arrays(df[SEGMENT].tolist(), df[TRACK].tolist(),
+                               df[LABEL].tolist(), uri=uri, modality=modality)
+
+    @classmethod
+    def from_arrays(cls, segments, tracks, labels, uri=None, modality=None):
+        """Bulk annotation construction
+
+        Parameters
+        ----------
+        segments, tracks, labels : iterable
+            Segments, tracks and labels (one per annotated track).
+            In case of duplicate (segment, track) pairs, the last label wins.
+        uri : str, optional
+            Resource identifier
+        modality : str, optional
+            Modality
+
+        Returns
+        -------
+        annotation : Annotation
+        """
+
         annotation = cls(uri=uri, modality=modality)
-        for _, (segment, track, label) in df[[SEGMENT, TRACK, LABEL]].iterrows():
-            annotation[segment, track] = label
+
+        _tracks = {}
+        _labels = set()
+        for segment, track, label in itertools.izip(segments, tracks, labels):
+            _tracks.setdefault(segment, {})[track] = label
+            _labels.add(label)
+
+        # build sorted dictionary at once
+        # (instead of one insertion per track)
+        annotation._tracks = SortedDict(sorted(_tracks.iteritems()),
+                                        key_type=(float, float),
+                                        updator=TimelineUpdator)
+        annotation._labelNeedsUpdate = {label: True for label in _labels}
+        annotation._timelineNeedsUpdate = True
+
         return annotation
 
     def __init__(self, uri=None, modality=None):
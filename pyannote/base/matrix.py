@@ -297,6 +297,26 @@ class LabelMatrix(object):
 #         return copied
 
 def get_cooccurrence_matrix(R, C):
+    """Co-occurrence matrix
+
+    K[r, c] is the total duration where label r (in R) and
+    label c (in C) are both active.
+
+    Parameters
+    ----------
+    R, C : Annotation
+
+    Returns
+    -------
+    K : LabelMatrix
+        Co-occurrence matrix with R labels as rows and C labels as columns.
+
+    Notes
+    -----
+    Computed in one sweep over the sorted boundaries of both annotations,
+    accumulating the duration of each elementary segment into every pair of
+    labels active on this segment.
+    """
 
     rows = R.labels()
     cols = C.labels()
@@ -304,12 +324,37 @@ def get_cooccurrence_matrix(R, C):
     nCols = len(cols)
 
     K = np.zeros((nRows, nCols), dtype=np.float)
-    for r, row in enumerate(rows):
-        row_coverage = R.label_coverage(row)
-        for c, col in enumerate(cols):
-            col_coverage = C.label_coverage(col)
-            coverage = row_coverage.crop(col_coverage, mode='intersection')
-            K[r, c] = coverage.duration()
+
+    # (time, annotation, label index, +1 at track start or -1 at track end)
+    events = []
+    for a, (annotation, labels) in enumerate([(R, rows), (C, cols)]):
+        index = {label: i for i, label in enumerate(labels)}
+        for segment, _, label in annotation.itertracks(label=True):
+            i = index[label]
+            events.append((segment.start, a, i, 1))
+            events.append((segment.end, a, i, -1))
+    events.sort(key=lambda event: event[0])
+
+    # number of active tracks for each label
+    active = [{}, {}]
+    previous = None
+
+    for time, a, i, delta in events:
+
+        # elementary segment [previous, time]
+        if active[0] and active[1] and time > previous:
+            duration = time - previous
+            c = list(active[1])
+            for r in active[0]:
+                K[r, c] += duration
+
+        previous = time
+
+        n = active[a].get(i, 0) + delta
+        if n:
+            active[a][i] = n
+        else:
+            del active[a][i]
 
     return LabelMatrix(data=K, rows=rows, columns=cols)
 
@@ -18,15 +18,51 @@
 #     You should have received a copy of the GNU General Public License
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
+import itertools
 from segment import Segment
 from timeline import Timeline
 from annotation import Annotation, Unknown
 import numpy as np
 from pyannote.base import SEGMENT, TRACK, LABEL, SCORE
-from pandas import MultiIndex, DataFrame, pivot_table
+from pandas import MultiIndex, DataFrame, Series, factorize
 from pyannote.util import deprecated
 
 
+def _factorize(values, count):
+    """Encode values as indices in the sorted list of unique values
+
+    Parameters
+    ----------
+    values : iterable
+        Hashable values. One-dimensional numpy arrays are factorized by
+        pandas, any other iterable is factorized using a dictionary.
+    count : int
+        Number of values.
+
+    Returns
+    -------
+    codes : numpy array
+        Index of each value in `uniques`.
+    uniques : list
+        Sorted list of unique values.
+    """
+
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        codes, uniques = factorize(values)
+        uniques = list(uniques)
+    else:
+        first = {}
+        codes = np.fromiter((first.setdefault(v, len(first)) for v in values),
+                            dtype=np.int64, count=count)
+        uniques = sorted(first, key=first.get)
+
+    order = sorted(range(len(uniques)), key=uniques.__getitem__)
+    codes = np.argsort(order)[codes]
+    uniques = [uniques[i] for i in order]
+
+    return codes, uniques
+
+
 class AnnotationMixin(object):
 
     def get_timeline(self):
@@ -142,18 +178,29 @@ class AnnotationMixin(object):
                 # create new empty annotation
                 A = self.__class__(uri=self.uri, modality=self.modality)
 
+                rows, _ = self._get_positions()
+                index = []
+                keep = []
+
                 for cropped in intersection:
+                    existing_tracks = set([])
                     for original in mapping[cropped]:
                         for track in self.tracks(original):
                             # try to use original track name (candidate)
                             # if it already exists, create a brand new one
-                            new_track = A.new_track(cropped, candidate=track)
-                            # copy each value, column by column
-                            for label in self._df.columns:
-                                value = self._df.get_value((original, track),
-                                                           label)
-                                A._df = A._df.set_value((cropped, new_track),
-                                                        label, value)
+                            new_track = self._new_track(existing_tracks,
+                                                        candidate=track)
+                            existing_tracks.add(new_track)
+                            index.append((cropped, new_track))
+                            keep.append(rows[original, track])
+
+                # copy all values at once
+                if index:
+                    A._df = DataFrame(
+                        self._df.values[keep],
+                        index=MultiIndex.from_tuples(index,
+                                                     names=[SEGMENT, TRACK]),
+                        columns=self._df.columns)
 
                 return A
 
@@ -230,7 +277,9 @@ class AnnotationMixin(object):
         A = self.copy()
         reindex = MultiIndex.from_tuples([(s, n)
                                           for n, (s, _) in enumerate(A._df.index)])
-        A._df.index = reindex
+        df = A._df
+        df.index = reindex
+        A._df = df
         return A
 
     def new_track(self, segment, candidate=None, prefix=None):
@@ -252,6 +301,11 @@ class AnnotationMixin(object):
         # obtain list of existing tracks for segment
         existing_tracks = self.tracks(segment)
 
+        return self._new_track(existing_tracks, candidate=candidate,
+                               prefix=prefix)
+
+    def _new_track(self, existing_tracks, candidate=None, prefix=None):
+
         # if candidate is provided, check whether it already exists
         # in case it does not, use it
         if candidate is not None:
@@ -278,7 +332,7 @@ class AnnotationMixin(object):
     def __str__(self):
         """Human-friendly representation"""
         if self:
-            self._df.sort_index(inplace=True)
+            self._df = self._df.sort_index()
             return str(self._df)
         else:
             return ""
@@ -336,12 +390,61 @@ class Scores(AnnotationMixin, object):
         -------
 
         """
+        return cls.from_arrays(df[SEGMENT], df[TRACK], df[LABEL], df[SCORE],
+                               uri=uri, modality=modality, aggfunc=aggfunc)
+
+    @classmethod
+    def from_arrays(
+        cls, segments, tracks, labels, values,
+        uri=None, modality=None, aggfunc=np.mean
+    ):
+        """Bulk scores construction
+
+        Parameters
+        ----------
+        segments, tracks, labels, values : iterable
+            Segments, tracks, labels and values (one per score).
+        uri : str, optional
+            Resource identifier
+        modality : str, optional
+            Modality
+        aggfunc : func
+            Value aggregation function in case of duplicate (segment, track,
+            label) tuples
+
+        Returns
+        -------
+        scores : Scores
+        """
+
         A = cls(uri=uri, modality=modality)
-        A._df = pivot_table(
-            df, values=SCORE,
-            rows=[SEGMENT, TRACK], cols=LABEL,
-            aggfunc=aggfunc
-        )
+
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return A
+
+        # one row per (segment, track) pair, one column per label
+        # (both sorted, like pivot_table does)
+        row, rows = _factorize(itertools.izip(segments, tracks), len(values))
+        column, columns = _factorize(labels, len(values))
+
+        n_rows = len(rows)
+        n_columns = len(columns)
+        cells = row * n_columns + column
+
+        # aggregate values of duplicate cells
+        if len(np.unique(cells)) < len(cells):
+            aggregated = Series(values).groupby(cells).agg(aggfunc)
+            cells = aggregated.index.values
+            values = aggregated.values
+
+        data = np.empty((n_rows, n_columns), dtype=np.float64)
+        data.fill(np.nan)
+        data.flat[cells] = values
+
+        index = MultiIndex.from_tuples(rows, names=[SEGMENT, TRACK])
+        A._df = DataFrame(data, index=index, columns=columns)
+
         return A
 
     def __init__(self, uri=None, modality=None):
@@ -357,6 +460,33 @@ class Scores(AnnotationMixin, object):
         self.uri = uri
         self._timelineHasChanged = True
 
+    def _get_df(self):
+        return self.__df
+
+    def _set_df(self, df):
+        self.__df = df
+        self._positions = None
+
+    _df = property(_get_df, fset=_set_df, doc="""(segment, track) x label
+        data frame. As long as it only contains float values, pandas stores
+        them as one contiguous (tracks x labels) numpy array.""")
+
+    def _get_positions(self):
+        """Row and column positions
+
+        Returns
+        -------
+        rows : dict
+            {(segment, track): row position} dictionary
+        columns : dict
+            {label: column position} dictionary
+        """
+        if self._positions is None:
+            rows = {key: i for i, key in enumerate(self._df.index)}
+            columns = {label: j for j, label in enumerate(self._df.columns)}
+            self._positions = rows, columns
+        return self._positions
+
     # del scores[segment]
     # del scores[segment, :]
     # del scores[segment, track]
@@ -378,7 +508,8 @@ class Scores(AnnotationMixin, object):
     # value = scores[segment, track, label]
     def __getitem__(self, key):
         segment, track, label = key
-        return self._df.get_value((segment, track), label)
+        rows, columns = self._get_positions()
+        return self._df.values[rows[segment, track], columns[label]]
 
     def get_track_scores(self, segment, track):
         """Get all scores for a given track.
@@ -394,7 +525,9 @@ class Scores(AnnotationMixin, object):
         scores : dict
             {label: score} dictionary
         """
-        return {l: self._df.get_value((segment, track), l) for l in self._df}
+        rows, _ = self._get_positions()
+        values = self._df.values[rows[segment, track]]
+        return dict(itertools.izip(self._df.columns, values))
 
     # scores[segment, track, label] = value
     def __setitem__(self, key, value):
@@ -432,17 +565,17 @@ class Scores(AnnotationMixin, object):
         # make sure segment/track pairs are sorted
         self._df = self._df.sort_index()
 
-        # yield one (segment, track, label) tuple per loop
-        labels = self._df.columns
-        for (segment, track), columns in self._df.iterrows():
-            for label in labels:
-                value = columns[label]
-                if np.isnan(value):
-                    continue
-                else:
-                    yield segment, track, label, value
+        # yield one (segment, track, label) tuple per non-NaN value
+        index = list(self._df.index)
+        labels = list(self._df.columns)
+        data = self._df.values
+        rows, columns = np.nonzero(~np.isnan(data))
+        for r, c in itertools.izip(rows, columns):
+            segment, track = index[r]
+            yield segment, track, labels[c], data[r, c]
 
     def _rank(self, invert):
+        """(tracks x labels) rank array, computed in one pass"""
 
         if invert:
             direction = 1.
@@ -450,26 +583,26 @@ class Scores(AnnotationMixin, object):
         else:
             direction = -1.
 
-        def nan_rank(data):
+        data = self._df.values
 
-            # replace NaN by -inf or +inf depending on the requested direction
-            finite = np.isfinite(data)
-            fixed = np.where(finite, direction*data, -direction*np.inf)
+        # replace NaN by -inf or +inf depending on the requested direction
+        finite = np.isfinite(data)
+        fixed = np.where(finite, direction*data, -direction*np.inf)
 
-            # do the actual argsort
-            indices = np.argsort(fixed)
-            # get rank from argsort
-            rank = np.argsort(indices)
+        # do the actual argsort
+        indices = np.argsort(fixed, axis=1)
+        # get rank from argsort
+        rank = np.empty(data.shape, dtype=np.float64)
+        rank[np.arange(data.shape[0])[:, np.newaxis], indices] = \
+            np.arange(data.shape[1])
 
-            # special treatment for inverted NaN scores
-            # (we want ranks to start at 0 even in case of NaN)
-            if invert:
-                rank = np.where(finite, rank-(len(data)-np.sum(finite)), np.nan)
-            else:
-                rank = np.where(finite, rank, np.nan)
-            return rank
+        # special treatment for inverted NaN scores
+        # (we want ranks to start at 0 even in case of NaN)
+        if invert:
+            rank -= data.shape[1] - np.sum(finite, axis=1)[:, np.newaxis]
 
-        return self._df.apply(nan_rank, axis=1)
+        rank[~finite] = np.nan
+        return rank
 
     def rank(self, invert=False):
         """
@@ -486,7 +619,8 @@ class Scores(AnnotationMixin, object):
 
         """
         A = self.__class__(uri=self.uri, modality=self.modality)
-        A._df = self._rank(invert)
+        A._df = DataFrame(self._rank(invert), index=self._df.index,
+                          columns=self._df.columns)
         return A
 
     def nbest(self, n, invert=False):
@@ -506,12 +640,15 @@ class Scores(AnnotationMixin, object):
             New scores where only n-best are kept.
 
         """
-        df = self._df.copy()
-        nbest = self._rank(invert) < n
-        df[~nbest] = np.nan
+        # NaN ranks are never smaller than n
+        rank = self._rank(invert)
+        nbest = np.isfinite(rank)
+        nbest[nbest] = rank[nbest] < n
+        data = np.where(nbest, self._df.values, np.nan)
 
         A = self.__class__(uri=self.uri, modality=self.modality)
-        A._df = df
+        A._df = DataFrame(data, index=self._df.index,
+                          columns=self._df.columns)
 
         return A
 
@@ -541,8 +678,12 @@ class Scores(AnnotationMixin, object):
         else:
             labels = labels & set(self.labels())
 
+        # keep original label order
+        keep = np.array([label in labels for label in self._df.columns],
+                        dtype=bool)
+
         A = self.__class__(uri=self.uri, modality=self.modality)
-        A._df = self._df[list(labels)]
+        A._df = self._df.loc[:, keep]
 
         return A
 
@@ -566,32 +707,35 @@ class Scores(AnnotationMixin, object):
         if not self:
             return annotation
 
-        best = self.nbest(1, invert=False)
+        data = self._df.values
 
-        if posterior:
-
-            # compute unknown posterior
-            func = lambda p: 1. - np.nansum(p, axis=1)
-            Pu = self.apply(func, new_columns=['_'])
+        # tracks without any finite score are not annotated
+        finite = np.isfinite(data)
+        rows = np.nonzero(np.any(finite, axis=1))[0]
+        data = data[rows]
 
-            # threshold best target posterior
-            # with unknown posterior and threshold
-            for segment, track, label, value in best.itervalues():
+        # best target (and its score) for each track
+        best = np.argmax(np.where(finite[rows], data, -np.inf), axis=1)
+        value = data[np.arange(len(rows)), best]
 
-                if value < Pu[segment, track, '_'] or value < threshold:
-                    label = Unknown()
+        # threshold best target score with threshold
+        unknown = value < threshold
 
-                annotation[segment, track] = label
-
-        else:
-
-            # threshold best target score with threshold
-            for segment, track, label, value in best.itervalues():
-                if value < threshold:
-                    label = Unknown()
-                annotation[segment, track] = label
-
-        return annotation
+        if posterior:
+            # compute unknown posterior and
+            # threshold best target posterior with it
+            unknown |= value < 1. - np.nansum(data, axis=1)
+
+        index = list(self._df.index[rows])
+        labels = list(self._df.columns)
+        segments, tracks, _labels = [], [], []
+        for (segment, track), b, u in itertools.izip(index, best, unknown):
+            segments.append(segment)
+            tracks.append(track)
+            _labels.append(Unknown() if u else labels[b])
+
+        return Annotation.from_arrays(segments, tracks, _labels,
+                                      uri=self.uri, modality=self.modality)
 
     def map(self, func):
         """Apply function to all values"""
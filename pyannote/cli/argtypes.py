@@ -19,10 +19,15 @@
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
 import sys
+import atexit
 import os.path
 import pyannote.cli.uris
 from pyannote.parser.timeline import TimelineParser
 from pyannote.parser.annotation import AnnotationParser
+from pyannote.parser.base import BaseTextualAnnotationParser
+from pyannote.parser.indexed import IndexedAnnotationParser
+from pyannote.parser.compressed import get_compression
+from pyannote.base import URI
 from pyannote.parser.lst import LSTParser
 from pyannote.parser.matrix import LabelMatrixParser
 
@@ -131,6 +136,15 @@ class InputGetAnnotation(object):
         # there is one big file containing annotations for all resources
         else:
 
+            # index (uncompressed) textual files
+            # and only parse requested resources
+            Parser, _ = AnnotationParser.guess(path)
+            if Parser is not None and not get_compression(path):
+                parser = Parser(**(self.initArgs))
+                if isinstance(parser, BaseTextualAnnotationParser) and \
+                   URI in parser.get_fields():
+                    self.parser = IndexedAnnotationParser(parser)
+
             # read file
             self.parser.read(path)
 
@@ -281,10 +295,14 @@ class OutputWriteAnnotation(object):
             Parser, extension = AnnotationParser.guess(path)
             parser = Parser(**(self.initArgs))
 
+            # open file once and for all
+            # (it is flushed and closed at exit)
+            f = open(path, 'a')
+            atexit.register(f.close)
+
             def writeAnnotation(annotation):
 
-                # open file and append annotation at the end
-                with open(path, 'a') as f:
-                    parser.write(annotation, f=f)
+                # append annotation at the end of file
+                parser.write(annotation, f=f, flush=False)
 
         return writeAnnotation
@@ -127,8 +127,32 @@ class BaseMetric(object):
 
         """
         detail = self._get_details(reference, hypothesis, **kwargs)
-        self.__rates.append((reference.uri, self._get_rate(detail)))
-        return self.__compute(detail, accumulate=True, detailed=detailed)
+        return self.update(reference.uri, detail, detailed=detailed)
+
+    def update(self, uri, components, detailed=False):
+        """Accumulate precomputed components
+
+        Parameters
+        ----------
+        uri : str
+            Resource identifier
+        components : dict
+            Components, as returned by `_get_details` (e.g. computed in
+            another process).
+        detailed : bool, optional
+            By default (False), return metric value only.
+
+        Returns
+        -------
+        value : float (if `detailed` is False)
+            Metric value
+        components : dict (if `detailed` is True)
+            `components` updated with metric value
+        """
+        self.__rates.append((uri, self._get_rate(components)))
+        self.__components.append(
+            (uri, {name: components[name] for name in self.__values}))
+        return self.__compute(components, accumulate=True, detailed=detailed)
 
     def __str__(self):
         detail = self.__compute(self.__details,
@@ -214,6 +238,7 @@ class BaseMetric(object):
         """Reset accumulated components and metric values"""
         self.__details = self._init_details()
         self.__rates = []
+        self.__components = []
 
     def confidence_interval(self, alpha=0.9):
         """Compute confidence interval on accumulated metric values
@@ -239,6 +264,125 @@ class BaseMetric(object):
         m, _, _ = scipy.stats.bayes_mvs([r for _, r in self.__rates], alpha=alpha)
         return m
 
+    # --- merge and serialization ---------------------------------------------
+
+    def merge(self, other):
+        """Accumulate components of another metric (e.g. computed by
+        another process or on another machine)
+
+        Parameters
+        ----------
+        other : BaseMetric
+            Metric of the same type (and with the same parameters)
+
+        Returns
+        -------
+        self : BaseMetric
+        """
+
+        if other.name != self.name:
+            raise ValueError(
+                'cannot merge "%s" into "%s".' % (other.name, self.name))
+
+        for uri, components in list(other.__components):
+            self.update(uri, components)
+
+        return self
+
+    def to_dict(self):
+        """Serialize accumulated per-resource components
+
+        Returns
+        -------
+        data : dict
+            JSON-serializable dictionary
+        """
+        return {
+            'metric': self.name,
+            'uris': [uri for uri, _ in self.__components],
+            'components': [c for _, c in self.__components],
+        }
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        """Create metric from serialized per-resource components
+
+        Parameters
+        ----------
+        data : dict
+            As returned by `to_dict`
+        **kwargs :
+            Metric parameters (passed to constructor)
+        """
+
+        metric = cls(**kwargs)
+
+        if data['metric'] != metric.name:
+            raise ValueError(
+                'cannot load "%s" into "%s".' % (data['metric'], metric.name))
+
+        for uri, components in zip(data['uris'], data['components']):
+            metric.update(uri, components)
+
+        return metric
+
+    def dump(self, f):
+        """Dump accumulated per-resource components in binary (.npz) format
+
+        Parameters
+        ----------
+        f : file or str
+            File (or path) where to dump components.
+
+        Notes
+        -----
+        `None` URIs are dumped (hence loaded) as empty strings.
+        """
+        names = sorted(self.__values)
+        values = np.array(
+            [[c[name] for name in names] for _, c in self.__components],
+            dtype=np.float64).reshape((-1, len(names)))
+        uris = ['' if uri is None else uri for uri, _ in self.__components]
+        np.savez_compressed(
+            f, metric=np.array(self.name), names=np.array(names),
+            uris=np.array(uris, dtype=np.unicode_), values=values)
+
+    @classmethod
+    def load(cls, f, **kwargs):
+        """Load metric from binary dump
+
+        Parameters
+        ----------
+        f : file or str
+            File (or path) created by `dump`
+        **kwargs :
+            Metric parameters (passed to constructor)
+        """
+        npz = np.load(f)
+        names = list(npz['names'])
+        data = {
+            'metric': str(npz['metric']),
+            'uris': list(npz['uris']),
+            'components': [dict(zip(names, v)) for v in npz['values']],
+        }
+        return cls.from_dict(data, **kwargs)
+
+
+class _ResolutionMixin:
+
+    # frame duration (None for exact, segment-based evaluation)
+    resolution = None
+    # do not evaluate around reference boundaries (frame mode only)
+    collar = 0.
+
+    def _set_resolution(self, resolution=None, collar=0.):
+        if resolution is None and collar > 0.:
+            raise ValueError('collar is only supported in frame mode.')
+        if resolution is not None and resolution <= 0.:
+            raise ValueError('resolution must be strictly positive.')
+        self.resolution = resolution
+        self.collar = collar
+
 
 PRECISION_NAME = 'precision'
 PRECISION_RETRIEVED = '# retrieved'
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Bootstrap confidence intervals and paired significance tests
+
+All functions work on per-resource arrays and draw all replicates at once:
+
+    >>> values, rate = get_components(metric)
+    >>> value, (lower, upper) = confidence_interval(values, rate=rate)
+
+    >>> V = np.array([[r for _, r in metric] for metric in metrics])
+    >>> p = pairwise_significance(V)
+
+"""
+
+import itertools
+import numpy as np
+
+
+def get_components(metric):
+    """Per-resource components of an accumulated metric
+
+    Parameters
+    ----------
+    metric : BaseMetric
+
+    Returns
+    -------
+    components : (n_uris, n_components) array
+    rate : callable
+        Row-wise metric rate: rate(C) computes metric value for each row
+        of any (n, n_components) array of (summed) components, by calling
+        metric `_get_rate` once per row. Only the aggregation of components
+        across resources is vectorized (see `confidence_interval`).
+    """
+
+    data = metric.to_dict()
+    names = sorted(metric.metric_components())
+
+    components = np.array(
+        [[c[name] for name in names] for c in data['components']],
+        dtype=np.float64).reshape((-1, len(names)))
+
+    def rate(C):
+        return np.array([metric._get_rate(dict(zip(names, c))) for c in C])
+
+    return components, rate
+
+
+def resample(n_uris, n_samples=1000, random_state=None):
+    """Bootstrap replicates
+
+    Returns
+    -------
+    weights : (n_samples, n_uris) array
+        weights[s, u] is the number of times u-th resource is drawn in
+        s-th replicate.
+    """
+    if not isinstance(random_state, np.random.RandomState):
+        random_state = np.random.RandomState(random_state)
+    p = np.ones((n_uris, )) / n_uris
+    return random_state.multinomial(n_uris, p, size=n_samples)
+
+
+def confidence_interval(values, rate=None, alpha=0.9, n_samples=1000,
+                        random_state=None):
+    """Bootstrap (percentile) confidence interval
+
+    Parameters
+    ----------
+    values : (n_uris, ) or (n_uris, n_components) array
+        Per-resource metric values (aggregated by their average) or
+        per-resource metric components (aggregated with `rate`).
+    rate : callable, optional
+        Mandatory when `values` are components (see `get_components`).
+    alpha : float, optional
+        Probability that the returned confidence interval contains
+        the true metric value. Defaults to 0.9.
+    n_samples : int, optional
+        Number of bootstrap replicates. Defaults to 1000.
+    random_state : int or RandomState, optional
+
+    Returns
+    -------
+    (value, (lower, upper))
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    n_uris = values.shape[0]
+
+    W = resample(n_uris, n_samples=n_samples, random_state=random_state)
+
+    # all replicates at once
+    if rate is None:
+        value = np.mean(values)
+        replicates = np.dot(W, values) / n_uris
+    else:
+        value = rate(np.sum(values, axis=0)[np.newaxis, :])[0]
+        replicates = rate(np.dot(W, values))
+
+    lower, upper = np.percentile(
+        replicates, [50. * (1. - alpha), 50. * (1. + alpha)])
+
+    return value, (lower, upper)
+
+
+def pairwise_significance(values, rate=None, n_samples=1000,
+                          random_state=None):
+    """Paired approximate randomization test for all pairs of systems
+
+    For each pair of systems, per-resource values are randomly swapped
+    between the two systems and the p-value is the proportion of replicates
+    where the absolute difference of aggregated values is at least as high
+    as the observed one.
+
+    Parameters
+    ----------
+    values : (n_systems, n_uris) or (n_systems, n_uris, n_components) array
+        Per-resource metric values (aggregated by their average) or
+        per-resource metric components (aggregated with `rate`).
+        Resources must be in the same order for all systems.
+    rate : callable, optional
+        Mandatory when `values` are components (see `get_components`).
+    n_samples : int, optional
+        Number of replicates. Defaults to 1000.
+    random_state : int or RandomState, optional
+
+    Returns
+    -------
+    p : (n_systems, n_systems) array
+        Two-sided p-values (with ones on the diagonal)
+    """
+
+    if not isinstance(random_state, np.random.RandomState):
+        random_state = np.random.RandomState(random_state)
+
+    values = np.asarray(values, dtype=np.float64)
+    n_systems, n_uris = values.shape[:2]
+
+    # swap[s, u] is True when u-th resource is swapped in s-th replicate
+    swap = random_state.randint(2, size=(n_samples, n_uris)).astype(bool)
+
+    p = np.ones((n_systems, n_systems))
+    pairs = list(itertools.combinations(range(n_systems), 2))
+
+    if rate is None:
+
+        # all pairs at once:
+        # swapping resources only changes the sign of their difference
+        i, j = np.array(pairs, dtype=int).reshape((-1, 2)).T
+        D = values[i] - values[j]
+        observed = np.abs(np.mean(D, axis=1))
+        replicates = np.abs(np.dot(1. - 2. * swap, D.T) / n_uris)
+        count = np.sum(replicates >= observed - 1e-12, axis=0)
+        p[i, j] = p[j, i] = (1. + count) / (1. + n_samples)
+
+        return p
+
+    totals = np.sum(values, axis=1)
+    for i, j in pairs:
+        observed = np.abs(rate(totals[[i]]) - rate(totals[[j]]))[0]
+        delta = np.dot(swap, values[j] - values[i])
+        replicates = np.abs(rate(totals[i] + delta) - rate(totals[j] - delta))
+        count = np.sum(replicates >= observed - 1e-12)
+        p[i, j] = p[j, i] = (1. + count) / (1. + n_samples)
+
+    return p
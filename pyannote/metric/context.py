@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Evaluation context
+
+An evaluation context memoizes intermediate results (common segmentation,
+tagged annotations, co-occurrence matrix, ...) so that they are computed only
+once when several metrics evaluate the same (reference, hypothesis) pair.
+
+    >>> context = EvaluationContext()
+    >>> for metric in [DiarizationErrorRate(), DiarizationPurity(), ...]:
+    ...     metric(reference, hypothesis, context=context)
+
+"""
+
+import numpy as np
+from pyannote.base.annotation import Unknown
+from pyannote.base.matrix import LabelMatrix, get_cooccurrence_matrix
+
+
+def _get_tracks(reference, hypothesis, unknown=True, anonymous=True):
+    """(start, end, label index) tracks of both annotations
+
+    Returns
+    -------
+    tracks : list
+        Reference and hypothesis lists of (start, end, label index) tuples
+    n_labels : int
+        Number of labels
+    """
+
+    columns = {}
+
+    def column(label):
+        if anonymous and isinstance(label, Unknown):
+            label = Unknown
+        return columns.setdefault(label, len(columns))
+
+    tracks = []
+    for annotation in [reference, hypothesis]:
+        tracks.append([
+            (segment.start, segment.end, column(label))
+            for segment, _, label in annotation.itertracks(label=True)
+            if unknown or not isinstance(label, Unknown)
+        ])
+
+    return tracks, len(columns)
+
+
+def get_count_matrices(reference, hypothesis, unknown=True, anonymous=True):
+    """Count labels on elementary segments
+
+    Parameters
+    ----------
+    reference, hypothesis : Annotation
+    unknown : bool, optional
+        When False, get rid of `Unknown` instances.
+    anonymous : bool, optional
+        When True, all `Unknown` instances are considered as the same label.
+
+    Returns
+    -------
+    duration : (n_segments, ) array
+        Duration of each elementary segment.
+    R, H : (n_segments, n_labels) array
+        Number of reference (resp. hypothesis) tracks with each label
+        on each elementary segment.
+    """
+
+    tracks, n_labels = _get_tracks(
+        reference, hypothesis, unknown=unknown, anonymous=anonymous)
+
+    # elementary segments boundaries
+    times = np.unique([t for _tracks in tracks
+                       for start, end, _ in _tracks for t in (start, end)])
+    duration = np.diff(times)
+
+    matrices = []
+    for _tracks in tracks:
+        # +1 at the start of a track, -1 at its end...
+        M = np.zeros((len(times), n_labels), dtype=int)
+        if _tracks:
+            start, end, j = zip(*_tracks)
+            np.add.at(M, (np.searchsorted(times, start), j), 1)
+            np.add.at(M, (np.searchsorted(times, end), j), -1)
+        # ... and a cumulative sum to get counts
+        matrices.append(np.cumsum(M, axis=0)[:-1])
+
+    return duration, matrices[0], matrices[1]
+
+
+def get_frame_matrices(reference, hypothesis, resolution=0.01, collar=0.,
+                       unknown=True, anonymous=True):
+    """Count labels on a regular grid of frames
+
+    Frame-based counterpart of `get_count_matrices`: a track covers a frame
+    when it covers its middle.
+
+    Parameters
+    ----------
+    reference, hypothesis : Annotation
+    resolution : float, optional
+        Frame duration, in seconds. Defaults to 10ms.
+    collar : float, optional
+        Frames closer than `collar` seconds to a reference track boundary
+        are not evaluated (i.e. their duration is set to zero).
+        Defaults to 0 (no collar).
+    unknown : bool, optional
+        When False, get rid of `Unknown` instances.
+    anonymous : bool, optional
+        When True, all `Unknown` instances are considered as the same label.
+
+    Returns
+    -------
+    duration : (n_frames, ) array
+        Evaluated duration of each frame (`resolution` or 0).
+    R, H : (n_frames, n_labels) array
+        Number of reference (resp. hypothesis) tracks with each label
+        on each frame.
+    """
+
+    tracks, n_labels = _get_tracks(
+        reference, hypothesis, unknown=unknown, anonymous=anonymous)
+
+    if not tracks[0] and not tracks[1]:
+        return (np.zeros((0, )),
+                np.zeros((0, n_labels), dtype=int),
+                np.zeros((0, n_labels), dtype=int))
+
+    frames = []
+    for _tracks in tracks:
+        if _tracks:
+            start, end, j = [np.array(t) for t in zip(*_tracks)]
+        else:
+            start = end = j = np.zeros((0, ), dtype=int)
+        frames.append((np.round(start / resolution).astype(int),
+                       np.round(end / resolution).astype(int), j))
+
+    first = min(np.min(i0) for i0, _, _ in frames if len(i0))
+    last = max(np.max(i1) for _, i1, _ in frames if len(i1))
+
+    matrices = []
+    for i0, i1, j in frames:
+        # +1 at the start of a track, -1 at its end...
+        M = np.zeros((last - first + 1, n_labels), dtype=int)
+        np.add.at(M, (i0 - first, j), 1)
+        np.add.at(M, (i1 - first, j), -1)
+        # ... and a cumulative sum to get counts
+        matrices.append(np.cumsum(M, axis=0)[:-1])
+
+    duration = np.tile(float(resolution), (last - first, ))
+
+    if collar > 0. and tracks[0]:
+        # reference boundaries
+        i0, i1, _ = frames[0]
+        boundaries = np.hstack([i0, i1]) - first
+        n = int(np.round(collar / resolution))
+        C = np.zeros((last - first + 1, ), dtype=int)
+        np.add.at(C, np.maximum(0, boundaries - n), 1)
+        np.add.at(C, np.minimum(last - first, boundaries + n), -1)
+        duration[np.cumsum(C)[:-1] > 0] = 0.
+
+    return duration, matrices[0], matrices[1]
+
+
+def get_label_durations(annotation):
+    """Duration of each label
+
+    Parameters
+    ----------
+    annotation : Annotation
+
+    Returns
+    -------
+    durations : (n_labels, ) array
+        Duration of each label coverage, in the order of
+        `annotation.labels()` (same as `annotation.label_duration`).
+    """
+
+    labels = annotation.labels()
+    index = {label: i for i, label in enumerate(labels)}
+
+    tracks = [(segment.start, segment.end, index[label])
+              for segment, _, label in annotation.itertracks(label=True)]
+
+    if not tracks:
+        return np.zeros((len(labels), ))
+
+    start, end, j = [np.array(t) for t in zip(*tracks)]
+
+    # sort tracks by label, then by start time
+    order = np.lexsort((start, j))
+    start, end, j = start[order], end[order], j[order]
+
+    # shift each label far away from the previous one so that
+    # a single running maximum of end times does not cross labels
+    offset = j * (np.max(end) - np.min(start) + 1.)
+    running = np.maximum.accumulate(end + offset) - offset
+    previous = np.hstack([[-np.inf], running[:-1]])
+    previous[np.hstack([[True], j[1:] != j[:-1]])] = -np.inf
+
+    # part of each track not already covered by previous tracks
+    covered = np.maximum(0., end - np.maximum(start, previous))
+
+    return np.bincount(j, weights=covered, minlength=len(labels))
+
+
+class EvaluationContext(object):
+    """Memoized intermediate results for the evaluation of annotations
+
+    Results are cached by name, parameters and identity of the annotations
+    they are computed from. The context keeps a reference to these
+    annotations: it should only live as long as the evaluation of one
+    (reference, hypothesis) pair.
+    """
+
+    def __init__(self):
+        super(EvaluationContext, self).__init__()
+        self._cache = {}
+
+    def get(self, name, func, *annotations, **kwargs):
+        """Memoized func(*annotations, **kwargs)
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the cached result
+        func : callable
+        *annotations :
+            Annotations (or timelines) `func` is computed from.
+        **kwargs :
+            Additional (hashable) parameters.
+        """
+
+        key = (name, ) + tuple(id(a) for a in annotations) + \
+            tuple(sorted(kwargs.iteritems()))
+
+        if key not in self._cache:
+            # keep a reference to annotations
+            # so that their id cannot be reused
+            self._cache[key] = (annotations,
+                                func(*annotations, **kwargs))
+
+        return self._cache[key][1]
+
+    def segmentation(self, A, B):
+        """Common (up-sampled) timeline"""
+
+        def func(A, B):
+            timeline = A.get_timeline().union(B.get_timeline())
+            return timeline.segmentation()
+
+        # common segmentation is symmetric
+        if id(A) > id(B):
+            A, B = B, A
+
+        return self.get('segmentation', func, A, B)
+
+    def tag(self, A, B):
+        """`A` aligned on common (up-sampled) timeline of `A` and `B`"""
+        return self.get('tag', lambda A, B: A >> self.segmentation(A, B), A, B)
+
+    def cooccurrence(self, A, B):
+        """Co-occurrence matrix with `A` (resp. `B`) labels as rows
+        (resp. columns)"""
+
+        key = ('cooccurrence', id(B), id(A))
+        if key in self._cache:
+            matrix = self._cache[key][1]
+            return LabelMatrix(data=matrix.df.values.T,
+                               rows=matrix.get_columns(),
+                               columns=matrix.get_rows())
+
+        return self.get('cooccurrence', get_cooccurrence_matrix, A, B)
+
+    def intersection(self, A, B):
+        """`A` and `B` cropped to the regions where both are active"""
+
+        def func(A, B):
+            A = A.crop(B.get_timeline(), mode='intersection')
+            B = B.crop(A.get_timeline(), mode='intersection')
+            return A, B
+
+        return self.get('intersection', func, A, B)
+
+    def count_matrices(self, A, B, unknown=True, anonymous=True,
+                       resolution=None, collar=0.):
+        """See `get_count_matrices` (or `get_frame_matrices` when
+        `resolution` is provided)"""
+
+        if resolution is None:
+            if collar > 0.:
+                raise ValueError('collar is only supported in frame mode.')
+            return self.get('count matrices', get_count_matrices, A, B,
+                            unknown=unknown, anonymous=anonymous)
+
+        return self.get('frame matrices', get_frame_matrices, A, B,
+                        unknown=unknown, anonymous=anonymous,
+                        resolution=resolution, collar=collar)
+
+    def label_durations(self, A):
+        """See `get_label_durations`"""
+        return self.get('label durations', get_label_durations, A)
@@ -18,7 +18,9 @@
 #     You should have received a copy of the GNU General Public License
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
-from base import BaseMetric
+import numpy as np
+from base import BaseMetric, _ResolutionMixin
+from context import EvaluationContext
 
 DER_TOTAL = 'total'
 DER_FALSE_ALARM = 'false alarm'
@@ -26,7 +28,19 @@ DER_MISS = 'miss'
 DER_NAME = 'detection error rate'
 
 
-class DetectionErrorRate(BaseMetric):
+class DetectionErrorRate(BaseMetric, _ResolutionMixin):
+    """Detection error rate
+
+    Parameters
+    ----------
+    resolution : float, optional
+        When provided, switch to (faster, approximate) frame-based
+        evaluation with frames of `resolution` seconds.
+        Defaults to exact segment-based evaluation.
+    collar : float, optional
+        In frame mode, do not evaluate frames closer than `collar` seconds
+        to any reference boundary. Defaults to 0.
+    """
 
     @classmethod
     def metric_name(cls):
@@ -36,42 +50,31 @@ class DetectionErrorRate(BaseMetric):
     def metric_components(cls):
         return [DER_FALSE_ALARM, DER_MISS, DER_TOTAL]
 
-    def _get_details(self, reference, hypothesis, **kwargs):
-
-        detail = self._init_details()
-
-        # common (up-sampled) timeline
-        common_timeline = reference.get_timeline().union(hypothesis.get_timeline())
-        common_timeline = common_timeline.segmentation()
-
-        # align reference on common timeline
-        R = reference >> common_timeline
+    def __init__(self, resolution=None, collar=0., **kwargs):
+        super(DetectionErrorRate, self).__init__()
+        self._set_resolution(resolution=resolution, collar=collar)
 
-        # translate and align hypothesis on common timeline
-        H = hypothesis >> common_timeline
+    def _get_details(self, reference, hypothesis, context=None, **kwargs):
 
-        # loop on all segments
-        for segment in common_timeline:
+        detail = self._init_details()
 
-            # segment duration
-            duration = segment.duration
+        if context is None:
+            context = EvaluationContext()
 
-            # set of IDs in reference segment
-            r = R.get_labels(segment)
-            Nr = len(r)
-            detail[DER_TOTAL] += duration * Nr
+        # number of distinct labels on each elementary segment
+        duration, R, H = context.count_matrices(
+            reference, hypothesis, unknown=True, anonymous=False,
+            resolution=self.resolution, collar=self.collar)
+        Nr = np.sum(R > 0, axis=1)
+        Nh = np.sum(H > 0, axis=1)
 
-            # set of IDs in hypothesis segment
-            h = H.get_labels(segment)
-            Nh = len(h)
+        detail[DER_TOTAL] = np.dot(duration, Nr)
 
-            # number of misses
-            N_miss = max(0, Nr - Nh)
-            detail[DER_MISS] += duration * N_miss
+        # number of misses
+        detail[DER_MISS] = np.dot(duration, np.maximum(0, Nr - Nh))
 
-            # number of false alarms
-            N_fa = max(0, Nh - Nr)
-            detail[DER_FALSE_ALARM] += duration * N_fa
+        # number of false alarms
+        detail[DER_FALSE_ALARM] = np.dot(duration, np.maximum(0, Nh - Nr))
 
         return detail
 
@@ -26,7 +26,8 @@ from pyannote.util import deprecated
 from munkres import Munkres
 import numpy as np
 
-from base import BaseMetric
+from base import BaseMetric, _ResolutionMixin
+from context import EvaluationContext
 
 IER_TOTAL = 'total'
 IER_CORRECT = 'correct'
@@ -128,7 +129,75 @@ class UnknownIDMatcher(IDMatcher):
             or id1 == id2
 
 
-class IdentificationErrorRate(BaseMetric):
+class _IDMatcherMixin(_ResolutionMixin):
+
+    def _get_matches(self, reference, hypothesis, context=None):
+        """Per-segment duration, reference, hypothesis and correct counts
+
+        Counts are obtained at once from label count matrices for
+        `IDMatcher` and `UnknownIDMatcher`. Other matchers (that can
+        implement any .oneToOneMatch()) go through the slower segment by
+        segment .manyToManyMatch() loop.
+
+        When `resolution` is set, counts are obtained on a regular grid of
+        frames instead (see `get_frame_matrices`).
+
+        Returns
+        -------
+        duration, n_reference, n_hypothesis, n_correct : array
+        """
+
+        if context is None:
+            context = EvaluationContext()
+
+        if type(self.matcher) in [IDMatcher, UnknownIDMatcher]:
+
+            anonymous = type(self.matcher) == UnknownIDMatcher
+            duration, R, H = context.count_matrices(
+                reference, hypothesis,
+                unknown=self.unknown, anonymous=anonymous,
+                resolution=self.resolution, collar=self.collar)
+
+            return (duration, np.sum(R, axis=1), np.sum(H, axis=1),
+                    np.sum(np.minimum(R, H), axis=1))
+
+        if self.resolution is not None:
+            raise ValueError(
+                'frame mode is only supported by IDMatcher '
+                'and UnknownIDMatcher.')
+
+        # common (up-sampled) timeline
+        common_timeline = context.segmentation(reference, hypothesis)
+
+        # align reference on common timeline
+        R = context.tag(reference, hypothesis)
+
+        # translate and align hypothesis on common timeline
+        H = context.tag(hypothesis, reference)
+
+        matches = []
+
+        # loop on all segments
+        for segment in common_timeline:
+
+            # list of IDs in reference segment
+            r = R.get_labels(segment, unknown=self.unknown, unique=False)
+
+            # list of IDs in hypothesis segment
+            h = H.get_labels(segment, unknown=self.unknown, unique=False)
+
+            counts, _ = self.matcher.manyToManyMatch(r, h)
+
+            matches.append((segment.duration, len(r), len(h),
+                            counts[IER_CORRECT]))
+
+        if not matches:
+            return tuple(np.zeros((0, )) for _ in range(4))
+
+        return tuple(np.array(m) for m in zip(*matches))
+
+
+class IdentificationErrorRate(BaseMetric, _IDMatcherMixin):
     """
 
 
@@ -152,6 +221,13 @@ class IdentificationErrorRate(BaseMetric):
     confusion, miss, false_alarm: float, optional
         Optional weights for confusion, miss and false alarm respectively.
         Default to 1. (no weight)
+    resolution : float, optional
+        When provided, switch to (faster, approximate) frame-based
+        evaluation with frames of `resolution` seconds.
+        Defaults to exact segment-based evaluation.
+    collar : float, optional
+        In frame mode, do not evaluate frames closer than `collar` seconds
+        to any reference boundary. Defaults to 0.
 
     """
 
@@ -168,6 +244,7 @@ class IdentificationErrorRate(BaseMetric):
         self,
         matcher=None, unknown=True,
         confusion=1., miss=1., false_alarm=1.,
+        resolution=None, collar=0.,
         **kwargs
     ):
 
@@ -178,44 +255,26 @@ class IdentificationErrorRate(BaseMetric):
         else:
             self.matcher = UnknownIDMatcher()
         self.unknown = unknown
+        self._set_resolution(resolution=resolution, collar=collar)
 
         self.confusion = confusion
         self.miss = miss
         self.false_alarm = false_alarm
 
-    def _get_details(self, reference, hypothesis, **kwargs):
+    def _get_details(self, reference, hypothesis, context=None, **kwargs):
 
         detail = self._init_details()
 
-        # common (up-sampled) timeline
-        common_timeline = reference.get_timeline().union(hypothesis.get_timeline())
-        common_timeline = common_timeline.segmentation()
-
-        # align reference on common timeline
-        R = reference >> common_timeline
-
-        # translate and align hypothesis on common timeline
-        H = hypothesis >> common_timeline
-
-        # loop on all segments
-        for segment in common_timeline:
-
-            # segment duration
-            duration = segment.duration
+        duration, n1, n2, correct = self._get_matches(
+            reference, hypothesis, context=context)
 
-            # list of IDs in reference segment
-            r = R.get_labels(segment, unknown=self.unknown, unique=False)
-
-            # list of IDs in hypothesis segment
-            h = H.get_labels(segment, unknown=self.unknown, unique=False)
-
-            counts, _ = self.matcher.manyToManyMatch(r, h)
-
-            detail[IER_TOTAL] += duration * counts[IER_TOTAL]
-            detail[IER_CORRECT] += duration * counts[IER_CORRECT]
-            detail[IER_CONFUSION] += duration * counts[IER_CONFUSION]
-            detail[IER_MISS] += duration * counts[IER_MISS]
-            detail[IER_FALSE_ALARM] += duration * counts[IER_FALSE_ALARM]
+        # optimal matching leaves max(n1, n2) - min(n1, n2) unmatched IDs
+        # and pairs min(n1, n2) reference and hypothesis IDs
+        detail[IER_TOTAL] = np.dot(duration, n1)
+        detail[IER_CORRECT] = np.dot(duration, correct)
+        detail[IER_CONFUSION] = np.dot(duration, np.minimum(n1, n2) - correct)
+        detail[IER_MISS] = np.dot(duration, np.maximum(0, n1 - n2))
+        detail[IER_FALSE_ALARM] = np.dot(duration, np.maximum(0, n2 - n1))
 
         return detail
 
@@ -246,7 +305,7 @@ class IdentificationErrorRate(BaseMetric):
         return string
 
 
-class IdentificationPrecision(Precision):
+class IdentificationPrecision(Precision, _IDMatcherMixin):
     """
     Identification Precision
 
@@ -267,41 +326,20 @@ class IdentificationPrecision(Precision):
             self.matcher = UnknownIDMatcher()
         self.unknown = unknown
 
-    def _get_details(self, reference, hypothesis, **kwargs):
+    def _get_details(self, reference, hypothesis, context=None, **kwargs):
 
         detail = self._init_details()
 
-        # common (up-sampled) timeline
-        common_timeline = reference.get_timeline().union(hypothesis.get_timeline())
-        common_timeline = common_timeline.segmentation()
-
-        # align reference on common timeline
-        R = reference >> common_timeline
-
-        # translate and align hypothesis on common timeline
-        H = hypothesis >> common_timeline
-
-        # loop on all segments
-        for segment in common_timeline:
-
-            # segment duration
-            duration = segment.duration
-
-            # list of IDs in reference segment
-            r = R.get_labels(segment, unknown=self.unknown, unique=False)
-
-            # list of IDs in hypothesis segment
-            h = H.get_labels(segment, unknown=self.unknown, unique=False)
-
-            counts, _ = self.matcher.manyToManyMatch(r, h)
+        duration, n1, n2, correct = self._get_matches(
+            reference, hypothesis, context=context)
 
-            detail[PRECISION_RETRIEVED] += duration * len(h)
-            detail[PRECISION_RELEVANT_RETRIEVED] += duration * counts[IER_CORRECT]
+        detail[PRECISION_RETRIEVED] = np.dot(duration, n2)
+        detail[PRECISION_RELEVANT_RETRIEVED] = np.dot(duration, correct)
 
         return detail
 
 
-class IdentificationRecall(Recall):
+class IdentificationRecall(Recall, _IDMatcherMixin):
     """
     Identification Recall
 
@@ -322,36 +360,15 @@ class IdentificationRecall(Recall):
             self.matcher = UnknownIDMatcher()
         self.unknown = unknown
 
-    def _get_details(self, reference, hypothesis, **kwargs):
+    def _get_details(self, reference, hypothesis, context=None, **kwargs):
 
         detail = self._init_details()
 
-        # common (up-sampled) timeline
-        common_timeline = reference.get_timeline().union(hypothesis.get_timeline())
-        common_timeline = common_timeline.segmentation()
-
-        # align reference on common timeline
-        R = reference >> common_timeline
-
-        # translate and align hypothesis on common timeline
-        H = hypothesis >> common_timeline
-
-        # loop on all segments
-        for segment in common_timeline:
-
-            # segment duration
-            duration = segment.duration
-
-            # list of IDs in reference segment
-            r = R.get_labels(segment, unknown=self.unknown, unique=False)
-
-            # list of IDs in hypothesis segment
-            h = H.get_labels(segment, unknown=self.unknown, unique=False)
-
-            counts, _ = self.matcher.manyToManyMatch(r, h)
+        duration, n1, n2, correct = self._get_matches(
+            reference, hypothesis, context=context)
 
-            detail[RECALL_RELEVANT] += duration * counts[IER_TOTAL]
-            detail[RECALL_RELEVANT_RETRIEVED] += duration * counts[IER_CORRECT]
+        detail[RECALL_RELEVANT] = np.dot(duration, n1)
+        detail[RECALL_RELEVANT_RETRIEVED] = np.dot(duration, correct)
 
         return detail
 
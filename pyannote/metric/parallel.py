@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parallel corpus evaluation
+
+    >>> def load(uri):
+    ...     return reference[uri], [hypothesis1[uri], hypothesis2[uri]]
+    >>> metrics = [[DiarizationErrorRate()], [DiarizationErrorRate()]]
+    >>> for uri, details in evaluate(uris, load, metrics, n_jobs=4):
+    ...     print uri, details[1][0]['diarization error rate']
+    >>> print abs(metrics[0][0]), abs(metrics[1][0])
+
+"""
+
+import functools
+import itertools
+import multiprocessing
+from context import EvaluationContext
+
+# (load, metrics) of the evaluation processed by worker processes.
+# it is set right before the pool of workers is forked so that workers
+# inherit it and never have to unpickle parsers or metrics.
+_task = None
+
+
+def _get_details(uri):
+    """Compute components of all metrics in a worker process"""
+    return _get_task_details(_task, uri)
+
+
+def _get_task_details(task, uri):
+    """Compute components of all metrics for one resource
+
+    Returns
+    -------
+    details : list
+        details[h][m] contains components of m-th metric for h-th hypothesis.
+    """
+
+    load, metrics = task
+
+    reference, hypotheses = load(uri)
+
+    details = []
+    for hypothesis, _metrics in itertools.izip(hypotheses, metrics):
+        # metrics share intermediate results
+        context = EvaluationContext()
+        details.append([
+            metric._get_details(reference, hypothesis, context=context)
+            for metric in _metrics])
+
+    return details
+
+
+def evaluate(uris, load, metrics, n_jobs=1, chunksize=1):
+    """Evaluate hypotheses on a whole corpus
+
+    Resources are distributed across a pool of `n_jobs` worker processes.
+    Each of them loads reference and hypotheses and computes components of
+    all metrics. Components are then accumulated into `metrics`, in the
+    order of `uris` -- so that results do not depend on `n_jobs`.
+
+    Parameters
+    ----------
+    uris : iterable
+        Resource identifiers
+    load : callable
+        load(uri) returns (reference, hypotheses) tuple where `hypotheses`
+        is a list with one annotation per evaluated system.
+    metrics : list
+        metrics[h] is the list of `BaseMetric` for h-th hypothesis.
+    n_jobs : int, optional
+        Number of worker processes. Defaults to 1 (no worker process).
+        Use -1 for all cores.
+    chunksize : int, optional
+        Number of resources sent at once to each worker.
+
+    Generates
+    ---------
+    uri, details
+        details[h][m] contains components (and value) of m-th metric
+        for h-th hypothesis.
+    """
+
+    global _task
+
+    if n_jobs < 0:
+        n_jobs = multiprocessing.cpu_count()
+
+    # uris are iterated twice (jobs and results)
+    uris = list(uris)
+
+    task = (load, metrics)
+    pool = None
+
+    try:
+
+        if n_jobs == 1:
+            # bind task locally so that concurrent evaluations do not
+            # share (and overwrite) the module-level one
+            results = itertools.imap(
+                functools.partial(_get_task_details, task), uris)
+        else:
+            _task = task
+            try:
+                pool = multiprocessing.Pool(processes=n_jobs)
+            finally:
+                # workers are forked by now
+                _task = None
+            results = pool.imap(_get_details, uris, chunksize=chunksize)
+
+        for uri, details in itertools.izip(uris, results):
+            yield uri, [
+                [metric.update(uri, detail, detailed=True)
+                 for metric, detail in itertools.izip(_metrics, _details)]
+                for _metrics, _details in itertools.izip(metrics, details)]
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+            pool = None
+
+    finally:
+        if pool is not None:
+            pool.terminate()
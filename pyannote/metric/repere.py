@@ -184,7 +184,7 @@ class EstimatedGlobalErrorRate(BaseMetric):
     f_measure = property(fget=__get_fmeasure)
     """Overall F1-measure."""
 
-    def _get_details(self, reference, hypothesis, annotated=None):
+    def _get_details(self, reference, hypothesis, annotated=None, **kwargs):
 
         if annotated is None:
             raise ValueError("'annotated' argument is mandatory.")
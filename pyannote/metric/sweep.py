@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Threshold sweep evaluation
+
+Evaluate a decision threshold over a whole range of values in one pass,
+instead of decoding and evaluating once per threshold value:
+
+    >>> thresholds = np.linspace(-1, 1, 200)
+    >>> components = identification_sweep(reference, scores, thresholds)
+    >>> rates = get_rates(components)
+
+Components are additive: sum them over multiple resources before calling
+`get_rates` to obtain aggregated error rate curves.
+
+"""
+
+import numpy as np
+from munkres import Munkres
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+from pyannote.base.annotation import Unknown
+from identification import IdentificationErrorRate, \
+    IDMatcher, UnknownIDMatcher, \
+    IER_TOTAL, IER_CORRECT, IER_CONFUSION, IER_MISS, IER_FALSE_ALARM
+from diarization import DiarizationErrorRate
+
+COMPONENTS = [IER_TOTAL, IER_CORRECT, IER_CONFUSION,
+              IER_MISS, IER_FALSE_ALARM]
+
+
+def _check_metric(metric):
+    if type(metric.matcher) not in [IDMatcher, UnknownIDMatcher]:
+        raise ValueError(
+            'threshold sweep is only supported by IDMatcher '
+            'and UnknownIDMatcher.')
+    if metric.resolution is not None:
+        raise ValueError('threshold sweep does not support frame mode.')
+
+
+def _get_key(label, anonymous):
+    if anonymous and isinstance(label, Unknown):
+        return Unknown
+    return label
+
+
+class _Counts(object):
+    """Per elementary segment label counts
+
+    Parameters
+    ----------
+    reference : Annotation
+    segments : iterable
+        Hypothesis segments (whose boundaries are added to the reference ones
+        to obtain elementary segments)
+    unknown, anonymous : bool
+        See `get_count_matrices`
+    """
+
+    def __init__(self, reference, segments, unknown=True, anonymous=True):
+
+        super(_Counts, self).__init__()
+
+        tracks = [(s.start, s.end, label)
+                  for s, _, label in reference.itertracks(label=True)
+                  if unknown or not isinstance(label, Unknown)]
+
+        # one column per label (all Unknowns share one when anonymous)...
+        self.columns = {}
+        # ... but distinct labels may still be needed (e.g. for mapping)
+        self.labels = {}
+        column = []
+        for _, _, label in tracks:
+            if label not in self.labels:
+                self.labels[label] = len(self.labels)
+                key = _get_key(label, anonymous)
+                column.append(self.columns.setdefault(key, len(self.columns)))
+        self.column = np.array(column, dtype=int)
+
+        self.times = np.unique(
+            [t for start, end, _ in tracks for t in (start, end)] +
+            [t for s in segments for t in (s.start, s.end)])
+        self.duration = np.diff(self.times)
+
+        n_rows = len(self.duration)
+
+        L = np.zeros((n_rows + 1, len(self.labels)), dtype=int)
+        for start, end, label in tracks:
+            a, b = self.rows(start, end)
+            L[a, self.labels[label]] += 1
+            L[b, self.labels[label]] -= 1
+        # per label counts
+        self.L = np.cumsum(L, axis=0)[:-1]
+
+        # per column counts
+        self.R = np.zeros((n_rows, len(self.columns)), dtype=int)
+        for i, j in enumerate(self.column):
+            self.R[:, j] += self.L[:, i]
+        self.n1 = np.sum(self.R, axis=1)
+
+    def rows(self, start, end):
+        """Elementary segments [a, b[ covered by [start, end]"""
+        return np.searchsorted(self.times, [start, end])
+
+    def components(self, n2, correct, rows=slice(None)):
+        """Identification error rate components over `rows`"""
+        d = self.duration[rows]
+        n1 = self.n1[rows]
+        return np.array([
+            np.dot(d, n1),
+            np.dot(d, correct),
+            np.dot(d, np.minimum(n1, n2) - correct),
+            np.dot(d, np.maximum(0, n1 - n2)),
+            np.dot(d, np.maximum(0, n2 - n1)),
+        ])
+
+
+def _to_components(C):
+    return {name: C[:, c] for c, name in enumerate(COMPONENTS)}
+
+
+def identification_sweep(reference, scores, thresholds, metric=None):
+    """Identification error rate components for a range of thresholds
+
+    Equivalent to evaluating `scores.to_annotation(threshold=threshold)`
+    for each threshold, but best labels are sorted by score once and
+    components are updated incrementally as decisions flip from `Unknown`
+    to their best label.
+
+    Parameters
+    ----------
+    reference : Annotation
+    scores : Scores
+    thresholds : (n_thresholds, ) array-like
+    metric : IdentificationErrorRate, optional
+        Provides matcher, `unknown` and weights parameters.
+        Defaults to IdentificationErrorRate().
+
+    Returns
+    -------
+    components : dict
+        Components name to (n_thresholds, ) array mapping.
+        See `get_rates`.
+    """
+
+    if metric is None:
+        metric = IdentificationErrorRate()
+    _check_metric(metric)
+
+    anonymous = type(metric.matcher) == UnknownIDMatcher
+    unknown = metric.unknown
+
+    # best label for each track
+    best = {}
+    for segment, track, label, value in scores.nbest(1).itervalues():
+        best[segment, track] = (label, value)
+
+    counts = _Counts(reference, [s for s, _ in best],
+                     unknown=unknown, anonymous=anonymous)
+    n_rows, n_columns = counts.R.shape
+
+    # column of Unknown hypothesis tracks (if they can be correct at all)
+    u = counts.columns.get(Unknown) if unknown and anonymous else None
+
+    # tracks sorted by decreasing score
+    tracks = sorted(
+        [(value, counts.rows(segment.start, segment.end), label)
+         for (segment, _), (label, value) in best.iteritems()],
+        key=lambda t: t[0], reverse=True)
+
+    # initial state: all tracks are Unknown
+    H = np.zeros((n_rows + 1, n_columns), dtype=int)
+    n2 = np.zeros((n_rows + 1, ), dtype=int)
+    if unknown:
+        for _, (a, b), _ in tracks:
+            n2[a] += 1
+            n2[b] -= 1
+            if u is not None:
+                H[a, u] += 1
+                H[b, u] -= 1
+    H = np.cumsum(H, axis=0)[:-1]
+    n2 = np.cumsum(n2)[:-1]
+    correct = np.sum(np.minimum(counts.R, H), axis=1)
+
+    current = counts.components(n2, correct)
+
+    thresholds = np.asarray(thresholds, dtype=float)
+    C = np.zeros((len(thresholds), len(COMPONENTS)))
+
+    t = 0
+    for i in np.argsort(-thresholds, kind='mergesort'):
+
+        # flip tracks whose score is above threshold
+        while t < len(tracks) and tracks[t][0] >= thresholds[i]:
+
+            _, (a, b), label = tracks[t]
+            t += 1
+
+            if isinstance(label, Unknown):
+                continue
+
+            rows = slice(a, b)
+            current -= counts.components(n2[rows], correct[rows], rows=rows)
+
+            if u is not None:
+                H[rows, u] -= 1
+            if not unknown:
+                n2[rows] += 1
+            j = counts.columns.get(_get_key(label, anonymous))
+            if j is not None:
+                H[rows, j] += 1
+            correct[rows] = np.sum(np.minimum(counts.R[rows], H[rows]),
+                                   axis=1)
+
+            current += counts.components(n2[rows], correct[rows], rows=rows)
+
+        C[i] = current
+
+    return _to_components(C)
+
+
+def _assign(K):
+    """Optimal one-to-one (row, column) pairs with positive K"""
+
+    n_rows, n_columns = K.shape
+    if not n_rows * n_columns:
+        return []
+
+    if linear_sum_assignment is None:
+        N = max(n_rows, n_columns)
+        C = np.zeros((N, N))
+        C[:n_rows, :n_columns] = np.max(K) - K
+        pairs = [(a, b) for a, b in Munkres().compute(C)
+                 if a < n_rows and b < n_columns]
+    else:
+        pairs = zip(*linear_sum_assignment(np.max(K) - K))
+
+    return [(a, b) for a, b in pairs if K[a, b] > 0]
+
+
+def clustering_sweep(reference, history, thresholds, metric=None):
+    """Diarization error rate components for a range of thresholds
+
+    Equivalent to evaluating the output of a HAC stopped with
+    `SimilarityThresholdStop` for each threshold (i.e. after applying every
+    iteration preceding the first one whose similarity is lower than the
+    threshold), but the history is replayed only once: each merge updates
+    the corresponding hypothesis counts and cooccurrence column, and the
+    optimal mapping is recomputed from the (small) cooccurrence matrix.
+
+    Parameters
+    ----------
+    reference : Annotation
+    history : HACHistory
+    thresholds : (n_thresholds, ) array-like
+    metric : DiarizationErrorRate, optional
+        Provides matcher, `unknown` and weights parameters.
+        Defaults to DiarizationErrorRate().
+
+    Returns
+    -------
+    components : dict
+        Components name to (n_thresholds, ) array mapping.
+        See `get_rates`.
+    """
+
+    if metric is None:
+        metric = DiarizationErrorRate()
+    _check_metric(metric)
+
+    anonymous = type(metric.matcher) == UnknownIDMatcher
+    unknown = metric.unknown
+
+    hypothesis = [(s, label)
+                  for s, _, label in history.annotation.itertracks(label=True)
+                  if unknown or not isinstance(label, Unknown)]
+
+    counts = _Counts(reference, [s for s, _ in hypothesis],
+                     unknown=unknown, anonymous=anonymous)
+    n_rows, n_columns = counts.R.shape
+
+    # one column per cluster
+    clusters = {}
+    for _, label in hypothesis:
+        clusters.setdefault(label, len(clusters))
+
+    H = np.zeros((n_rows + 1, len(clusters)), dtype=int)
+    for segment, label in hypothesis:
+        a, b = counts.rows(segment.start, segment.end)
+        H[a, clusters[label]] += 1
+        H[b, clusters[label]] -= 1
+    H = np.cumsum(H, axis=0)[:-1]
+    n2 = np.sum(H, axis=1)
+
+    # cooccurrence duration of reference labels and clusters
+    B = (counts.L > 0).T * counts.duration
+    K = np.dot(B, H > 0)
+
+    def get_components():
+
+        active = sorted(clusters.values())
+
+        # reference column of each (mapped or not) cluster
+        mapped = {}
+        for a, b in _assign(K[:, active]):
+            mapped[active[b]] = counts.column[a]
+        for label, c in clusters.iteritems():
+            if c not in mapped:
+                j = counts.columns.get(_get_key(label, anonymous))
+                if j is not None:
+                    mapped[c] = j
+
+        # clusters counts translated into reference labels
+        M = np.zeros((n_rows, n_columns), dtype=int)
+        for c, j in mapped.iteritems():
+            M[:, j] += H[:, c]
+        correct = np.sum(np.minimum(counts.R, M), axis=1)
+
+        return counts.components(n2, correct)
+
+    current = get_components()
+
+    thresholds = np.asarray(thresholds, dtype=float)
+    C = np.zeros((len(thresholds), len(COMPONENTS)))
+
+    # HAC stops at the first iteration below threshold:
+    # only consider iterations preceding it
+    similarity = [iteration.similarity for iteration in history.iterations]
+    stop = np.minimum.accumulate(similarity) if similarity else []
+
+    n = 0
+    for i in np.argsort(-thresholds, kind='mergesort'):
+
+        merged = False
+        while n < len(stop) and stop[n] >= thresholds[i]:
+
+            iteration = history.iterations[n]
+            n += 1
+
+            columns = [clusters.pop(c) for c in iteration.merged_clusters
+                       if c in clusters]
+            if not columns:
+                continue
+
+            c = columns[0]
+            H[:, c] = np.sum(H[:, columns], axis=1)
+            K[:, c] = np.dot(B, H[:, c] > 0)
+            clusters[iteration.new_cluster] = c
+            merged = True
+
+        if merged:
+            current = get_components()
+
+        C[i] = current
+
+    return _to_components(C)
+
+
+def get_rates(components, metric=None):
+    """Error rates from (possibly summed) sweep components
+
+    Parameters
+    ----------
+    components : dict
+        As returned by `identification_sweep` or `clustering_sweep`.
+    metric : IdentificationErrorRate, optional
+        Provides confusion, miss and false alarm weights.
+        Defaults to IdentificationErrorRate().
+
+    Returns
+    -------
+    rates : (n_thresholds, ) array
+    """
+
+    if metric is None:
+        metric = IdentificationErrorRate()
+
+    return np.array([
+        metric._get_rate({name: components[name][i] for name in COMPONENTS})
+        for i in range(len(components[COMPONENTS[0]]))])
@@ -27,6 +27,9 @@ import xgtf
 import etf
 import tvm
 import facetracks
+import pab
+import compressed
+import cache as _cache
 
 
 class AnnotationParser(object):
@@ -41,18 +44,29 @@ class AnnotationParser(object):
         '.facetracks': facetracks.FACETRACKSParser,
         '.etf0': etf.ETF0Parser,
         '.tvm': tvm.TVMParser,
+        '.pab': pab.PABParser,
     }
 
     @classmethod
     def guess(cls, path):
         import os
-        _, extension = os.path.splitext(path)
+        # file.mdtm.gz is guessed as .mdtm
+        _, extension = os.path.splitext(compressed.strip_extension(path))
         return AnnotationParser.supported.get(extension, None), extension
 
-    def __init__(self, **kwargs):
+    def __init__(self, cache=None, **kwargs):
+        """
+        Parameters
+        ----------
+        cache : `ParseCache`, optional
+            On-disk cache of parsed files.
+            Defaults to the one configured by PYANNOTE_CACHE environment
+            variable (see `pyannote.parser.cache`), if any.
+        """
         super(AnnotationParser, self).__init__()
         self.__parser = None
         self.__kwargs = kwargs
+        self.__cache = _cache.get_cache() if cache is None else cache
 
     def __get_uris(self):
         return self.__parser.uris
@@ -68,6 +82,15 @@ class AnnotationParser(object):
             raise NotImplementedError(
                 "unsupported file format '%s'. supported: %s." %
                 (extension, AnnotationParser.supported.keys()))
+        # only the first file goes through the cache (later files are
+        # parsed and accumulated into the very same parser, as usual).
+        # files already in PAB format are not cached.
+        if self.__cache is not None and self.__parser is None and \
+           isinstance(path, basestring) and GuessParser is not pab.PABParser:
+            self.__parser = self.__cache.read(
+                GuessParser(**self.__kwargs), path, options=self.__kwargs,
+                uri=uri, modality=modality, **kwargs)
+            return self
         if self.__parser is None or not isinstance(self.__parser, GuessParser):
             self.__parser = GuessParser(**self.__kwargs)
         self.__parser.read(path, uri=uri, modality=modality, **kwargs)
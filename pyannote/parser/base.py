@@ -19,7 +19,10 @@
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
 import sys
+import itertools
+from cStringIO import StringIO
 import pandas
+from pandas.io.parsers import _NA_VALUES
 import numpy as np
 from pyannote.base.segment import Segment
 from pyannote.base.timeline import Timeline
@@ -27,6 +30,34 @@ from pyannote.base.annotation import Annotation, Unknown
 from pyannote.base.scores import Scores
 from pyannote.base.feature import SlidingWindowFeature
 from pyannote.base import URI, MODALITY, SEGMENT, TRACK, LABEL, SCORE
+from compressed import get_compression, open_file, read_array
+
+
+def get_segments(start, end):
+    """Segments from start and end time arrays
+
+    Only one `Segment` is instantiated per unique (start, end) pair.
+    """
+
+    start = np.asarray(start)
+    end = np.asarray(end)
+
+    # sort (start, end) pairs and detect duplicates
+    order = np.lexsort((end, start))
+    start = start[order]
+    end = end[order]
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = (start[1:] != start[:-1]) | (end[1:] != end[:-1])
+
+    unique = np.empty((np.sum(new), ), dtype=object)
+    for i, (s, e) in enumerate(itertools.izip(start[new].tolist(),
+                                               end[new].tolist())):
+        unique[i] = Segment(s, e)
+
+    segments = np.empty((len(order), ), dtype=object)
+    segments[order] = unique[np.cumsum(new) - 1]
+
+    return segments.tolist()
 
 
 class BaseTimelineParser(object):
@@ -100,8 +131,8 @@ class BaseTextualTimelineParser(BaseTimelineParser):
         if uri is None:
             uri = path
 
-        # open file and loop on each line
-        fp = open(path, 'r')
+        # open (possibly compressed) file and loop on each line
+        fp = open_file(path)
         for line in fp:
 
             # strip line
@@ -313,18 +344,69 @@ class BaseTextualFormat(object):
     def get_segment(self, row):
         raise NotImplementedError('')
 
+    def get_segments(self, df):
+        """Segments of all rows at once
+
+        Defaults to one call to `get_segment` per row.
+        Formats should override it with vectorized column arithmetic.
+        """
+        return [self.get_segment(row) for _, row in df.iterrows()]
+
     def get_converters(self):
         return None
 
     def get_default_modality(self):
         return None
 
+    def _format(self, annotation, uri, modality):
+        """Formatted annotation
+
+        Defaults to `_append`-ing annotation to an in-memory buffer.
+        Formats should override it to format all tracks at once.
+        """
+        buf = StringIO()
+        self._append(annotation, buf, uri, modality)
+        return buf.getvalue()
+
 
 class BaseTextualParser(object):
 
     def __init__(self):
         super(BaseTextualParser, self).__init__()
 
+    def _read_table(self, path, names):
+        """Load whole file
+
+        Labels and tracks are kept as raw strings (i.e. no type inference
+        and no NaN detection) unless a converter is provided for them.
+        Compressed files are decompressed on the fly.
+        """
+
+        if isinstance(path, basestring) and get_compression(path):
+            with open_file(path) as f:
+                return self._read_table(f, names)
+
+        converters = self.get_converters()
+        if converters is None:
+            converters = {}
+
+        dtype = {}
+        na_values = {}
+        for name in names:
+            if name in [LABEL, TRACK] and name not in converters:
+                dtype[name] = object
+            else:
+                na_values[name] = list(_NA_VALUES)
+
+        return pandas.read_table(path, header=None,
+                                 sep=self.get_separator(),
+                                 names=names,
+                                 comment=self.get_comment(),
+                                 converters=converters,
+                                 dtype=dtype,
+                                 keep_default_na=False,
+                                 na_values=na_values)
+
     def __get_uris(self):
         return sorted(set([v for (v, m) in self._loaded]))
     uris = property(fget=__get_uris)
@@ -400,7 +482,8 @@ class BaseTextualParser(object):
             with open(f, 'w') as g:
                 g.write('%s %s\n' % (comment_marker, text))
 
-    def write(self, annotation, f=sys.stdout, uri=None, modality=None):
+    def write(self, annotation, f=sys.stdout, uri=None, modality=None,
+              flush=True):
         """
 
         Parameters
@@ -411,6 +494,8 @@ class BaseTextualParser(object):
             Default is stdout.
         uri, modality : str, optional
             Override `annotation` attributes
+        flush : bool, optional
+            Set to False to not flush file `f` after writing.
 
         """
 
@@ -421,11 +506,54 @@ class BaseTextualParser(object):
 
         if isinstance(f, file):
             self._append(annotation, f, uri, modality)
-            f.flush()
+            if flush:
+                f.flush()
         else:
             with open(f, 'w') as g:
                 self._append(annotation, g, uri, modality)
 
+    def _write_all(self, annotations, f, buffer_size):
+
+        chunks = []
+        size = 0
+
+        for annotation in annotations:
+
+            chunk = self._format(annotation, annotation.uri,
+                                 annotation.modality)
+            chunks.append(chunk)
+            size += len(chunk)
+
+            if size >= buffer_size:
+                f.write(''.join(chunks))
+                chunks = []
+                size = 0
+
+        f.write(''.join(chunks))
+
+    def write_all(self, annotations, f=sys.stdout, buffer_size=1 << 20):
+        """Write multiple annotations in one pass
+
+        Parameters
+        ----------
+        annotations : iterable
+            `Annotation` or `Score` iterable. Can be a generator, in which
+            case annotations do not have to be all in memory at once.
+        f : file or str, optional
+            Default is stdout.
+        buffer_size : int, optional
+            Formatted annotations are written by chunks of (at least)
+            `buffer_size` characters. Defaults to 1M characters.
+
+        """
+
+        if isinstance(f, file):
+            self._write_all(annotations, f, buffer_size)
+            f.flush()
+        else:
+            with open(f, 'w') as g:
+                self._write_all(annotations, g, buffer_size)
+
 
 class BaseTextualAnnotationParser(BaseTextualParser):
 
@@ -445,32 +573,19 @@ class BaseTextualAnnotationParser(BaseTextualParser):
 
         names = self.get_fields()
 
-        converters = self.get_converters()
-        if converters is None:
-            converters = {}
-        if LABEL not in converters:
-            converters[LABEL] = lambda x: x
-        if TRACK not in converters:
-            converters[TRACK] = lambda x: x
-
         # load whole file
-        df = pandas.read_table(path, header=None,
-                               sep=self.get_separator(),
-                               names=names,
-                               comment=self.get_comment(),
-                               converters=converters)
+        df = self._read_table(path, names)
 
         # remove comment lines
         # (i.e. lines for which all fields are either None or NaN)
-        keep = [not all([pandas.isnull(r[n]) for n in names]) for _, r in df.iterrows()]
-        df = df[keep]
+        df = df.dropna(how='all')
 
         # add unique track numbers if they are not read from file
         if TRACK not in names:
-            df[TRACK] = range(df.shape[0])
+            df[TRACK] = np.arange(df.shape[0])
 
-        # add 'segment' column build from start time & duration
-        df[SEGMENT] = [self.get_segment(row) for r, row in df.iterrows()]
+        # segments built from start time & duration (or end time)
+        segments = self.get_segments(df)
 
         # add uri column in case it does not exist
         if URI not in df:
@@ -490,27 +605,36 @@ class BaseTextualAnnotationParser(BaseTextualParser):
         # obtain list of modalities
         modalities = list(df[MODALITY].unique())
 
+        # row indices of each (uri, modality) pair
+        groups = df.groupby([URI, MODALITY], sort=False).indices
+
+        tracks = df[TRACK].tolist()
+        labels = df[LABEL].tolist()
+
         self._loaded = {}
 
         # loop on resources
         for uri in uris:
 
-            # filter based on resource
-            df_ = df[df[URI] == uri]
-
             # loop on modalities
             for modality in modalities:
 
-                # filter based on modality
-                df__ = df_[df_[MODALITY] == (modality if modality is not None else "")]
+                indices = groups.get((uri, modality), [])
+                _labels = [labels[i] for i in indices]
 
-                a = Annotation.from_df(df__, modality=modality, uri=uri)
-
-                translation = {l: Unknown() for l in a.labels()
+                # make sure UnknownXXXX labels are changed into Unknown
+                # objects before (rather than after) building annotation
+                translation = {l: Unknown()
+                               for l in sorted(set(_labels), key=str)
                                if isinstance(l, str) and
                                (l[:7] == 'Unknown' or l[:7] == 'Inconnu' or l[:8] == 'speaker#')}
+                if translation:
+                    _labels = [translation.get(l, l) for l in _labels]
 
-                self._loaded[uri, modality] = a % translation
+                self._loaded[uri, modality] = Annotation.from_arrays(
+                    [segments[i] for i in indices],
+                    [tracks[i] for i in indices],
+                    _labels, modality=modality, uri=uri)
 
         return self
 
@@ -579,6 +703,15 @@ class CustomTextualAnnotationParser(BaseTextualAnnotationParser):
         else:
             raise ValueError('do not know how to build a segment')
 
+    def get_segments(self, df):
+        start = df['start'].values
+        if self.end is not None:
+            return get_segments(start, df['end'].values)
+        elif self.duration is not None:
+            return get_segments(start, start + df['duration'].values)
+        else:
+            raise ValueError('do not know how to build a segment')
+
 
 class BaseTextualScoresParser(BaseTextualParser):
 
@@ -586,33 +719,20 @@ class BaseTextualScoresParser(BaseTextualParser):
 
         names = self.get_fields()
 
-        converters = self.get_converters()
-        if converters is None:
-            converters = {}
-        if LABEL not in converters:
-            converters[LABEL] = lambda x: x
-        if TRACK not in converters:
-            converters[TRACK] = lambda x: x
-
         # load whole file
-        df = pandas.read_table(path, header=None,
-                               sep=self.get_separator(),
-                               names=names,
-                               comment=self.get_comment(),
-                               converters=converters)
+        df = self._read_table(path, names)
 
         # remove comment lines
         # (i.e. lines for which all fields are either None or NaN)
-        keep = [not all([pandas.isnull(r[n]) for n in names]) for _, r in df.iterrows()]
-        df = df[keep]
+        df = df.dropna(how='all')
 
-        # add 'segment' column build from start time & duration
-        df[SEGMENT] = [self.get_segment(row) for r, row in df.iterrows()]
+        # segments built from start time & duration (or end time)
+        segments = self.get_segments(df)
 
         # add unique track number per segment if they are not read from file
         if TRACK not in names:
-            s2t = {s: t for t, s in enumerate(df[SEGMENT].unique())}
-            df[TRACK] = [s2t[s] for s in df[SEGMENT]]
+            s2t = {}
+            df[TRACK] = [s2t.setdefault(s, len(s2t)) for s in segments]
 
         # add modality column in case it does not exist
         if MODALITY not in df:
@@ -620,32 +740,34 @@ class BaseTextualScoresParser(BaseTextualParser):
                 modality = self.get_default_modality()
             df[MODALITY] = modality if modality is not None else ""
 
-        # remove all columns but those six
-        df = df[[URI, MODALITY, SEGMENT, TRACK, LABEL, SCORE]]
-
         # obtain list of resources
         uris = list(df[URI].unique())
 
         # obtain list of modalities
         modalities = list(df[MODALITY].unique())
 
+        # row indices of each (uri, modality) pair
+        groups = df.groupby([URI, MODALITY], sort=False).indices
+
+        tracks = df[TRACK].tolist()
+        labels = df[LABEL].values
+        values = df[SCORE].values
+
         self._loaded = {}
 
         # loop on resources
         for uri in uris:
 
-            # filter based on resource
-            df_ = df[df[URI] == uri]
-
             # loop on modalities
             for modality in modalities:
 
-                # filter based on modality
-                df__ = df_[df_[MODALITY] == (modality if modality is not None else "")]
+                indices = groups.get((uri, modality), [])
 
-                s = Scores.from_df(df__, modality=modality, uri=uri)
-
-                self._loaded[uri, modality] = s
+                self._loaded[uri, modality] = Scores.from_arrays(
+                    [segments[i] for i in indices],
+                    [tracks[i] for i in indices],
+                    labels[indices], values[indices],
+                    modality=modality, uri=uri)
 
         return self
 
@@ -715,8 +837,8 @@ class BasePeriodicFeatureParser(object):
 
         """
 
-        # open binary file
-        fp = open(path, 'rb')
+        # open (possibly compressed) binary file
+        fp = open_file(path)
         # read header
         dtype, sliding_window, count = self._read_header(fp)
         # read data
@@ -763,7 +885,11 @@ class BaseBinaryPeriodicFeatureParser(BasePeriodicFeatureParser):
         -------
 
         """
-        return np.fromfile(fp, dtype=dtype, sep='', count=count)
+        if isinstance(fp, file):
+            return np.fromfile(fp, dtype=dtype, sep='', count=count)
+
+        # compressed file: decompress into preallocated array
+        return read_array(fp, dtype, count=count)
 
 
 class BaseTextualPeriodicFeatureParser(BasePeriodicFeatureParser):
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parallel parsing of one annotation file per resource
+
+    >>> uris = ['show1', 'show2', 'show3']
+    >>> for annotation in read_all('/path/to/[URI].mdtm', uris=uris,
+    ...                            modality='speaker', n_jobs=4):
+    ...     print annotation.uri, annotation.labels()
+
+"""
+
+import collections
+import functools
+import itertools
+import multiprocessing
+from pyannote.base.annotation import Annotation, Unknown
+from pyannote.cli.uris import contains_uri, replace_uri
+from annotation import AnnotationParser
+
+# (Parser, init, kwargs) of the batch being processed by worker processes.
+# it is set right before the pool of workers is forked so that workers
+# inherit it and never have to unpickle them.
+_task = None
+
+
+def _read(job):
+    """Parse one file in a worker process"""
+    return _read_task(_task, job)
+
+
+def _read_task(task, job):
+    """Parse one file and return the resulting annotation"""
+
+    Parser, init, kwargs = task
+    path, uri = job
+
+    parser = Parser(**init)
+    parser.read(path, uri=uri, **kwargs)
+    return parser(uri=uri, **kwargs)
+
+
+def _fresh_unknowns(annotation):
+    """Replace Unknown labels created by a worker process
+
+    Unknown instances are identified by a counter: those created by
+    distinct workers may therefore (wrongly) be equal.
+    """
+
+    if not isinstance(annotation, Annotation):
+        return annotation
+
+    translation = {}
+    for _, _, label in annotation.itertracks(label=True):
+        if isinstance(label, Unknown) and label not in translation:
+            translation[label] = Unknown(format=label._format)
+
+    if not translation:
+        return annotation
+
+    return annotation % translation
+
+
+def read_all(paths, uris=None, Parser=AnnotationParser, init=None,
+             n_jobs=1, in_flight=None, **kwargs):
+    """Parse many annotation files
+
+    Files are distributed across a pool of `n_jobs` worker processes.
+    Annotations are generated in the order of `uris` (or `paths`), as soon
+    as they are available -- and at most `in_flight` files are being parsed
+    or waiting to be consumed at any time, so that memory does not grow
+    with the number of files.
+
+    Parameters
+    ----------
+    paths : str or list
+        Path template containing URI placeholder (in which case `uris` must
+        be provided) or list of paths (one per resource).
+    uris : list, optional
+        Resource identifiers. When `paths` is a list, defaults to None (i.e.
+        each file is expected to contain exactly one resource).
+    Parser : type, optional
+        Parser class. Defaults to `AnnotationParser`. Use `TimelineParser`
+        to parse timeline files.
+    init : dict, optional
+        Keyword arguments passed when initializing parser.
+    n_jobs : int, optional
+        Number of worker processes. Defaults to 1 (no worker process).
+        Use -1 for all cores.
+    in_flight : int, optional
+        Maximum number of files being processed at any time.
+        Defaults to twice the number of worker processes.
+    **kwargs
+        Passed to parser `read` and `__call__` methods (e.g. modality).
+
+    Generates
+    ---------
+    annotation : `Annotation` (or `Timeline`)
+    """
+
+    global _task
+
+    if isinstance(paths, basestring):
+        if not contains_uri(paths):
+            raise ValueError('paths must either be a list of paths or a '
+                             'path template containing a URI placeholder.')
+        if uris is None:
+            raise ValueError('missing uris -- use uris=')
+        jobs = [(replace_uri(paths, uri), uri) for uri in uris]
+
+    else:
+        if uris is None:
+            uris = [None] * len(paths)
+        if len(uris) != len(paths):
+            raise ValueError('paths and uris must have the same length.')
+        jobs = zip(paths, uris)
+
+    if n_jobs < 0:
+        n_jobs = multiprocessing.cpu_count()
+
+    if in_flight is None:
+        in_flight = 2 * n_jobs
+
+    task = (Parser, {} if init is None else init, kwargs)
+    pool = None
+
+    try:
+
+        if n_jobs == 1:
+            # bind task locally so that concurrent generators do not
+            # share (and overwrite) the module-level one
+            read = functools.partial(_read_task, task)
+            for annotation in itertools.imap(read, jobs):
+                yield annotation
+
+        else:
+
+            _task = task
+            try:
+                pool = multiprocessing.Pool(processes=n_jobs)
+            finally:
+                # workers are forked by now
+                _task = None
+
+            # pending jobs, in order
+            pending = collections.deque()
+            jobs = iter(jobs)
+
+            for job in itertools.islice(jobs, in_flight):
+                pending.append(pool.apply_async(_read, (job, )))
+
+            while pending:
+                annotation = pending.popleft().get()
+                # submit next job before yielding
+                # so that workers never wait for the consumer
+                for job in itertools.islice(jobs, 1):
+                    pending.append(pool.apply_async(_read, (job, )))
+                yield _fresh_unknowns(annotation)
+
+            pool.close()
+            pool.join()
+            pool = None
+
+    finally:
+        if pool is not None:
+            pool.terminate()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""On-disk cache of parsed files
+
+Parsed annotations, timelines and scores are stored in PAB binary format
+so that large files (e.g. the reference of a whole corpus) do not have to
+be parsed again and again by successive runs of the same tool.
+
+Cache entries are keyed by file path, size and modification time, parser
+type and parser options: modifying the file automatically invalidates its
+cache entry. When the cache grows bigger than its maximum size, least
+recently used entries are removed.
+
+The cache is disabled by default. Set the PYANNOTE_CACHE environment
+variable to a cache directory to enable it for `AnnotationParser` and
+`TimelineParser` (and therefore for all command line tools), and the
+PYANNOTE_CACHE_SIZE environment variable to its maximum size in MB:
+
+    $ export PYANNOTE_CACHE=~/.cache/pyannote
+    $ export PYANNOTE_CACHE_SIZE=2048
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pyannote.base.timeline import Timeline
+from pab import PABParser
+
+ENV_DIRECTORY = 'PYANNOTE_CACHE'
+ENV_SIZE = 'PYANNOTE_CACHE_SIZE'
+
+# default maximum cache size (in MB)
+DEFAULT_SIZE = 1024
+
+SUFFIX = '.pab'
+
+
+class ParseCache(object):
+    """On-disk cache of parsed files
+
+    Parameters
+    ----------
+    directory : str
+        Cache directory. It is created if it does not exist.
+    max_size : int, optional
+        Maximum cache size, in MB. Defaults to 1024 (i.e. 1GB).
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_SIZE):
+        super(ParseCache, self).__init__()
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def key(self, path, Parser, options=None):
+        """Cache key
+
+        Parameters
+        ----------
+        path : str
+            Path to parsed file
+        Parser : type
+            Parser class
+        options : dict, optional
+            Parser options (i.e. anything that may change parsing output).
+            Options that are paths to existing files are considered as
+            additional input files: their size and modification time are
+            part of the key as well.
+
+        Returns
+        -------
+        key : str
+        """
+
+        options = {} if options is None else options
+
+        # parsed file and any other input file passed as an option
+        # (e.g. XGTF companion .idx file)
+        paths = [path] + [v for _, v in sorted(options.iteritems())
+                          if isinstance(v, basestring) and os.path.isfile(v)]
+        files = []
+        for p in paths:
+            stat = os.stat(p)
+            files.append([os.path.abspath(p), stat.st_size, stat.st_mtime])
+
+        description = json.dumps([
+            files,
+            '%s.%s' % (Parser.__module__, Parser.__name__),
+            sorted((str(k), repr(v)) for k, v in options.iteritems())])
+
+        return hashlib.sha1(description).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key):
+        """Get cached objects
+
+        Returns
+        -------
+        parser : `PABParser` or None
+            None when `key` is not in cache.
+        """
+
+        path = self._path(key)
+
+        try:
+            parser = PABParser().read(path)
+            # mark entry as most recently used
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            # missing (or corrupted) entry
+            return None
+
+        return parser
+
+    def set(self, key, objects):
+        """Store objects in cache
+
+        Parameters
+        ----------
+        key : str
+        objects : iterable
+            `Annotation`, `Timeline` or `Scores` iterable.
+
+        Returns
+        -------
+        success : bool
+            False if objects could not be cached (e.g. unsupported objects).
+        """
+
+        # write to a temporary file first
+        # so that concurrent processes never read incomplete entries
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        os.close(fd)
+
+        try:
+            PABParser().write_all(objects, tmp)
+            os.rename(tmp, self._path(key))
+        except (IOError, OSError, ValueError):
+            # PABParser.write_all already removes incomplete files
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+
+        self._evict()
+
+        return True
+
+    def _evict(self):
+        """Remove least recently used entries until cache is small enough"""
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # removed by a concurrent process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(s for _, s, _ in entries)
+
+        for _, s, path in sorted(entries):
+            if size <= self.max_size * (1 << 20):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= s
+
+    def read(self, parser, path, options=None, **kwargs):
+        """Parse file (or get it from cache)
+
+        Parameters
+        ----------
+        parser : object
+            Parser instance, used in case of cache miss.
+        path : str
+            Path to file.
+        options : dict, optional
+            Parser initialization options
+        **kwargs
+            Passed to parser `read` method.
+
+        Returns
+        -------
+        parser : object
+            `parser`, loaded with cached objects in case of cache hit.
+        """
+
+        options = dict({} if options is None else options, **kwargs)
+        key = self.key(path, parser.__class__, options)
+
+        cached = self.get(key)
+        if cached is None:
+            parser.read(path, **kwargs)
+            self.set(key, parser._loaded.itervalues())
+            return parser
+
+        # `parser` is fresh: it is loaded as if it had just read `path`.
+        # timeline parsers index timelines by uri,
+        # other parsers index objects by (uri, modality)
+        parser._loaded = {}
+        for obj in cached.iterobjects():
+            if isinstance(obj, Timeline):
+                parser._loaded[obj.uri] = obj
+            else:
+                parser._loaded[obj.uri, obj.modality] = obj
+
+        return parser
+
+
+def get_cache():
+    """Cache configured by environment variables (None if disabled)"""
+
+    directory = os.environ.get(ENV_DIRECTORY)
+    if not directory:
+        return None
+
+    max_size = int(os.environ.get(ENV_SIZE, DEFAULT_SIZE))
+
+    return ParseCache(directory, max_size=max_size)
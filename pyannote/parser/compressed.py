@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Transparent reading of gzip, bzip2 or xz compressed files
+
+Compression is detected from the first bytes of the file (not from its
+extension) and data is decompressed block by block, as it is read:
+
+    >>> with open_file('/path/to/file.mdtm.gz') as f:
+    ...     for line in f:
+    ...         print line
+
+xz support requires the `lzma` module (or its `backports.lzma` backport).
+"""
+
+import io
+import os
+import re
+import bz2
+import zlib
+import struct
+import numpy as np
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+GZIP = 'gzip'
+BZIP2 = 'bzip2'
+XZ = 'xz'
+
+# file signatures. 'BZh' alone is printable ASCII (and might very well start
+# a plain text file): bzip2 signature also includes block size and the magic
+# number of either the first compressed block or the end of (empty) stream.
+MAGIC = [(re.compile(r'\x1f\x8b'), GZIP),
+         (re.compile(r'BZh[1-9](1AY&SY|\x17rE8P\x90)'), BZIP2),
+         (re.compile(r'\xfd7zXZ\x00'), XZ)]
+
+EXTENSIONS = {'.gz': GZIP, '.bz2': BZIP2, '.xz': XZ}
+
+# default size of compressed blocks
+BLOCK_SIZE = 1 << 20
+
+
+def get_compression(path):
+    """Compression of file at `path` (None if not compressed)"""
+    with open(path, 'rb') as f:
+        header = f.read(10)
+    for magic, compression in MAGIC:
+        if magic.match(header):
+            return compression
+    return None
+
+
+def strip_extension(path):
+    """Remove compression extension (if any) from `path`
+
+    >>> strip_extension('/path/to/file.mdtm.gz')
+    '/path/to/file.mdtm'
+    """
+    root, extension = os.path.splitext(path)
+    if extension in EXTENSIONS:
+        return root
+    return path
+
+
+def _get_decompressor(compression):
+
+    if compression == GZIP:
+        # automatic gzip header detection
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    if compression == BZIP2:
+        return bz2.BZ2Decompressor()
+
+    if compression == XZ:
+        if lzma is None:
+            raise ImportError('reading xz files requires lzma module.')
+        return lzma.LZMADecompressor()
+
+    raise ValueError('unsupported compression: %s' % compression)
+
+
+class DecompressedStream(io.RawIOBase):
+    """Raw (unbuffered) decompressed stream
+
+    Compressed data is read from `fp` by blocks of `block_size` bytes.
+    For gzip files, decompressed blocks are also bounded to `block_size`
+    bytes (this is not supported by Python 2 bz2 and lzma decompressors).
+    `readinto` copies decompressed data straight into the caller buffer
+    (e.g. a preallocated numpy array) -- wrap it into an `io.BufferedReader`
+    for line iteration.
+
+    Parameters
+    ----------
+    fp : file
+        Compressed file.
+    compression : {'gzip', 'bzip2', 'xz'}
+    block_size : int, optional
+        Defaults to 1MB.
+    """
+
+    def __init__(self, fp, compression, block_size=BLOCK_SIZE):
+        super(DecompressedStream, self).__init__()
+        self._fp = fp
+        self.compression = compression
+        self.block_size = block_size
+        self._decompressor = _get_decompressor(compression)
+        # decompressed data not yet consumed
+        self._pending = ''
+        self._offset = 0
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def close(self):
+        if not self.closed:
+            self._fp.close()
+        super(DecompressedStream, self).close()
+
+    def size_hint(self):
+        """Decompressed size, when cheaply available (None otherwise)
+
+        gzip files store their decompressed size (modulo 2^32) in their
+        last four bytes. This is only correct for single-member files
+        smaller than 4GB.
+        """
+
+        if self.compression != GZIP:
+            return None
+
+        position = self._fp.tell()
+        try:
+            self._fp.seek(-4, os.SEEK_END)
+            size, = struct.unpack('<I', self._fp.read(4))
+        except IOError:
+            size = None
+        self._fp.seek(position)
+
+        return size
+
+    def _decompress(self):
+        """Decompress next block"""
+
+        if self.compression == GZIP:
+
+            decompressor = self._decompressor
+
+            # concatenated gzip members (e.g. as produced by `cat a.gz b.gz`)
+            if decompressor.unused_data:
+                data = decompressor.unused_data
+                decompressor = _get_decompressor(GZIP)
+                self._decompressor = decompressor
+
+            # compressed data left over by previous call
+            else:
+                data = decompressor.unconsumed_tail
+
+            if not data:
+                data = self._fp.read(self.block_size)
+
+            if not data:
+                self._eof = True
+                self._pending = decompressor.flush()
+                return
+
+            # bound size of decompressed blocks
+            # (in case of highly compressible data)
+            self._pending = decompressor.decompress(data, self.block_size)
+            return
+
+        # concatenated streams (e.g. as produced by pbzip2 or `cat`)
+        data = self._decompressor.unused_data
+        if data:
+            self._decompressor = _get_decompressor(self.compression)
+        else:
+            data = self._fp.read(self.block_size)
+
+        if not data:
+            self._eof = True
+            self._pending = ''
+            # decompressors only raise EOFError once end of stream is reached
+            try:
+                self._decompressor.decompress('')
+            except EOFError:
+                return
+            raise IOError('compressed file ended before the end-of-stream '
+                          'marker was reached.')
+
+        try:
+            self._pending = self._decompressor.decompress(data)
+        except EOFError:
+            # previous stream ended right at the end of previous block
+            self._decompressor = _get_decompressor(self.compression)
+            self._pending = self._decompressor.decompress(data)
+
+    def readinto(self, b):
+
+        # decompress blocks until some data is available
+        while self._offset >= len(self._pending):
+            if self._eof:
+                return 0
+            self._offset = 0
+            self._decompress()
+
+        n = min(len(b), len(self._pending) - self._offset)
+        b[:n] = buffer(self._pending, self._offset, n)
+        self._offset += n
+
+        return n
+
+
+def open_file(path, block_size=BLOCK_SIZE):
+    """Open (possibly compressed) file for reading
+
+    Parameters
+    ----------
+    path : str
+    block_size : int, optional
+        Size of compressed blocks.
+
+    Returns
+    -------
+    f : file or io.BufferedReader
+        Regular file object when file is not compressed.
+        Buffered reader over a `DecompressedStream` otherwise.
+    """
+
+    compression = get_compression(path)
+
+    if compression is None:
+        return open(path, 'rb')
+
+    raw = DecompressedStream(open(path, 'rb'), compression,
+                             block_size=block_size)
+    return io.BufferedReader(raw, buffer_size=block_size)
+
+
+def _fill(f, buf):
+    """Fill `buf` (uint8 array) with data read from `f`
+
+    Returns
+    -------
+    n : int
+        Number of bytes actually read (smaller than buffer size at EOF).
+    """
+    view = memoryview(buf)
+    n = 0
+
+    # Python 2 BufferedReader.readinto goes through an intermediate string:
+    # only consume data already buffered by the reader (at most one block)
+    # and then read straight from the underlying raw stream.
+    if isinstance(getattr(f, 'raw', None), DecompressedStream):
+        buffered = f.read(min(len(f.peek(1)), len(buf)))
+        n = len(buffered)
+        view[:n] = buffered
+        f = f.raw
+
+    while n < len(buf):
+        read = f.readinto(view[n:])
+        if not read:
+            break
+        n += read
+    return n
+
+
+def read_array(f, dtype, count=-1):
+    """Read array from file object, straight into preallocated memory
+
+    Unlike `numpy.fromfile`, it works with any file-like object providing
+    a `readinto` method -- including decompressed streams.
+
+    Parameters
+    ----------
+    f : file-like object
+    dtype : data-type
+        Data type of the returned array.
+    count : int, optional
+        Number of items to read. ``-1`` means all items (i.e., the complete
+        file), in which case memory is preallocated based on the decompressed
+        size hint (when available) and grown as needed.
+
+    Returns
+    -------
+    data : numpy array
+    """
+
+    dtype = np.dtype(dtype)
+
+    if count < 0:
+        hint = None
+        if isinstance(getattr(f, 'raw', None), DecompressedStream):
+            hint = f.raw.size_hint()
+        count = max(1, (hint or BLOCK_SIZE) // dtype.itemsize)
+        grow = True
+    else:
+        grow = False
+
+    data = np.empty((count, ), dtype=dtype)
+    n = 0
+
+    while True:
+        buf = data.view(np.uint8).reshape((-1, ))
+        n += _fill(f, buf[n:])
+        if not grow or n < len(buf):
+            break
+        # array is full but there might be more to read
+        data.resize((2 * len(data), ) + data.shape[1:], refcheck=False)
+
+    # drop preallocated items that were not read
+    items = n // dtype.itemsize
+    if items < len(data):
+        data.resize((items, ) + data.shape[1:], refcheck=False)
+
+    return data
@@ -26,7 +26,8 @@ ETF (Event Tracking File) is a file format used to specify detected events
 import numpy as np
 from pyannote import Segment
 from pyannote.base import URI, MODALITY, TRACK, LABEL, SCORE
-from base import BaseTextualFormat, BaseTextualScoresParser
+from base import BaseTextualFormat, BaseTextualScoresParser, \
+    get_segments
 
 
 class ETF0Mixin(BaseTextualFormat):
@@ -55,6 +56,10 @@ class ETF0Mixin(BaseTextualFormat):
     def get_segment(self, row):
         return Segment(row[self.START], row[self.START]+row[self.DURATION])
 
+    def get_segments(self, df):
+        start = df[self.START].values
+        return get_segments(start, start + df[self.DURATION].values)
+
     def _append(self, scores, f, uri, modality):
 
         # create new annotation with top-score label
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Lazy per-resource access to large multi-resource annotation files
+
+The file is scanned once to record the byte ranges of the lines of each
+resource. This index is persisted next to the file (in `<path>.index.json`,
+keyed by file size and modification time) so that it does not have to be
+computed again next time. Annotations are then only parsed on demand, one
+resource at a time, and the most recently requested ones are kept in memory:
+
+    >>> parser = IndexedAnnotationParser(MDTMParser()).read('corpus.mdtm')
+    >>> annotation = parser(uri='uri1', modality='speaker')
+
+Note that, for formats that do not provide a track field, track numbers are
+generated per resource (instead of per file).
+"""
+
+import os
+import re
+import json
+from cStringIO import StringIO
+from collections import OrderedDict
+
+from pyannote.base.annotation import Annotation
+from pyannote.base import URI, MODALITY
+
+INDEX = '%s.index.json'
+
+
+def _encode(value):
+    if isinstance(value, unicode):
+        return value.encode('utf8')
+    return value
+
+
+def _get_index(path, separator, comment, fields):
+    """Byte ranges of each resource lines
+
+    Returns
+    -------
+    index : dict
+        {uri: [(start, end), ...]} dictionary
+    modalities : list
+        Modalities found in file (empty if there is no modality field)
+    """
+
+    separator = re.compile(separator)
+    u = fields.index(URI)
+    m = fields.index(MODALITY) if MODALITY in fields else None
+
+    index = {}
+    modalities = set()
+
+    offset = 0
+    previous = None
+
+    with open(path, 'rb') as f:
+
+        for line in f:
+
+            start, offset = offset, offset + len(line)
+
+            if comment is not None:
+                line = line.split(comment, 1)[0]
+            # like pandas (sep='\s+'), ignore leading whitespaces
+            line = line.strip()
+            if not line:
+                continue
+
+            values = separator.split(line)
+            uri = values[u]
+            if m is not None and m < len(values):
+                modalities.add(values[m])
+
+            # extend current byte range...
+            if uri == previous:
+                index[uri][-1][1] = offset
+            # ... or start a new one
+            else:
+                index.setdefault(uri, []).append([start, offset])
+                previous = uri
+
+    return index, sorted(modalities)
+
+
+class IndexedAnnotationParser(object):
+    """Indexed (lazy) annotation parser
+
+    Parameters
+    ----------
+    parser : BaseTextualAnnotationParser
+        Actual parser, used to parse annotations of one resource at a time.
+        Its format must provide a `uri` field.
+    cache_size : int, optional
+        Number of resources whose annotations are kept in memory.
+        Defaults to 16.
+    persist : bool, optional
+        Set to False to not save the index next to the annotation file.
+    """
+
+    def __init__(self, parser, cache_size=16, persist=True):
+        super(IndexedAnnotationParser, self).__init__()
+
+        if URI not in parser.get_fields():
+            raise ValueError('indexed access requires a "%s" field.' % URI)
+
+        self.parser = parser
+        self.cache_size = cache_size
+        self.persist = persist
+
+        self.path = None
+        self.modality = None
+        self._index = {}
+        self._modalities = []
+        self._cache = OrderedDict()
+
+    def __get_uris(self):
+        return sorted(self._index)
+    uris = property(fget=__get_uris)
+    """"""
+
+    def __get_modalities(self):
+        return self._modalities
+    modalities = property(fget=__get_modalities)
+    """"""
+
+    def read(self, path, modality=None, **kwargs):
+        """Index annotation file
+
+        The index is loaded from `<path>.index.json` when it is up to date.
+        Otherwise, it is computed (and saved, unless `persist` is False).
+
+        Parameters
+        ----------
+        path : str
+        modality : str, optional
+            Only taken into account when file format does not provide
+            any field related to modality (see parser `read` method).
+        """
+
+        stat = os.stat(path)
+        key = {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+        index_path = INDEX % path
+
+        data = None
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    data = json.load(f)
+            except ValueError:
+                data = None
+            if data is not None and data.get('key') != key:
+                data = None
+
+        if data is None:
+            index, modalities = _get_index(
+                path, self.parser.get_separator(), self.parser.get_comment(),
+                self.parser.get_fields())
+            data = {'key': key, 'index': index, 'modalities': modalities}
+            if self.persist:
+                try:
+                    # serialize first so that no partial index is written
+                    # when file is not utf8 encoded
+                    dumped = json.dumps(data)
+                    with open(index_path, 'w') as f:
+                        f.write(dumped)
+                except (IOError, UnicodeDecodeError):
+                    # e.g. read-only directory
+                    pass
+
+        self.path = path
+        self.modality = modality
+        # json gives back unicode strings but parsers generate str
+        self._index = {_encode(uri): ranges
+                       for uri, ranges in data['index'].iteritems()}
+        self._modalities = [_encode(m) for m in data['modalities']]
+        if MODALITY not in self.parser.get_fields():
+            if modality is None:
+                modality = self.parser.get_default_modality()
+            self._modalities = [modality if modality is not None else ""]
+        self._cache.clear()
+
+        return self
+
+    def _load(self, uri):
+        """Parse annotations of one resource
+
+        Returns
+        -------
+        loaded : dict
+            {modality: annotation} dictionary
+        """
+
+        if uri in self._cache:
+            # move to the end (i.e. most recently used)
+            loaded = self._cache.pop(uri)
+            self._cache[uri] = loaded
+            return loaded
+
+        buf = StringIO()
+        with open(self.path, 'rb') as f:
+            for start, end in self._index[uri]:
+                f.seek(start)
+                buf.write(f.read(end - start))
+        buf.seek(0)
+
+        self.parser.read(buf, modality=self.modality)
+        loaded = {m: annotation
+                  for (_, m), annotation in self.parser._loaded.iteritems()}
+
+        self._cache[uri] = loaded
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return loaded
+
+    def __call__(self, uri=None, modality=None, **kwargs):
+        """
+
+        Parameters
+        ----------
+        uri : str, optional
+            If None and there is more than one resource
+        modality : str, optional
+
+        Returns
+        -------
+        annotation : :class:`Annotation`
+
+        """
+
+        if uri is None:
+            if len(self._index) > 1:
+                raise ValueError(
+                    'Found more than one resource: %s' % self.uris)
+            uri = self.uris[0] if self._index else None
+
+        if uri not in self._index:
+            return Annotation(uri=uri, modality=modality)
+
+        match = self._load(uri)
+
+        if modality is not None:
+            match = {m: ann for m, ann in match.iteritems() if m == modality}
+
+        if len(match) == 0:
+            return Annotation(uri=uri, modality=modality)
+        elif len(match) == 1:
+            return match.values()[0]
+        else:
+            raise ValueError(
+                'Found more than one matching annotation: %s' % match.keys())
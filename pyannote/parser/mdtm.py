@@ -26,7 +26,8 @@ for time regions within a recorded waveform.
 
 from pyannote.base.segment import Segment
 from pyannote.base import URI, MODALITY, LABEL
-from base import BaseTextualFormat, BaseTextualAnnotationParser
+from base import BaseTextualFormat, BaseTextualAnnotationParser, \
+    get_segments
 
 
 class MDTMMixin(BaseTextualFormat):
@@ -56,17 +57,26 @@ class MDTMMixin(BaseTextualFormat):
     def get_segment(self, row):
         return Segment(row[self.START], row[self.START]+row[self.DURATION])
 
-    def _append(self, annotation, f, uri, modality):
+    def get_segments(self, df):
+        start = df[self.START].values
+        return get_segments(start, start + df[self.DURATION].values)
+
+    def _format(self, annotation, uri, modality):
 
         try:
             format = '%s 1 %%g %%g %s NA %%s %%s\n' % (uri, modality)
-            for segment, track, label in annotation.itertracks(label=True):
-                f.write(format % (segment.start, segment.duration,
-                                  track, label))
+            # format all tracks at once
+            return ''.join([
+                format % (segment.start, segment.duration, track, label)
+                for segment, track, label in annotation.itertracks(label=True)
+            ])
         except Exception, e:
             print "Error @ %s%s %s %s" % (uri, segment, track, label)
             raise e
 
+    def _append(self, annotation, f, uri, modality):
+        f.write(self._format(annotation, uri, modality))
+
 
 class MDTMParser(BaseTextualAnnotationParser, MDTMMixin):
     pass
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+PAB (PyAnnote Binary) is a compact binary container for annotations,
+timelines and scores of multiple resources.
+
+File layout:
+
+  - 16 bytes magic string,
+  - one block per stored object: float64 start and end times, int32 track
+    and label codes (annotations), int32 track codes and float64 values
+    (scores) -- integer tracks are stored as int64 values instead of codes,
+  - JSON footer: string table (uris, modalities, tracks and labels) and
+    per-object index (kind, uri, modality and offset of each array),
+  - uint64 offset of the JSON footer.
+
+Files are memory-mapped when read, and objects are only built on demand.
+"""
+
+import os
+import json
+import struct
+import numpy as np
+from pandas import DataFrame, MultiIndex
+
+from pyannote.base.timeline import Timeline
+from pyannote.base.annotation import Annotation, Unknown
+from pyannote.base.scores import Scores
+from pyannote.base import SEGMENT, TRACK
+from base import get_segments
+
+MAGIC = 'PYANNOTE-PAB\x01\x00\x00\x00'
+FOOTER = '<Q'
+
+ANNOTATION = 'annotation'
+TIMELINE = 'timeline'
+SCORES = 'scores'
+
+
+class _StringTable(object):
+    """Uris, modalities, tracks and labels <--> int codes"""
+
+    def __init__(self):
+        super(_StringTable, self).__init__()
+        self.codes = {}
+        self.entries = []
+
+    def encode(self, value):
+
+        if value is None:
+            key = entry = ('n', None)
+        elif isinstance(value, Unknown):
+            key, entry = value, ('U', value._format)
+        elif isinstance(value, bool):
+            key = entry = ('b', value)
+        elif isinstance(value, (int, long, np.integer)):
+            key = entry = ('i', int(value))
+        elif isinstance(value, (float, np.floating)):
+            key = entry = ('f', float(value))
+        elif isinstance(value, str):
+            try:
+                key, entry = ('s', value), ('s', value.decode('utf8'))
+            except UnicodeDecodeError:
+                # not utf8 (e.g. latin-1) byte string: latin-1 decoding
+                # maps each byte to one code point and is therefore lossless
+                key, entry = ('s', value), ('S', value.decode('latin-1'))
+        elif isinstance(value, unicode):
+            key = entry = ('u', value)
+        else:
+            raise ValueError('unsupported value type (%s).' % type(value))
+
+        if key not in self.codes:
+            self.codes[key] = len(self.entries)
+            self.entries.append(entry)
+
+        return self.codes[key]
+
+    @classmethod
+    def decode(cls, entries):
+        """Decoded string table (as a list)"""
+
+        values = []
+        for kind, value in entries:
+            if kind == 'n':
+                value = None
+            elif kind == 'U':
+                value = Unknown(format=str(value))
+            elif kind == 'b':
+                value = bool(value)
+            elif kind == 'i':
+                value = int(value)
+            elif kind == 'f':
+                value = float(value)
+            elif kind == 's':
+                value = value.encode('utf8')
+            elif kind == 'S':
+                value = value.encode('latin-1')
+            values.append(value)
+        return values
+
+
+class PABParser(object):
+
+    def __init__(self):
+        super(PABParser, self).__init__()
+        self.reset()
+
+    def reset(self):
+        self._data = None
+        self._objects = {}
+        self._strings = []
+        self._loaded = {}
+
+    def __get_uris(self):
+        return sorted(set([v for (v, m) in self._objects]))
+    uris = property(fget=__get_uris)
+    """"""
+
+    def __get_modalities(self):
+        return sorted(set([m for (v, m) in self._objects]))
+    modalities = property(fget=__get_modalities)
+    """"""
+
+    # --- writing ---
+
+    def _write_array(self, f, offset, array):
+        """Write array at 8-bytes aligned offset
+
+        Returns
+        -------
+        position : int
+            Array position in file
+        offset : int
+            Current offset
+        """
+        padding = -offset % 8
+        f.write('\x00' * padding)
+        data = np.ascontiguousarray(array).tostring()
+        f.write(data)
+        return offset + padding, offset + padding + len(data)
+
+    def _encode_tracks(self, entry, table, tracks):
+        """Integer tracks are stored as is, others go through string table"""
+        if all(isinstance(t, (int, long)) and not isinstance(t, bool)
+               for t in tracks):
+            entry['track_dtype'] = '<i8'
+            return np.array(tracks, dtype='<i8')
+        entry['track_dtype'] = '<i4'
+        return np.array([table.encode(t) for t in tracks], dtype='<i4')
+
+    def _write_all(self, objects, f):
+
+        table = _StringTable()
+        index = []
+        # objects are indexed by (uri, modality)
+        keys = set()
+
+        f.write(MAGIC)
+        offset = len(MAGIC)
+
+        for obj in objects:
+
+            entry = {'uri': table.encode(obj.uri)}
+
+            if isinstance(obj, Timeline):
+                entry['kind'] = TIMELINE
+                entry['modality'] = table.encode(None)
+                segments = list(obj)
+                columns = {}
+
+            elif isinstance(obj, Annotation):
+                entry['kind'] = ANNOTATION
+                entry['modality'] = table.encode(obj.modality)
+                tracks = list(obj.itertracks(label=True))
+                segments = [s for s, _, _ in tracks]
+                columns = {
+                    'track': self._encode_tracks(
+                        entry, table, [t for _, t, _ in tracks]),
+                    'label': np.array([table.encode(l) for _, _, l in tracks],
+                                      dtype='<i4'),
+                }
+
+            elif isinstance(obj, Scores):
+                entry['kind'] = SCORES
+                entry['modality'] = table.encode(obj.modality)
+                df = obj._df
+                segments = [s for s, _ in df.index]
+                entry['columns'] = [table.encode(l) for l in df.columns]
+                columns = {
+                    'track': self._encode_tracks(
+                        entry, table, [t for _, t in df.index]),
+                    'value': np.array(df.values, dtype='<f8'),
+                }
+
+            else:
+                raise ValueError('unsupported object type (%s).' % type(obj))
+
+            key = (entry['uri'], entry['modality'])
+            if key in keys:
+                raise ValueError(
+                    'more than one object for uri %r and modality %r.' %
+                    (obj.uri, getattr(obj, 'modality', None)))
+            keys.add(key)
+
+            entry['n'] = len(segments)
+            columns['start'] = np.array([s.start for s in segments],
+                                        dtype='<f8')
+            columns['end'] = np.array([s.end for s in segments],
+                                      dtype='<f8')
+
+            for name in sorted(columns):
+                entry[name], offset = self._write_array(
+                    f, offset, columns[name])
+
+            index.append(entry)
+
+        footer = json.dumps({'version': 1,
+                             'strings': table.entries,
+                             'objects': index})
+        f.write(footer)
+        f.write(struct.pack(FOOTER, offset))
+
+    def write_all(self, objects, f):
+        """Write annotations, timelines and scores
+
+        Parameters
+        ----------
+        objects : iterable
+            `Annotation`, `Timeline` or `Scores` iterable (e.g. a generator).
+        f : file or str
+            Binary file (or path).
+
+        Raises
+        ------
+        ValueError
+            If more than one object share the same uri and modality
+            (timelines have None modality), since they could not be told
+            apart when reading.
+        """
+
+        if isinstance(f, file):
+            self._write_all(objects, f)
+            f.flush()
+            return
+
+        g = open(f, 'wb')
+        try:
+            with g:
+                self._write_all(objects, g)
+        except:
+            # do not leave incomplete file behind
+            os.remove(f)
+            raise
+
+    def write(self, obj, f, uri=None, modality=None):
+        """Write one annotation, timeline or scores
+
+        Parameters
+        ----------
+        obj : `Annotation`, `Timeline` or `Scores`
+        f : file or str
+            Binary file (or path).
+        uri, modality : str, optional
+            Override `obj` attributes
+        """
+
+        if uri is not None or modality is not None:
+            obj = obj.copy()
+            if uri is not None:
+                obj.uri = uri
+            if modality is not None:
+                obj.modality = modality
+
+        self.write_all([obj], f)
+
+    # --- reading ---
+
+    def read(self, path, uri=None, modality=None, **kwargs):
+        """Memory-map file and load its index
+
+        Objects are only built when requested.
+        """
+
+        self.reset()
+
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        if data[:len(MAGIC)].tostring() != MAGIC:
+            raise IOError('%s is not a PAB file.' % path)
+
+        offset, = struct.unpack(FOOTER, data[-8:].tostring())
+        footer = json.loads(data[offset:-8].tostring())
+
+        self._data = data
+        self._strings = _StringTable.decode(footer['strings'])
+        for entry in footer['objects']:
+            key = (self._strings[entry['uri']],
+                   self._strings[entry['modality']])
+            self._objects[key] = entry
+
+        return self
+
+    def _array(self, position, dtype, count):
+        dtype = np.dtype(dtype)
+        return self._data[position:position + count * dtype.itemsize]\
+            .view(dtype)
+
+    def _build(self, entry):
+
+        n = entry['n']
+        strings = self._strings
+        uri = strings[entry['uri']]
+        modality = strings[entry['modality']]
+
+        segments = get_segments(self._array(entry['start'], '<f8', n),
+                                self._array(entry['end'], '<f8', n))
+
+        if entry['kind'] == TIMELINE:
+            return Timeline(segments=segments, uri=uri)
+
+        tracks = self._array(entry['track'], entry['track_dtype'], n)
+        if entry['track_dtype'] == '<i8':
+            tracks = tracks.tolist()
+        else:
+            tracks = [strings[t] for t in tracks]
+
+        if entry['kind'] == ANNOTATION:
+            labels = [strings[l] for l in self._array(entry['label'],
+                                                       '<i4', n)]
+            return Annotation.from_arrays(segments, tracks, labels,
+                                          uri=uri, modality=modality)
+
+        # scores
+        columns = [strings[l] for l in entry['columns']]
+        values = self._array(entry['value'], '<f8', n * len(columns))
+        scores = Scores(uri=uri, modality=modality)
+        if n:
+            index = MultiIndex.from_tuples(zip(segments, tracks),
+                                           names=[SEGMENT, TRACK])
+        else:
+            index = scores._df.index
+        scores._df = DataFrame(np.array(values).reshape((n, len(columns))),
+                               index=index, columns=columns)
+        return scores
+
+    def iterobjects(self):
+        """Iterate over all stored objects (building them if needed)"""
+        for key, entry in sorted(self._objects.iteritems()):
+            if key not in self._loaded:
+                self._loaded[key] = self._build(entry)
+            yield self._loaded[key]
+
+    def __call__(self, uri=None, modality=None, **kwargs):
+        """
+
+        Parameters
+        ----------
+        uri : str, optional
+            If None and there is more than one resource
+        modality : str, optional
+
+        Returns
+        -------
+        obj : `Annotation`, `Timeline` or `Scores`
+
+        """
+
+        match = dict(self._objects)
+
+        # filter out all objects
+        # but the ones for the requested resource
+        if uri is not None:
+            match = {(v, m): e for (v, m), e in match.iteritems() if v == uri}
+
+        # filter out all remaining objects
+        # but the ones for the requested modality
+        if modality is not None:
+            match = {(v, m): e for (v, m), e in match.iteritems()
+                     if m == modality}
+
+        if len(match) == 0:
+            return Annotation(uri=uri, modality=modality)
+        elif len(match) > 1:
+            raise ValueError(
+                'Found more than one matching object: %s' % match.keys())
+
+        key, entry = match.items()[0]
+        if key not in self._loaded:
+            self._loaded[key] = self._build(entry)
+        return self._loaded[key]
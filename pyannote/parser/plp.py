@@ -71,7 +71,8 @@ class PLPParser(BaseBinaryPeriodicFeatureParser):
 
         # read number of features per record
         count_type = np.dtype('<i4')
-        count = np.fromfile(fp, dtype=count_type, count=nrec, sep='')
+        count = np.frombuffer(fp.read(nrec * count_type.itemsize),
+                              dtype=count_type)
 
         dtype = np.dtype(('<f4', (dim, )))
         count = np.sum(count)
@@ -21,7 +21,7 @@
 
 from pyannote.base.segment import Segment
 from pyannote.base import URI, MODALITY, LABEL
-from base import BaseTextualAnnotationParser, BaseTextualFormat
+from base import BaseTextualAnnotationParser, BaseTextualFormat, get_segments
 
 
 class REFMixin(BaseTextualFormat):
@@ -45,6 +45,9 @@ class REFMixin(BaseTextualFormat):
     def get_segment(self, row):
         return Segment(row[self.START], row[self.END])
 
+    def get_segments(self, df):
+        return get_segments(df[self.START].values, df[self.END].values)
+
     def _append(self, annotation, f, uri, modality):
 
         try:
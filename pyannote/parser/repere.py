@@ -32,7 +32,8 @@ from pyannote.base import URI, MODALITY, LABEL, SCORE
 from base import \
     BaseTextualAnnotationParser, \
     BaseTextualScoresParser, \
-    BaseTextualFormat
+    BaseTextualFormat, \
+    get_segments
 
 
 def get_show_name(uri):
@@ -99,6 +100,9 @@ class REPEREMixin(BaseTextualFormat):
     def get_segment(self, row):
         return Segment(row[self.START], row[self.END])
 
+    def get_segments(self, df):
+        return get_segments(df[self.START].values, df[self.END].values)
+
     def _append(self, annotation, f, uri, modality):
         try:
             format = '%s %%g %%g %s %%s\n' % (uri, modality)
@@ -135,6 +139,9 @@ class REPEREScoreMixin(BaseTextualFormat):
     def get_segment(self, row):
         return Segment(row[self.START], row[self.END])
 
+    def get_segments(self, df):
+        return get_segments(df[self.START].values, df[self.END].values)
+
     def _append(self, scores, f, uri, modality):
         try:
             format = '%s %%g %%g %s %%s %%g\n' % (uri, modality)
@@ -20,20 +20,33 @@
 
 import uem
 import srt
+import pab
+import compressed
+import cache as _cache
 
 class TimelineParser(object):
 
     supported = {
         '.uem': uem.UEMParser,
         '.srt': srt.SRTParser,
+        '.pab': pab.PABParser,
     }
 
     def __guess(self, extension):
         return TimelineParser.supported.get(extension, None)
 
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        Parameters
+        ----------
+        cache : `ParseCache`, optional
+            On-disk cache of parsed files.
+            Defaults to the one configured by PYANNOTE_CACHE environment
+            variable (see `pyannote.parser.cache`), if any.
+        """
         super(TimelineParser, self).__init__()
         self.__parser = None
+        self.__cache = _cache.get_cache() if cache is None else cache
 
     def __get_uris(self):
         return self.__parser.uris
@@ -41,12 +54,21 @@ class TimelineParser(object):
 
     def read(self, path, uri=None, **kwargs):
         import os
-        _, extension = os.path.splitext(path)
+        # file.uem.gz is guessed as .uem
+        _, extension = os.path.splitext(compressed.strip_extension(path))
         GuessParser = self.__guess(extension)
         if GuessParser is None:
             raise NotImplementedError(
                 "unsupported file format '%s'. supported: %s." %
                 (extension, TimelineParser.supported.keys()))
+        # only the first file goes through the cache (later files are
+        # parsed and accumulated into the very same parser, as usual).
+        # files already in PAB format are not cached.
+        if self.__cache is not None and self.__parser is None and \
+           isinstance(path, basestring) and GuessParser is not pab.PABParser:
+            self.__parser = self.__cache.read(
+                GuessParser(), path, uri=uri, **kwargs)
+            return self
         if self.__parser is None or not isinstance(self.__parser, GuessParser):
             self.__parser = GuessParser()
         self.__parser.read(path, uri=uri, **kwargs)
@@ -29,9 +29,9 @@ http://transag.sourceforge.net/
 import re
 
 try:
-    from lxml import objectify
-except:
-    pass
+    from lxml.etree import iterparse
+except ImportError:
+    from xml.etree.cElementTree import iterparse
 
 from pyannote.base.segment import Segment
 from base import BaseAnnotationParser
@@ -75,76 +75,68 @@ class TRSParser(BaseAnnotationParser):
         return labels
 
     def read(self, path, uri=None, **kwargs):
+        """Read .trs file
 
-
-        # objectify xml file and get root
-        root = objectify.parse(path).getroot()
-
-        # if uri is not provided, infer (part of) it from .trs file
-        if uri is None:
-            uri = root.get('audio_filename')
+        Sections and speech turns are added as they are parsed (using an
+        incremental parser), and processed XML elements are cleared on the
+        go, so that memory does not grow with the size of the document.
+        """
 
         # speaker names and genders
         name = {}
         gender = {}
-        for speaker in root.Speakers.iterchildren():
-            name[speaker.get('id')] = speaker.get('name')
-            gender[speaker.get('id')] = speaker.get('type')
-
-        # # incomplete segments
-        # # ie without an actual end time
-        # self._incomplete = []
 
         # speech turn number
         track = 0
 
-        for section in root.Episode.iterchildren():
+        # currently open elements
+        ancestors = []
 
-            # transcription status (report or nontrans)
-            section_start = float(section.get('startTime'))
-            section_end = float(section.get('endTime'))
-            section_segment = Segment(start=section_start, end=section_end)
-            label = section.get('type')
-            self._add(section_segment, None, label, uri, 'status')
+        for event, element in iterparse(path, events=('start', 'end')):
 
-            # # sync
-            # self._sync = section_start
-            # self._complete()
+            tag = element.tag
 
-            for turn in section.iterchildren():
+            # processed elements are not needed anymore: empty them and
+            # detach them from their parent so that memory does not grow
+            if event == 'end':
+                ancestors.pop()
+                if tag in ['Speaker', 'Turn', 'Section']:
+                    element.clear()
+                    ancestors[-1].remove(element)
+                continue
 
-                # get speech turn start/end time
-                turn_start = float(turn.get('startTime'))
-                turn_end = float(turn.get('endTime'))
-                turn_segment = Segment(start=turn_start, end=turn_end)
+            ancestors.append(element)
 
-                labels = self._parse_speakers(turn)
-                for label in labels:
-                    self._add(turn_segment, track, name[label], uri, 'speaker')
-                    track = track + 1
+            # if uri is not provided, infer (part of) it from .trs file
+            if tag == 'Trans':
+                if uri is None:
+                    uri = element.get('audio_filename')
 
-                # self._sync = turn_start
-                # self._complete()
+            elif tag == 'Speaker':
+                name[element.get('id')] = element.get('name')
+                gender[element.get('id')] = element.get('type')
 
-                # for element in turn.iterchildren():
+            elif tag == 'Section':
 
-                #     if element.tag == 'Sync':
-                #         self._sync = float(element.get('time'))
-                #         self._complete()
+                # transcription status (report or nontrans)
+                section_start = float(element.get('startTime'))
+                section_end = float(element.get('endTime'))
+                section_segment = Segment(start=section_start,
+                                          end=section_end)
+                label = element.get('type')
+                self._add(section_segment, None, label, uri, 'status')
 
-                #     element_segment = Segment(
-                #         start=self._sync,
-                #         end=self._sync+2*SEGMENT_PRECISION)
-                #     self._incomplete.append(element_segment)
-                #     labels = self._parse_spoken(element)
-                #     for label in labels:
-                #         self._add(element_segment, None, label, uri, 'spoken')
+            elif tag == 'Turn':
 
-                # self._sync = turn_end
-                # self._complete()
+                # get speech turn start/end time
+                turn_start = float(element.get('startTime'))
+                turn_end = float(element.get('endTime'))
+                turn_segment = Segment(start=turn_start, end=turn_end)
 
-            # self._sync = section_end
-            # self._complete()
+                labels = self._parse_speakers(element)
+                for label in labels:
+                    self._add(turn_segment, track, name[label], uri, 'speaker')
+                    track = track + 1
 
         return self
 
@@ -20,7 +20,7 @@
 
 from pyannote.base.segment import Segment
 from pyannote.base import URI, TRACK, LABEL, SCORE
-from base import BaseTextualScoresParser, BaseTextualFormat
+from base import BaseTextualScoresParser, BaseTextualFormat, get_segments
 
 
 class TVMMixin(BaseTextualFormat):
@@ -48,6 +48,10 @@ class TVMMixin(BaseTextualFormat):
     def get_segment(self, row):
         return Segment(row[self.START], row[self.START]+row[self.DURATION])
 
+    def get_segments(self, df):
+        start = df[self.START].values
+        return get_segments(start, start + df[self.DURATION].values)
+
     def get_converters(self):
         # 'head_52' ==> '52'
         #return {TRACK: lambda x: x.split('_')[1]}
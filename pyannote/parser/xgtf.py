@@ -28,9 +28,9 @@ http://viper-toolkit.sourceforge.net/
 
 import re
 try:
-    from lxml import objectify
-except:
-    pass
+    from lxml.etree import iterparse
+except ImportError:
+    from xml.etree.cElementTree import iterparse
 from pyannote import Segment, Timeline, Annotation
 from base import BaseAnnotationParser
 from idx import IDXParser
@@ -52,16 +52,57 @@ class XGTFParser(BaseAnnotationParser):
         m = p.match(string)
         return self.__idx[int(m.group(1))]
 
+    def _iter_elements(self, path_xgtf):
+        """Iterate over (uri, element) pairs
+
+        Yields each child element of (the first) `sourcefile` element once it
+        is completely parsed. Children of all `sourcefile` elements are
+        emptied and detached from their parent right after they are processed
+        so that memory does not grow with the number of elements.
+        """
+
+        # currently open elements
+        ancestors = []
+        # depth of current sourcefile element (if any)
+        sourcefile = None
+        first = True
+
+        for event, element in iterparse(path_xgtf, events=('start', 'end')):
+
+            if event == 'start':
+                ancestors.append(element)
+                if sourcefile is None and \
+                   element.tag.rsplit('}', 1)[-1] == 'sourcefile':
+                    sourcefile = len(ancestors)
+                    uri = element.get('filename')
+                continue
+
+            depth = len(ancestors)
+            ancestors.pop()
+
+            if sourcefile is None:
+                continue
+
+            if depth == sourcefile + 1:
+                if first:
+                    yield uri, element
+                element.clear()
+                ancestors[-1].remove(element)
+
+            elif depth == sourcefile:
+                sourcefile = None
+                first = False
+
     def _parse_head(self, vpr):
-        return vpr.getchildren()[0].get('value')
+        return vpr[0].get('value')
 
     def _parse_time(self, vpr):
-        return self.__idx(int(vpr.getchildren()[0].get('value')))
+        return self.__idx(int(vpr[0].get('value')))
 
     def _parse_cartouche(self, vpr):
-        children = vpr.getchildren()
+        children = list(vpr)
         if children:
-            return vpr.getchildren()[0].get('value')
+            return vpr[0].get('value')
         else:
             return False
 
@@ -74,7 +115,7 @@ class XGTFParser(BaseAnnotationParser):
             If True, only keep written names that are alone on their text line
             If False (default), keep them all
         """
-        string = vpr.getchildren()[0].get('value')
+        string = vpr[0].get('value')
         if not string:
             return []
 
@@ -105,11 +146,7 @@ class XGTFParser(BaseAnnotationParser):
         # frame <--> timestamp mapping
         self.__idx.read(path_idx)
 
-        # objectify xml file and get root
-        root = objectify.parse(path_xgtf).getroot().data.sourcefile
-
-        if uri is None:
-            uri = root.get('filename')
+        annotated = None
 
         # head = []
         # written = []
@@ -124,12 +161,14 @@ class XGTFParser(BaseAnnotationParser):
 
         # return annotated
 
-        annotated = Annotation(uri=uri, modality='annotated')
-        head = Annotation(uri=uri, modality='head')
-
         head_set = set([])
 
-        for element in root.iterchildren():
+        for filename, element in self._iter_elements(path_xgtf):
+
+            if annotated is None:
+                if uri is None:
+                    uri = filename
+                annotated = Annotation(uri=uri, modality='annotated')
 
             frame_segment = self._parse_frame(element)
             annotated[frame_segment, '_'] = '_'
@@ -139,7 +178,7 @@ class XGTFParser(BaseAnnotationParser):
 
             label = None
 
-            for vpr in element.iterchildren():
+            for vpr in element:
 
                 attr_name = vpr.get('name')
 
@@ -159,6 +198,10 @@ class XGTFParser(BaseAnnotationParser):
                 element_segment = Segment(start=element_start, end=element_end)
                 head_set.add((element_segment, label))
 
+        if annotated is None:
+            annotated = Annotation(uri=uri, modality='annotated')
+
+        head = Annotation(uri=uri, modality='head')
         for segment, label in head_set:
             head[segment, head.new_track(segment)] = label
 
@@ -223,7 +266,7 @@ class XGTFParser(BaseAnnotationParser):
         # return self
 
     def _get_transcription(self, vpr):
-        string = vpr.getchildren()[0].get('value')
+        string = vpr[0].get('value')
         if not string:
             return ""
         return string
@@ -231,17 +274,15 @@ class XGTFParser(BaseAnnotationParser):
     def print_raw_text(self, path_xgtf):
 
         string = ""
-        # objectify xml file and get root
-        root = objectify.parse(path_xgtf).getroot().data.sourcefile
 
-        for element in root.iterchildren():
+        for _, element in self._iter_elements(path_xgtf):
 
             if element.get('name') == 'TEXTE':
 
                 transcription = ""
                 cartouche = False
 
-                for vpr in element.iterchildren():
+                for vpr in element:
 
                     attr_name = vpr.get('name')
                     if attr_name == 'TRANSCRIPTION':
@@ -191,3 +191,61 @@ def logsumexp(a, b=None, axis=0):
         out = np.log(np.sum(b * np.exp(a - vmax), axis=0))
     out += vmax
     return out
+
+
+def llr2posterior(llr, priors, unknown_prior=0., out=None):
+    """{Over|under}flow-robust conversion of log-likelihood ratios
+    into open-set posterior probabilities
+
+                            priors[j] . exp(llr[i, j])
+    out[i, j] = ---------------------------------------------------
+                unknown_prior + sum_k priors[k] . exp(llr[i, k])
+
+    Parameters
+    ----------
+    llr : (n_tracks, n_targets) numpy array
+        Log-likelihood ratios. NaN values are considered missing: they do not
+        contribute to the denominator and their posterior is NaN.
+    priors : (n_targets, ) numpy array
+        Target priors
+    unknown_prior : float, optional
+        Prior probability of an unknown target. Defaults to 0 (i.e. close-set)
+    out : (n_tracks, n_targets) numpy array, optional
+        Contiguous float64 array where to store posterior probabilities.
+        Use out=llr to compute posterior probabilities in place.
+
+    Returns
+    -------
+    posterior : (n_tracks, n_targets) numpy array
+        Posterior probabilities (`out` if provided).
+    """
+
+    llr = np.asarray(llr, dtype=np.float64)
+    priors = np.asarray(priors, dtype=np.float64)
+
+    if out is None:
+        out = np.empty(llr.shape, dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+
+        # best (non-missing) log-likelihood ratio of each track
+        # unknown target has log-likelihood ratio 0 by definition
+        vmax = np.max(np.where(np.isnan(llr), -np.inf, llr),
+                      axis=1, keepdims=True)
+        if unknown_prior > 0.:
+            np.maximum(vmax, 0., out=vmax)
+        vmax[~np.isfinite(vmax)] = 0.
+
+        # numerator, shifted by vmax
+        np.subtract(llr, vmax, out=out)
+        np.exp(out, out=out)
+        out *= priors
+
+        # denominator, shifted by vmax
+        denominator = np.nansum(out, axis=1, keepdims=True)
+        if unknown_prior > 0.:
+            denominator += unknown_prior * np.exp(-vmax)
+
+        out /= denominator
+
+    return out
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Log-space Viterbi decoding with minimum duration constraints"""
+
+import numpy as np
+
+
+def _expand(n_states, min_duration):
+    """Expand each state into a left-to-right chain of sub-states
+
+    State s with minimum duration d is replaced by d sub-states: sub-state k
+    can only be followed by sub-state k+1 and only the last sub-state can
+    loop or exit to another state.
+
+    Returns
+    -------
+    states : numpy array
+        Original state of each sub-state.
+    first, last : numpy array
+        Index of first (resp. last) sub-state of each state.
+    """
+
+    if min_duration is None:
+        min_duration = 1
+    duration = np.ones((n_states, ), dtype=int) * min_duration
+    duration = np.maximum(1, duration)
+
+    states = np.repeat(np.arange(n_states), duration)
+    last = np.cumsum(duration) - 1
+    first = last - duration + 1
+
+    return states, first, last
+
+
+def viterbi_decoding(emission, transition, initial=None, min_duration=None):
+    """Log-space Viterbi decoding
+
+    Parameters
+    ----------
+    emission : (n_samples, n_states) array
+        Emission log-likelihoods (e.g. precomputed by state GMMs).
+    transition : (n_states, n_states) array
+        Transition log-probabilities (from row state to column state).
+    initial : (n_states, ) array, optional
+        Initial log-probabilities. Defaults to uniform.
+    min_duration : int or (n_states, ) array, optional
+        Minimum number of consecutive samples in each state.
+        Defaults to 1 (i.e. no constraint).
+
+    Returns
+    -------
+    sequence : (n_samples, ) array
+        Most likely state sequence.
+
+    Notes
+    -----
+    Minimum duration constraints are enforced by state expansion. Because of
+    the left-to-right structure of expanded states, each step only costs
+    O(n_expanded + n_states ** 2) operations instead of O(n_expanded ** 2).
+    The first `min_duration` - 1 self-transitions of a state are forced
+    (i.e. they do not cost any transition log-probability) and the last
+    state is allowed to be shorter than its minimum duration.
+    """
+
+    emission = np.asarray(emission, dtype=np.float64)
+    transition = np.asarray(transition, dtype=np.float64)
+
+    T, K = emission.shape
+
+    if initial is None:
+        initial = np.tile(-np.log(K), (K, ))
+    initial = np.asarray(initial, dtype=np.float64)
+
+    states, first, last = _expand(K, min_duration)
+    N = len(states)
+
+    # sub-states fed by the previous sub-state of the same chain
+    chained = np.setdiff1d(np.arange(N), first)
+    # states whose last sub-state is not their first sub-state
+    multi = np.where(last != first)[0]
+
+    # entering a state from the end of another state.
+    # for states with min_duration > 1, looping happens on the last
+    # sub-state (not by re-entering the first one)
+    enter = np.array(transition)
+    enter[multi, multi] = -np.inf
+    loop = np.diag(transition)[multi]
+
+    # likelihood of best path ending in each sub-state...
+    V = np.empty((N, ))
+    V.fill(-np.inf)
+    V[first] = initial + emission[0]
+
+    # ... and its previous sub-state
+    pointer = np.empty((T, N), dtype=int)
+    pointer[0] = -1
+
+    with np.errstate(invalid='ignore'):
+
+        for t in xrange(1, T):
+
+            previous = V
+            V = np.empty((N, ))
+
+            # go to next sub-state
+            V[chained] = previous[chained - 1]
+            pointer[t, chained] = chained - 1
+
+            # stay in last sub-state
+            stay = previous[last[multi]] + loop
+            better = stay > V[last[multi]]
+            V[last[multi[better]]] = stay[better]
+            pointer[t, last[multi[better]]] = last[multi[better]]
+
+            # enter first sub-state (from last sub-state of any state)
+            scores = previous[last][:, np.newaxis] + enter
+            best = np.argmax(scores, axis=0)
+            V[first] = scores[best, np.arange(K)]
+            pointer[t, first] = last[best]
+
+            V += emission[t, states]
+
+    # back-tracking
+    sequence = np.empty((T, ), dtype=int)
+    n = np.argmax(V)
+    for t in xrange(T-1, -1, -1):
+        sequence[t] = states[n]
+        n = pointer[t, n]
+
+    return sequence
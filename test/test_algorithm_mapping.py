@@ -18,6 +18,7 @@
 #     You should have received a copy of the GNU General Public License
 #     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
 
+import numpy as np
 from pyannote import Segment, Annotation
 from pyannote.algorithm.mapping import ConservativeDirectMapper
 from pyannote.algorithm.mapping import ArgMaxMapper
@@ -85,3 +86,19 @@ class test_algorithm_mapping(object):
         assert set(mapping['A']) == set(['a'])
         assert set(mapping['B']) == set(['b'])
         assert set(mapping['C']) == set(['c'])
+
+    def test_hungarian_mapper_backends(self):
+
+        random_state = np.random.RandomState(1337)
+        source = Annotation(uri='uri', modality='source')
+        target = Annotation(uri='uri', modality='target')
+        for t in range(30):
+            start = random_state.rand() * 100
+            source[Segment(start, start + 5), t] = 's%d' % (t % 7)
+            start = random_state.rand() * 100
+            target[Segment(start, start + 5), t] = 't%d' % (t % 12)
+
+        expected = HungarianMapper(backend='munkres')(source, target)
+        mapping = HungarianMapper(backend='scipy')(source, target)
+        for label in source.labels():
+            assert set(mapping[label]) == set(expected[label])
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import time
+import shutil
+import tempfile
+from nose.plugins.skip import SkipTest
+from pyannote import Annotation, Timeline, Segment, Unknown
+
+try:
+    # sklearn.hmm is gone from recent scikit-learn
+    from pyannote.algorithm.pipeline import DiarizationPipeline, \
+        _dump, _load
+except ImportError, e:
+    raise SkipTest('pyannote.algorithm.pipeline cannot be imported: %s' % e)
+
+
+class _Stage(object):
+    """Stand-in for pipeline stages (only their parameters are hashed)"""
+
+    def __init__(self, **parameters):
+        super(_Stage, self).__init__()
+        self.__dict__.update(parameters)
+
+
+class test_algorithm_pipeline(object):
+
+    def setup(self):
+
+        self.tmp = tempfile.mkdtemp()
+
+        self.wav = os.path.join(self.tmp, 'file.wav')
+        with open(self.wav, 'w') as f:
+            f.write('RIFF')
+
+        self.sad = _Stage(hmm='sad', feature='mfcc')
+        self.segmentation = _Stage(segmentation='seg', feature='mfcc')
+
+        self.cache_dir = os.path.join(self.tmp, 'cache')
+
+    def teardown(self):
+        shutil.rmtree(self.tmp)
+
+    def _pipeline(self, **kwargs):
+        return DiarizationPipeline(self.sad, self.segmentation,
+                                   cache_dir=self.cache_dir, **kwargs)
+
+    def test_dump_load(self):
+
+        path = os.path.join(self.cache_dir, 'stage', 'result.pkl')
+
+        unknown = Unknown()
+        annotation = Annotation(uri='uri', modality='speaker')
+        annotation[Segment(0, 1), 0] = 'A'
+        annotation[Segment(1, 3), 1] = unknown
+        annotation[Segment(2, 4), 'x'] = unknown
+        _dump(annotation, path)
+
+        loaded = _load(path)
+        assert loaded.uri == 'uri'
+        assert loaded.modality == 'speaker'
+        tracks = list(loaded.itertracks(label=True))
+        assert [(s, t) for s, t, _ in tracks] == \
+            [(s, t) for s, t, _ in annotation.itertracks(label=True)]
+        assert tracks[0][2] == 'A'
+        # the same Unknown label is loaded as the same (new) Unknown label
+        assert isinstance(tracks[1][2], Unknown)
+        assert tracks[1][2] == tracks[2][2]
+        assert tracks[1][2] != unknown
+
+        timeline = Timeline([Segment(0, 1), Segment(2, 3)], uri='uri')
+        _dump(timeline, path)
+        loaded = _load(path)
+        assert isinstance(loaded, Timeline)
+        assert loaded.uri == 'uri'
+        assert list(loaded) == list(timeline)
+
+    def test_keys(self):
+
+        keys = self._pipeline()._get_keys(self.wav)
+
+        # changing clustering parameters only invalidates clustering
+        other = self._pipeline(penalty_coef=1.)._get_keys(self.wav)
+        for name in [DiarizationPipeline.SAD,
+                     DiarizationPipeline.SEGMENTATION]:
+            assert other[name] == keys[name]
+        assert other[DiarizationPipeline.CLUSTERING] != \
+            keys[DiarizationPipeline.CLUSTERING]
+
+        # changing upstream parameters invalidates downstream stages
+        self.segmentation.segmentation = 'other'
+        other = self._pipeline()._get_keys(self.wav)
+        assert other[DiarizationPipeline.SAD] == keys[DiarizationPipeline.SAD]
+        for name in [DiarizationPipeline.SEGMENTATION,
+                     DiarizationPipeline.CLUSTERING]:
+            assert other[name] != keys[name]
+
+        # modifying the file invalidates all stages
+        self.segmentation.segmentation = 'seg'
+        mtime = time.time() + 10
+        os.utime(self.wav, (mtime, mtime))
+        other = self._pipeline()._get_keys(self.wav)
+        for name in keys:
+            assert other[name] != keys[name]
+
+    def test_cached_uri(self):
+
+        pipeline = self._pipeline()
+        key = pipeline._get_keys(self.wav)[DiarizationPipeline.SAD]
+
+        def sad():
+            return Timeline([Segment(0, 1)], uri='A')
+
+        computed = pipeline._run(DiarizationPipeline.SAD, key, sad, uri='A')
+        assert computed.uri == 'A'
+
+        # uri is not part of the key: cached result is relabeled
+        cached = pipeline._run(DiarizationPipeline.SAD, key, None, uri='B')
+        assert cached.uri == 'B'
+        assert list(cached) == [Segment(0, 1)]
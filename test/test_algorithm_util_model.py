@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012-2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import shutil
+import tempfile
+import numpy as np
+from pyannote.algorithm.util.model import save_model, load_model, \
+    CREATED, DESCRIPTION
+
+
+class Model(object):
+
+    def __init__(self):
+        super(Model, self).__init__()
+        self.means = np.random.randn(16, 39)
+        self.weights = np.ones((16, ), dtype=np.float32) / 16
+        self.shared = {'means': self.means}
+        self.labels = np.array(['speech', None], dtype=object)
+        self.name = 'model'
+
+
+class test_algorithm_util_model(object):
+
+    def setup(self):
+        self.path = tempfile.mkdtemp()
+        self.model = Model()
+        save_model(self.path, {'model': self.model}, description='test')
+
+    def teardown(self):
+        shutil.rmtree(self.path)
+
+    def test_roundtrip(self):
+        data = load_model(self.path)
+        model = data['model']
+        assert data[DESCRIPTION] == 'test'
+        assert data[CREATED] is not None
+        assert model.name == 'model'
+        assert np.all(model.means == self.model.means)
+        assert model.weights.dtype == np.float32
+        assert list(model.labels) == ['speech', None]
+
+    def test_mmap(self):
+        model = load_model(self.path)['model']
+        assert isinstance(model.means, np.memmap)
+        assert model.shared['means'] is model.means
+        assert not model.means.flags.writeable
+
+    def test_cache(self):
+        model1 = load_model(self.path)['model']
+        model2 = load_model(self.path)['model']
+        # parameter arrays are shared...
+        assert model1.means is model2.means
+        assert model2.shared['means'] is model2.means
+        # ... but model structures are not
+        assert model1 is not model2
+        model1.name = 'modified'
+        model1.shared['other'] = 0
+        model1.weights = np.zeros((16, ), dtype=np.float32)
+        model3 = load_model(self.path)['model']
+        for model in [model2, model3]:
+            assert model.name == 'model'
+            assert 'other' not in model.shared
+            assert np.allclose(model.weights, 1. / 16)
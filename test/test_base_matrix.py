@@ -20,7 +20,8 @@
 
 
 import numpy as np
-from pyannote import LabelMatrix
+from pyannote import LabelMatrix, Annotation, Segment
+from pyannote.base.matrix import get_cooccurrence_matrix
 
 
 class test_base_matrix(object):
@@ -126,3 +127,20 @@ class test_base_matrix(object):
         )
 
         assert np.all((subset.df == s.df).values)
+
+    def test_cooccurrence(self):
+
+        R = Annotation()
+        R[Segment(0, 10), 'a'] = 'A'
+        R[Segment(5, 12), 'b'] = 'A'
+        R[Segment(12, 20), 'c'] = 'B'
+
+        C = Annotation()
+        C[Segment(2, 8), 'a'] = 1
+        C[Segment(8, 15), 'b'] = 2
+        C[Segment(9, 14), 'c'] = 1
+
+        K = get_cooccurrence_matrix(R, C)
+        assert K.get_rows() == ['A', 'B']
+        assert K.get_columns() == [1, 2]
+        assert np.allclose(K.df.values, [[9., 4.], [2., 3.]])
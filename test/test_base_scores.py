@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+from pyannote import Segment, Unknown
+from pyannote.base.scores import Scores
+
+
+class test_base_scores(object):
+
+    def setup(self):
+        self.segments = [Segment(2, 3), Segment(0, 1), Segment(0, 1),
+                         Segment(0, 1), Segment(0, 1), Segment(2, 3)]
+        self.tracks = ['t', 's2', 's1', 's1', 's1', 't']
+        self.labels = ['A', 'B', 'B', 'A', 'B', 'B']
+        self.values = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+
+    def teardown(self):
+        pass
+
+    def test_from_arrays(self):
+        scores = Scores.from_arrays(self.segments, self.tracks,
+                                    self.labels, self.values,
+                                    uri='uri', modality='speaker')
+        assert scores.uri == 'uri'
+        assert scores.labels() == ['A', 'B']
+        # rows are sorted and duplicate values are averaged
+        assert list(scores.itervalues()) == [
+            (Segment(0, 1), 's1', 'A', 0.4),
+            (Segment(0, 1), 's1', 'B', 0.4),
+            (Segment(0, 1), 's2', 'B', 0.2),
+            (Segment(2, 3), 't', 'A', 0.1),
+            (Segment(2, 3), 't', 'B', 0.6)]
+        assert np.isnan(scores[Segment(0, 1), 's2', 'A'])
+
+    def test_from_arrays_aggfunc(self):
+        scores = Scores.from_arrays(self.segments, self.tracks,
+                                    self.labels, self.values,
+                                    aggfunc=np.max)
+        assert scores[Segment(0, 1), 's1', 'B'] == 0.5
+
+    def test_empty(self):
+        scores = Scores.from_arrays([], [], [], [])
+        assert not scores
+
+    def test_nbest(self):
+        scores = Scores.from_arrays(self.segments, self.tracks,
+                                    self.labels, self.values)
+        rank = scores.rank()
+        assert rank[Segment(0, 1), 's1', 'B'] == 1
+        assert np.isnan(rank[Segment(0, 1), 's2', 'A'])
+        assert list(scores.nbest(1).itervalues()) == [
+            (Segment(0, 1), 's1', 'A', 0.4),
+            (Segment(0, 1), 's2', 'B', 0.2),
+            (Segment(2, 3), 't', 'B', 0.6)]
+
+    def test_to_annotation(self):
+        scores = Scores.from_arrays(self.segments, self.tracks,
+                                    self.labels, self.values)
+        annotation = scores.to_annotation(threshold=0.3)
+        assert sorted((s, t, isinstance(l, Unknown) or l)
+                      for s, t, l in annotation.itertracks(label=True)) == [
+            (Segment(0, 1), 's1', 'A'),
+            (Segment(0, 1), 's2', True),
+            (Segment(2, 3), 't', 'B')]
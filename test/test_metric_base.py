@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012-2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import tempfile
+import numpy as np
+from pyannote import Annotation, Segment
+from pyannote.metric.identification import IdentificationErrorRate
+from pyannote.metric.diarization import DiarizationErrorRate, \
+    DiarizationPurity, DiarizationCoverage, \
+    DiarizationHomogeneity, DiarizationCompleteness
+from pyannote.metric.detection import DetectionErrorRate
+from pyannote.metric.context import EvaluationContext
+from pyannote.metric.parallel import evaluate
+
+
+class test_metric_base(object):
+
+    def setup(self):
+
+        np.random.seed(1337)
+
+        self.pairs = []
+        for uri in ['a', 'b', 'c', 'd']:
+            pair = []
+            for _ in range(2):
+                annotation = Annotation(uri=uri)
+                for t in range(10):
+                    start = 100 * np.random.rand()
+                    duration = 10 * np.random.rand()
+                    label = 'ABC'[np.random.randint(3)]
+                    annotation[Segment(start, start + duration), t] = label
+                pair.append(annotation)
+            self.pairs.append(pair)
+
+        self.metric = IdentificationErrorRate()
+        for reference, hypothesis in self.pairs:
+            self.metric(reference, hypothesis)
+
+    def teardown(self):
+        pass
+
+    def _assert_equal(self, metric):
+        assert np.allclose(abs(metric), abs(self.metric))
+        assert list(metric) == list(self.metric)
+        for name, value in self.metric[:].iteritems():
+            assert np.allclose(metric[name], value)
+        assert np.allclose(metric.confidence_interval()[0],
+                           self.metric.confidence_interval()[0])
+
+    def test_merge(self):
+        metric1 = IdentificationErrorRate()
+        metric2 = IdentificationErrorRate()
+        for reference, hypothesis in self.pairs[:2]:
+            metric1(reference, hypothesis)
+        for reference, hypothesis in self.pairs[2:]:
+            metric2(reference, hypothesis)
+        self._assert_equal(metric1.merge(metric2))
+
+    def test_dict(self):
+        data = json.loads(json.dumps(self.metric.to_dict()))
+        self._assert_equal(IdentificationErrorRate.from_dict(data))
+
+    def test_dump(self):
+        f = tempfile.TemporaryFile()
+        self.metric.dump(f)
+        f.seek(0)
+        self._assert_equal(IdentificationErrorRate.load(f))
+
+    def test_context(self):
+        reference, hypothesis = self.pairs[0]
+        context = EvaluationContext()
+        for Metric in [IdentificationErrorRate, DiarizationErrorRate,
+                       DiarizationPurity, DiarizationCoverage,
+                       DiarizationHomogeneity, DiarizationCompleteness,
+                       DetectionErrorRate]:
+            expected = Metric()(reference, hypothesis, detailed=True)
+            detail = Metric()(reference, hypothesis, detailed=True,
+                              context=context)
+            for name, value in expected.iteritems():
+                assert np.allclose(detail[name], value)
+
+    def test_evaluate_interleaved(self):
+
+        pairs = {reference.uri: (reference, [hypothesis])
+                 for reference, hypothesis in self.pairs}
+        swapped = {reference.uri: (hypothesis, [reference])
+                   for reference, hypothesis in self.pairs}
+        uris = sorted(pairs)
+
+        for n_jobs in [1, 2]:
+            metrics = [[IdentificationErrorRate()]]
+            other = [[DetectionErrorRate()]]
+            # uris as generators
+            first = evaluate((u for u in uris), pairs.get, metrics,
+                             n_jobs=n_jobs)
+            second = evaluate((u for u in uris), swapped.get, other,
+                              n_jobs=n_jobs)
+            for (u1, _), (u2, _) in zip(first, second):
+                assert u1 == u2
+            self._assert_equal(metrics[0][0])
+            expected = DetectionErrorRate()
+            for reference, hypothesis in self.pairs:
+                expected(hypothesis, reference)
+            assert np.allclose(abs(other[0][0]), abs(expected))
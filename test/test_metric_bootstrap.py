@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012-2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+from pyannote.metric.bootstrap import confidence_interval, \
+    pairwise_significance
+
+
+class test_metric_bootstrap(object):
+
+    def setup(self):
+        random_state = np.random.RandomState(1337)
+        self.values = random_state.rand(3, 200)
+        self.values[1] += 0.2
+        self.values[2] += 0.01
+        # (correct, total) components
+        self.components = np.dstack(
+            [self.values, np.ones(self.values.shape)])
+        self.rate = lambda C: C[:, 0] / C[:, 1]
+
+    def teardown(self):
+        pass
+
+    def test_confidence_interval(self):
+        value, (lower, upper) = confidence_interval(
+            self.values[0], random_state=0)
+        assert np.allclose(value, np.mean(self.values[0]))
+        assert lower < value < upper
+
+    def test_confidence_interval_components(self):
+        expected = confidence_interval(self.values[0], random_state=0)
+        value, (lower, upper) = confidence_interval(
+            self.components[0], rate=self.rate, random_state=0)
+        assert np.allclose(value, expected[0])
+        assert np.allclose([lower, upper], expected[1])
+
+    def test_pairwise_significance(self):
+        p = pairwise_significance(self.values, random_state=0)
+        assert p.shape == (3, 3)
+        assert np.allclose(p, p.T)
+        assert p[0, 1] < 0.05 and p[1, 2] < 0.05
+        assert p[0, 2] > 0.05
+
+    def test_pairwise_significance_components(self):
+        expected = pairwise_significance(self.values, random_state=0)
+        p = pairwise_significance(self.components, rate=self.rate,
+                                  random_state=0)
+        assert np.allclose(p, expected)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012-2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+from pyannote import Annotation, Segment, Unknown
+from pyannote.metric.identification import IdentificationErrorRate, \
+    IdentificationPrecision, IdentificationRecall, \
+    IDMatcher, UnknownIDMatcher
+from pyannote.metric.diarization import DiarizationErrorRate
+from pyannote.metric.detection import DetectionErrorRate
+
+
+class SlowIDMatcher(IDMatcher):
+    """Same as IDMatcher, but goes through the segment by segment loop"""
+    pass
+
+
+class SlowUnknownIDMatcher(UnknownIDMatcher):
+    """Same as UnknownIDMatcher, but goes through the segment by segment loop"""
+    pass
+
+
+class test_metric_identification(object):
+
+    def setup(self):
+
+        np.random.seed(1337)
+
+        unknown = Unknown()
+        labels = ['A', 'B', 'C', 'D', unknown]
+
+        self.annotations = []
+        for _ in range(2):
+            annotation = Annotation()
+            for t in range(20):
+                start = np.round(100 * np.random.rand(), 1)
+                duration = np.round(10 * np.random.rand(), 1) + 0.1
+                label = labels[np.random.randint(len(labels))]
+                if np.random.rand() < 0.1:
+                    label = Unknown()
+                annotation[Segment(start, start + duration), t] = label
+            self.annotations.append(annotation)
+
+    def teardown(self):
+        pass
+
+    def _compare(self, metric, fast, slow):
+        reference, hypothesis = self.annotations
+        expected = metric(matcher=slow(), unknown=True)(
+            reference, hypothesis, detailed=True)
+        detail = metric(matcher=fast(), unknown=True)(
+            reference, hypothesis, detailed=True)
+        for key, value in expected.iteritems():
+            assert np.allclose(detail[key], value), key
+
+    def test_error_rate(self):
+        self._compare(IdentificationErrorRate, IDMatcher, SlowIDMatcher)
+        self._compare(IdentificationErrorRate,
+                      UnknownIDMatcher, SlowUnknownIDMatcher)
+
+    def test_precision(self):
+        self._compare(IdentificationPrecision, IDMatcher, SlowIDMatcher)
+        self._compare(IdentificationPrecision,
+                      UnknownIDMatcher, SlowUnknownIDMatcher)
+
+    def test_recall(self):
+        self._compare(IdentificationRecall, IDMatcher, SlowIDMatcher)
+        self._compare(IdentificationRecall,
+                      UnknownIDMatcher, SlowUnknownIDMatcher)
+
+    def test_frame_mode(self):
+        reference, hypothesis = self.annotations
+        n_tracks = len(list(reference.itertracks())) + \
+            len(list(hypothesis.itertracks()))
+        for metric in [IdentificationErrorRate, DiarizationErrorRate,
+                       DetectionErrorRate]:
+            expected = metric()(reference, hypothesis, detailed=True)
+            # track boundaries are multiples of 0.1s: no discrepancy
+            detail = metric(resolution=0.1)(
+                reference, hypothesis, detailed=True)
+            for key, value in expected.iteritems():
+                assert np.allclose(detail[key], value), key
+            # each track boundary is off by at most half a frame
+            resolution = 0.25
+            detail = metric(resolution=resolution)(
+                reference, hypothesis, detailed=True)
+            for key, value in expected.iteritems():
+                assert abs(detail[key] - value) <= n_tracks * resolution, key
+
+    def test_collar(self):
+        reference, hypothesis = self.annotations
+        detail = IdentificationErrorRate(resolution=0.1)(
+            reference, hypothesis, detailed=True)
+        collared = IdentificationErrorRate(resolution=0.1, collar=0.5)(
+            reference, hypothesis, detailed=True)
+        assert collared['total'] < detail['total']
+        assert collared['miss'] <= detail['miss']
+
+    def test_invalid_resolution(self):
+        for metric in [IdentificationErrorRate, DiarizationErrorRate,
+                       DetectionErrorRate]:
+            for kwargs in [{'resolution': 0.}, {'resolution': -0.1},
+                           {'collar': 0.5}]:
+                try:
+                    metric(**kwargs)
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError('%s accepted %s' % (metric, kwargs))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+from pyannote import Annotation, Segment, Unknown
+from pyannote.base.scores import Scores
+from pyannote.algorithm.clustering.hac.history import HACHistory
+from pyannote.metric.identification import IdentificationErrorRate, \
+    IDMatcher
+from pyannote.metric.diarization import DiarizationErrorRate
+from pyannote.metric.sweep import identification_sweep, clustering_sweep, \
+    get_rates
+
+
+class test_metric_sweep(object):
+
+    def setup(self):
+
+        np.random.seed(1337)
+
+        labels = ['A', 'B', 'C', 'D']
+
+        self.reference = Annotation(uri='uri')
+        for t in range(20):
+            start = np.round(100 * np.random.rand(), 1)
+            duration = np.round(10 * np.random.rand(), 1) + 0.1
+            label = labels[np.random.randint(len(labels))]
+            if np.random.rand() < 0.1:
+                label = Unknown()
+            self.reference[Segment(start, start + duration), t] = label
+
+        self.hypothesis = Annotation(uri='uri')
+        for t in range(20):
+            start = np.round(100 * np.random.rand(), 1)
+            duration = np.round(10 * np.random.rand(), 1) + 0.1
+            self.hypothesis[Segment(start, start + duration), t] = t
+
+        self.scores = Scores(uri='uri')
+        self.scores._df = pd.DataFrame(
+            np.random.rand(20, len(labels)), columns=labels,
+            index=pd.MultiIndex.from_tuples(
+                list(self.hypothesis.itertracks()),
+                names=['segment', 'track']))
+
+        # random HAC history
+        self.history = HACHistory(self.hypothesis)
+        clusters = range(20)
+        similarity = 1.
+        while len(clusters) > 1:
+            i, j = np.random.choice(len(clusters), size=2, replace=False)
+            merged = [clusters[i], clusters[j]]
+            clusters = [c for c in clusters if c not in merged]
+            new_cluster = 'c%d' % len(self.history)
+            clusters.append(new_cluster)
+            similarity -= np.random.rand() / 10.
+            self.history.add_iteration(merged, similarity, new_cluster)
+
+        self.thresholds = np.linspace(-1.5, 1.5, 31)
+
+    def teardown(self):
+        pass
+
+    def _compare(self, components, expected, metric):
+        rates = get_rates(components, metric=metric)
+        for i, detail in enumerate(expected):
+            for key in components:
+                assert np.allclose(components[key][i], detail[key]), key
+            assert np.allclose(rates[i], detail[metric.name])
+
+    def test_identification(self):
+        for metric in [IdentificationErrorRate(),
+                       IdentificationErrorRate(matcher=IDMatcher()),
+                       IdentificationErrorRate(unknown=False)]:
+            components = identification_sweep(
+                self.reference, self.scores, self.thresholds, metric=metric)
+            expected = [
+                metric(self.reference,
+                       self.scores.to_annotation(threshold=threshold),
+                       detailed=True)
+                for threshold in self.thresholds]
+            self._compare(components, expected, metric)
+
+    def test_clustering(self):
+        metric = DiarizationErrorRate()
+        components = clustering_sweep(
+            self.reference, self.history, self.thresholds, metric=metric)
+        similarity = [i.similarity for i in self.history.iterations]
+        expected = []
+        for threshold in self.thresholds:
+            below = [n for n, s in enumerate(similarity) if s < threshold]
+            n = below[0] if below else len(similarity)
+            expected.append(metric(self.reference, self.history[n],
+                                   detailed=True))
+        self._compare(components, expected, metric)
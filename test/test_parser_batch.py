@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+from pyannote import Annotation, Segment, Unknown
+from pyannote.parser.mdtm import MDTMParser
+from pyannote.parser.batch import read_all
+
+
+class test_parser_batch(object):
+
+    def setup(self):
+
+        self.tmp = tempfile.mkdtemp()
+        self.uris = ['uri%d' % i for i in range(5)]
+
+        self.annotations = []
+        for u, uri in enumerate(self.uris):
+            annotation = Annotation(uri=uri, modality='speaker')
+            annotation[Segment(0, 1), 0] = 'A'
+            annotation[Segment(1, 1 + u), 1] = 'B%d' % u
+            annotation[Segment(2, 3), 2] = Unknown()
+            MDTMParser().write(annotation,
+                               f=os.path.join(self.tmp, '%s.mdtm' % uri))
+            self.annotations.append(annotation)
+
+    def teardown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_read_all(self):
+
+        template = os.path.join(self.tmp, '[URI].mdtm')
+        for n_jobs in [1, 2]:
+            annotations = list(read_all(template, uris=self.uris,
+                                        modality='speaker',
+                                        n_jobs=n_jobs, in_flight=2))
+            assert [a.uri for a in annotations] == self.uris
+            for annotation, expected in zip(annotations, self.annotations):
+                assert annotation.labels(unknown=False) == \
+                    expected.labels(unknown=False)
+
+            # Unknown labels found in distinct files are distinct
+            unknowns = [l for a in annotations for l in a.labels()
+                        if isinstance(l, Unknown)]
+            assert len(set(unknowns)) == len(self.uris)
+
+    def test_read_all_interleaved(self):
+
+        template = os.path.join(self.tmp, '[URI].mdtm')
+        for n_jobs in [1, 2]:
+            speaker = read_all(template, uris=self.uris, modality='speaker',
+                               n_jobs=n_jobs)
+            head = read_all(template, uris=self.uris, modality='head',
+                            n_jobs=n_jobs)
+            for s, h, expected in zip(speaker, head, self.annotations):
+                assert s.modality == 'speaker'
+                assert s.labels(unknown=False) == \
+                    expected.labels(unknown=False)
+                assert h.modality == 'head'
+                assert h.labels() == []
+
+    def test_read_all_paths(self):
+        paths = [os.path.join(self.tmp, '%s.mdtm' % uri)
+                 for uri in reversed(self.uris)]
+        annotations = list(read_all(paths, n_jobs=2))
+        assert [a.uri for a in annotations] == self.uris[::-1]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import time
+import shutil
+import tempfile
+from pyannote import Annotation, Segment
+from pyannote.parser.mdtm import MDTMParser
+from pyannote.parser.pab import PABParser
+from pyannote.parser.annotation import AnnotationParser
+from pyannote.parser.timeline import TimelineParser
+from pyannote.parser.cache import ParseCache
+
+
+class test_parser_cache(object):
+
+    def setup(self):
+
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ParseCache(os.path.join(self.tmp, 'cache'))
+
+        self.paths = []
+        self.annotations = []
+        for u in range(3):
+            annotation = Annotation(uri='uri%d' % u, modality='speaker')
+            annotation[Segment(0, 1), 0] = 'A'
+            annotation[Segment(1, 2 + u), 1] = 'B'
+            path = os.path.join(self.tmp, 'uri%d.mdtm' % u)
+            MDTMParser().write(annotation, f=path)
+            self.paths.append(path)
+            self.annotations.append(annotation)
+
+    def teardown(self):
+        shutil.rmtree(self.tmp)
+
+    def _read(self, path):
+        parser = AnnotationParser(cache=self.cache).read(path)
+        return parser('uri0', 'speaker')
+
+    def _entries(self):
+        return sorted(os.listdir(self.cache.directory))
+
+    def test_hit(self):
+        path = self.paths[0]
+        first = self._read(path)
+        assert len(self._entries()) == 1
+
+        key = self.cache.key(path, MDTMParser, {'uri': None,
+                                                'modality': None})
+        assert isinstance(self.cache.get(key), PABParser)
+
+        second = self._read(path)
+        assert list(second.itertracks(label=True)) == \
+            list(first.itertracks(label=True))
+
+    def test_warm_cache_multiple_files(self):
+
+        uems = []
+        for u in range(2):
+            path = os.path.join(self.tmp, 'uri%d.uem' % u)
+            with open(path, 'w') as f:
+                f.write('uri%d 1 0.0 %d.0\n' % (u, u + 1))
+            uems.append(path)
+
+        def read(Parser, paths, cache=None):
+            parser = Parser(cache=cache)
+            for path in paths:
+                parser.read(path)
+            return parser
+
+        # no cache, cold cache, then warm cache: same results
+        expected = read(TimelineParser, uems)
+        assert expected.uris == ['uri0', 'uri1']
+        for _ in range(2):
+            parser = read(TimelineParser, uems, cache=self.cache)
+            assert parser.uris == expected.uris
+            for uri in expected.uris:
+                assert list(parser(uri=uri)) == list(expected(uri=uri))
+
+        expected = read(AnnotationParser, self.paths)
+        for _ in range(2):
+            parser = read(AnnotationParser, self.paths, cache=self.cache)
+            assert parser.uris == expected.uris
+            for uri in expected.uris:
+                assert list(parser(uri=uri).itertracks(label=True)) == \
+                    list(expected(uri=uri).itertracks(label=True))
+
+    def test_companion_file(self):
+        # files passed as options (e.g. XGTF .idx file) are part of the key
+        path, idx = self.paths[0], self.paths[1]
+        key = self.cache.key(path, MDTMParser, {'path_idx': idx})
+        mtime = time.time() + 10
+        os.utime(idx, (mtime, mtime))
+        assert self.cache.key(path, MDTMParser, {'path_idx': idx}) != key
+
+    def test_invalidation(self):
+        path = self.paths[0]
+        self._read(path)
+
+        annotation = Annotation(uri='uri0', modality='speaker')
+        annotation[Segment(0, 10), 0] = 'C'
+        MDTMParser().write(annotation, f=path)
+        os.utime(path, (time.time() + 10, time.time() + 10))
+
+        assert self._read(path).labels() == ['C']
+        assert len(self._entries()) == 2
+
+    def test_eviction(self):
+        for path in self.paths:
+            self._read(path)
+        sizes = [os.path.getsize(os.path.join(self.cache.directory, e))
+                 for e in self._entries()]
+
+        # only room left for the two most recently used entries
+        self.cache.max_size = (sum(sizes) - 1) / float(1 << 20)
+        self.cache._evict()
+        assert len(self._entries()) == 2
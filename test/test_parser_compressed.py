@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import gzip
+import bz2
+import shutil
+import struct
+import tempfile
+import numpy as np
+from pyannote import Segment
+from pyannote.parser.annotation import AnnotationParser
+from pyannote.parser.timeline import TimelineParser
+from pyannote.parser.plp import PLPParser
+from pyannote.parser.compressed import open_file, read_array, \
+    get_compression
+
+
+class test_parser_compressed(object):
+
+    def setup(self):
+
+        self.tmp = tempfile.mkdtemp()
+
+        with gzip.open(os.path.join(self.tmp, 'a.mdtm.gz'), 'wb') as f:
+            f.write('uri1 1 0.0 1.5 speaker NA unknown A\n')
+            f.write('uri1 1 3 1 speaker NA unknown B\n')
+
+        f = bz2.BZ2File(os.path.join(self.tmp, 'a.uem.bz2'), 'wb')
+        f.write(';; comment\n')
+        f.write('uri1 1 0.0 10.0\n')
+        f.close()
+
+        # two records of 3 and 2 feature vectors of dimension 4
+        self.data = np.arange(20, dtype='<f4').reshape((5, 4))
+        with gzip.open(os.path.join(self.tmp, 'a.plp'), 'wb') as f:
+            f.write(struct.pack('<iiii', 2, 4, 3, 2))
+            f.write(self.data.tostring())
+
+    def teardown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_open_file(self):
+        with open_file(os.path.join(self.tmp, 'a.mdtm.gz'),
+                       block_size=16) as f:
+            lines = list(f)
+        assert lines == ['uri1 1 0.0 1.5 speaker NA unknown A\n',
+                         'uri1 1 3 1 speaker NA unknown B\n']
+
+    def test_annotation(self):
+        parser = AnnotationParser().read(os.path.join(self.tmp, 'a.mdtm.gz'))
+        annotation = parser(uri='uri1', modality='speaker')
+        assert list(annotation.itertracks(label=True)) == [
+            (Segment(0, 1.5), 0, 'A'),
+            (Segment(3, 4), 1, 'B')]
+
+    def test_timeline(self):
+        parser = TimelineParser().read(os.path.join(self.tmp, 'a.uem.bz2'))
+        assert list(parser(uri='uri1')) == [Segment(0, 10)]
+
+    def test_periodic_feature(self):
+        feature = PLPParser().read(os.path.join(self.tmp, 'a.plp'))
+        assert np.array_equal(feature.data, self.data)
+
+    def test_plain_bzh(self):
+        # plain text file starting with bzip2 'BZh' magic
+        path = os.path.join(self.tmp, 'b.mdtm')
+        with open(path, 'w') as f:
+            f.write('BZh1 1 0.0 1.5 speaker NA unknown A\n')
+        assert get_compression(path) is None
+        parser = AnnotationParser().read(path)
+        assert parser(uri='BZh1', modality='speaker').labels() == ['A']
+
+    def test_multistream_bzip2(self):
+        data = np.arange(2000, dtype=np.float64)
+        first = bz2.compress(data[:1000].tostring())
+        path = os.path.join(self.tmp, 'b.bz2')
+        with open(path, 'wb') as f:
+            f.write(first)
+            f.write(bz2.compress(data[1000:].tostring()))
+        # including first stream ending right at the end of a block
+        for block_size in [100, len(first), 1 << 20]:
+            with open_file(path, block_size=block_size) as f:
+                assert np.array_equal(read_array(f, np.float64), data)
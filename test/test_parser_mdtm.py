@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+from pyannote import Annotation, Segment, Unknown
+from pyannote.parser.mdtm import MDTMParser
+from pyannote.parser.repere import REPEREParser
+from pyannote.parser.indexed import IndexedAnnotationParser, INDEX
+
+
+class test_parser_mdtm(object):
+
+    def setup(self):
+        _, self.path = tempfile.mkstemp(suffix='.mdtm')
+        with open(self.path, 'w') as f:
+            f.write(';; comment\n')
+            f.write('uri1 1 0.0 1.5 speaker NA unknown A\n')
+            f.write('uri1 1 1.0 2.25 speaker NA unknown NA\n')
+            f.write('uri1 1 3 1 speaker NA unknown 01\n')
+            f.write('uri2 1 0.5 1.5 head NA unknown Inconnu_3\n')
+
+    def teardown(self):
+        os.remove(self.path)
+        if os.path.exists(INDEX % self.path):
+            os.remove(INDEX % self.path)
+
+    def test_read(self):
+        parser = MDTMParser().read(self.path)
+        assert parser.uris == ['uri1', 'uri2']
+        assert parser.modalities == ['head', 'speaker']
+
+        annotation = parser(uri='uri1', modality='speaker')
+        # labels are read as raw strings
+        assert list(annotation.itertracks(label=True)) == [
+            (Segment(0, 1.5), 0, 'A'),
+            (Segment(1, 3.25), 1, 'NA'),
+            (Segment(3, 4), 2, '01')]
+
+        # missing (uri, modality) pairs lead to empty annotations
+        assert not parser(uri='uri1', modality='head')
+
+        annotation = parser(uri='uri2', modality='head')
+        assert isinstance(annotation.labels()[0], Unknown)
+
+    def test_from_arrays(self):
+        segments = [Segment(1, 2), Segment(0, 1), Segment(1, 2)]
+        tracks = ['a', 'b', 'a']
+        labels = ['A', 'B', 'C']
+        annotation = Annotation.from_arrays(segments, tracks, labels)
+        expected = Annotation()
+        for segment, track, label in zip(segments, tracks, labels):
+            expected[segment, track] = label
+        assert list(annotation.itertracks(label=True)) == \
+            list(expected.itertracks(label=True))
+        assert annotation.labels() == expected.labels() == ['B', 'C']
+        assert annotation.get_timeline() == expected.get_timeline()
+
+    def test_indexed(self):
+        parser = MDTMParser().read(self.path)
+        indexed = IndexedAnnotationParser(MDTMParser(), cache_size=1)
+        indexed.read(self.path)
+        assert os.path.exists(INDEX % self.path)
+        assert indexed.uris == parser.uris
+        assert indexed.modalities == parser.modalities
+        for uri in parser.uris:
+            for modality in parser.modalities:
+                expected = parser(uri=uri, modality=modality)
+                annotation = indexed(uri=uri, modality=modality)
+                assert annotation.uri == expected.uri
+                assert annotation.modality == expected.modality
+                # (Unknown instances are all different)
+                assert [(s, isinstance(l, Unknown) or l) for s, _, l in
+                        annotation.itertracks(label=True)] == \
+                    [(s, isinstance(l, Unknown) or l) for s, _, l in
+                     expected.itertracks(label=True)]
+        assert len(indexed._cache) == 1
+
+        # index is loaded from sidecar file
+        indexed = IndexedAnnotationParser(MDTMParser()).read(self.path)
+        assert indexed.uris == parser.uris
+
+    def test_indexed_non_ascii(self):
+        with open(self.path, 'w') as f:
+            f.write('\xc3\xa9t\xc3\xa9 1 0.0 1.5 speaker NA unknown A\n')
+            f.write('uri2 1 0.5 1.5 speaker NA unknown B\n')
+        parser = MDTMParser().read(self.path)
+        assert parser.uris == ['uri2', '\xc3\xa9t\xc3\xa9']
+        # fresh index, then index loaded from sidecar file
+        for _ in range(2):
+            indexed = IndexedAnnotationParser(MDTMParser()).read(self.path)
+            assert indexed.uris == parser.uris
+            annotation = indexed(uri='\xc3\xa9t\xc3\xa9', modality='speaker')
+            assert annotation.labels() == ['A']
+
+    def test_indexed_leading_whitespace(self):
+        with open(self.path, 'w') as f:
+            f.write('  uri1 0.0 1.5 speaker A\n')
+            f.write('\turi2 0.5 1.5 speaker B\n')
+        parser = REPEREParser().read(self.path)
+        indexed = IndexedAnnotationParser(REPEREParser()).read(self.path)
+        assert indexed.uris == parser.uris == ['uri1', 'uri2']
+        assert indexed(uri='uri2', modality='speaker').labels() == ['B']
+
+    def test_write_all(self):
+        parser = MDTMParser().read(self.path)
+        annotations = [parser(uri=uri, modality=modality)
+                       for uri in parser.uris
+                       for modality in parser.modalities]
+
+        # one annotation at a time
+        _, expected = tempfile.mkstemp(suffix='.mdtm')
+        with open(expected, 'w') as f:
+            for annotation in annotations:
+                parser.write(annotation, f=f)
+
+        # all at once, from a generator
+        _, path = tempfile.mkstemp(suffix='.mdtm')
+        parser.write_all((a for a in annotations), f=path, buffer_size=10)
+
+        with open(expected, 'r') as f, open(path, 'r') as g:
+            assert f.read() == g.read()
+
+        os.remove(expected)
+        os.remove(path)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pyannote import Annotation, Timeline, Segment, Unknown
+from pyannote.base.scores import Scores
+from pyannote.parser.pab import PABParser
+
+
+class test_parser_pab(object):
+
+    def setup(self):
+
+        unknown = Unknown()
+
+        self.annotation = Annotation(uri='uri1', modality='speaker')
+        self.annotation[Segment(0, 1.5), 0] = 'A'
+        self.annotation[Segment(0, 1.5), 'b'] = unknown
+        self.annotation[Segment(1, 3.25), 1] = u'\xe9'
+        self.annotation[Segment(3, 4), 2] = unknown
+        self.annotation[Segment(3, 4), 3] = 7
+
+        self.timeline = Timeline([Segment(0, 1), Segment(2, 3.5)],
+                                 uri='uri2')
+
+        self.scores = Scores(uri='uri1', modality='head')
+        self.scores._df = pd.DataFrame(
+            [[0.1, np.nan], [0.3, 0.4]], columns=['A', unknown],
+            index=pd.MultiIndex.from_tuples(
+                [(Segment(0, 1), 0), (Segment(1, 2), 'x')],
+                names=['segment', 'track']))
+
+        _, self.path = tempfile.mkstemp(suffix='.pab')
+
+    def teardown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_roundtrip(self):
+
+        PABParser().write_all(
+            (o for o in [self.annotation, self.timeline, self.scores]),
+            self.path)
+
+        parser = PABParser().read(self.path)
+        assert parser.uris == ['uri1', 'uri2']
+
+        annotation = parser(uri='uri1', modality='speaker')
+        assert annotation.uri == 'uri1'
+        assert annotation.modality == 'speaker'
+        tracks = list(annotation.itertracks(label=True))
+        expected = list(self.annotation.itertracks(label=True))
+        assert [(s, t) for s, t, _ in tracks] == \
+            [(s, t) for s, t, _ in expected]
+        assert [l for _, _, l in tracks if not isinstance(l, Unknown)] == \
+            ['A', u'\xe9', 7]
+        # the same Unknown instance is decoded as the same Unknown instance
+        unknowns = [l for _, _, l in tracks if isinstance(l, Unknown)]
+        assert len(unknowns) == 2 and unknowns[0] == unknowns[1]
+
+        timeline = parser(uri='uri2')
+        assert timeline.uri == 'uri2'
+        assert list(timeline) == list(self.timeline)
+
+        scores = parser(uri='uri1', modality='head')
+        assert list(scores._df.index) == list(self.scores._df.index)
+        assert scores._df.columns[0] == 'A'
+        assert isinstance(scores._df.columns[1], Unknown)
+        assert np.allclose(scores._df.values, self.scores._df.values,
+                           equal_nan=True)
+
+        # objects are built once
+        assert parser(uri='uri2') is timeline
+
+    def test_latin1(self):
+        annotation = Annotation(uri='\xe9t\xe9', modality='speaker')
+        annotation[Segment(0, 1), 'pr\xe9sentateur'] = 'Fran\xe7ois'
+        annotation[Segment(1, 2), 'b'] = 'caf\xc3\xa9'
+        PABParser().write(annotation, self.path)
+        parser = PABParser().read(self.path)
+        assert parser.uris == ['\xe9t\xe9']
+        assert list(parser(uri='\xe9t\xe9').itertracks(label=True)) == \
+            list(annotation.itertracks(label=True))
+
+    def test_duplicate(self):
+        annotation = Annotation(uri='uri2')
+        try:
+            PABParser().write_all([self.timeline, annotation], self.path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('duplicate (uri, modality) was not detected')
+        assert not os.path.exists(self.path)
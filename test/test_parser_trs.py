@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+from pyannote import Segment
+from pyannote.parser.trs import TRSParser
+
+TRS = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<Trans audio_filename="show" version="1">
+<Speakers>
+<Speaker id="spk1" name="Alice" type="female"/>
+<Speaker id="spk2" name="Bob" type="male"/>
+</Speakers>
+<Episode>
+<Section type="report" startTime="0" endTime="10">
+<Turn speaker="spk1" startTime="0" endTime="4">
+<Sync time="0"/>hello
+</Turn>
+<Turn speaker="spk1 spk2" startTime="4" endTime="10">
+<Sync time="4"/>
+</Turn>
+</Section>
+<Section type="nontrans" startTime="10" endTime="12">
+<Turn startTime="10" endTime="12"></Turn>
+</Section>
+</Episode>
+</Trans>
+"""
+
+
+class test_parser_trs(object):
+
+    def setup(self):
+        _, self.path = tempfile.mkstemp(suffix='.trs')
+        with open(self.path, 'w') as f:
+            f.write(TRS)
+
+    def teardown(self):
+        os.remove(self.path)
+
+    def test_read(self):
+        parser = TRSParser().read(self.path)
+        assert parser.uris == ['show']
+
+        speaker = parser(uri='show', modality='speaker')
+        assert list(speaker.itertracks(label=True)) == [
+            (Segment(0, 4), 0, 'Alice'),
+            (Segment(4, 10), 1, 'Alice'),
+            (Segment(4, 10), 2, 'Bob')]
+
+        status = parser(uri='show', modality='status')
+        assert sorted(status.labels()) == ['nontrans', 'report']
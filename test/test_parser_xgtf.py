@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+from pyannote import Segment
+from pyannote.parser.xgtf import XGTFParser
+
+XGTF = """<?xml version="1.0" encoding="UTF-8"?>
+<viper xmlns="http://lamp.cfar.umd.edu/viper#"
+       xmlns:data="http://lamp.cfar.umd.edu/viperdata#">
+<config>
+<descriptor name="PERSONNE" type="OBJECT">
+<attribute dynamic="false" name="NOM" type="http://lamp.cfar.umd.edu/viperdata#svalue"/>
+</descriptor>
+</config>
+<data>
+<sourcefile filename="show.mpg">
+<file id="0" name="Information">
+<attribute name="NUMFRAMES"><data:dvalue value="100"/></attribute>
+</file>
+<object framespan="25:25" id="0" name="PERSONNE">
+<attribute name="STARTFRAME"><data:dvalue value="25"/></attribute>
+<attribute name="ENDFRAME"><data:dvalue value="75"/></attribute>
+<attribute name="NOM"><data:svalue value="Alice"/></attribute>
+</object>
+<object framespan="50:50" id="1" name="PERSONNE">
+<attribute name="STARTFRAME"><data:dvalue value="50"/></attribute>
+<attribute name="ENDFRAME"><data:dvalue value="100"/></attribute>
+<attribute name="NOM"><data:svalue value="Bob"/></attribute>
+</object>
+<object framespan="100:100" id="2" name="OTHER">
+<attribute name="NOM"><data:svalue value="Carol"/></attribute>
+</object>
+</sourcefile>
+<sourcefile filename="other.mpg">
+<object framespan="50:50" id="0" name="PERSONNE">
+<attribute name="STARTFRAME"><data:dvalue value="0"/></attribute>
+<attribute name="ENDFRAME"><data:dvalue value="25"/></attribute>
+<attribute name="NOM"><data:svalue value="Dave"/></attribute>
+</object>
+</sourcefile>
+</data>
+</viper>
+"""
+
+# one frame every second
+IDX = """0 I 0 0.0
+25 P 1000 1.0
+50 P 2000 2.0
+75 P 3000 3.0
+100 P 4000 4.0
+"""
+
+
+class test_parser_xgtf(object):
+
+    def setup(self):
+        self.tmp = tempfile.mkdtemp()
+        self.xgtf = os.path.join(self.tmp, 'show.xgtf')
+        with open(self.xgtf, 'w') as f:
+            f.write(XGTF)
+        self.idx = os.path.join(self.tmp, 'show.idx')
+        with open(self.idx, 'w') as f:
+            f.write(IDX)
+
+    def teardown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_read(self):
+        parser = XGTFParser().read(self.xgtf, path_idx=self.idx)
+
+        # only the first sourcefile is parsed
+        assert parser.uris == ['show.mpg']
+        assert parser.modalities == ['annotated', 'head']
+
+        head = parser(uri='show.mpg', modality='head')
+        assert sorted((s, l) for s, _, l in head.itertracks(label=True)) == \
+            [(Segment(1, 3), 'Alice'), (Segment(2, 4), 'Bob')]
+
+        # one frame per object (the 'file' element has no framespan
+        # and leads to an empty segment)
+        annotated = parser(uri='show.mpg', modality='annotated')
+        assert [s for s, _ in annotated.itertracks() if s] == [
+            Segment(0.5, 1.5), Segment(1.5, 2.5), Segment(3.5, 4.5)]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012-2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np
+from pyannote.stats.llr import llr2posterior
+
+
+class test_stats_llr(object):
+
+    def setup(self):
+        self.llr = np.array([[0., 1., -1.],
+                             [2., np.nan, 0.],
+                             [800., 790., -np.inf]])
+        self.priors = np.array([0.2, 0.3, 0.1])
+
+    def teardown(self):
+        pass
+
+    def _naive(self, llr, priors, unknown_prior):
+        numerator = priors * np.exp(llr)
+        numerator[np.isnan(numerator)] = 0.
+        denominator = unknown_prior + np.sum(numerator, axis=1)
+        return (numerator.T / denominator).T
+
+    def test_close_set(self):
+        posterior = llr2posterior(self.llr[:2], self.priors)
+        expected = self._naive(self.llr[:2], self.priors, 0.)
+        expected[1, 1] = np.nan
+        assert np.allclose(posterior, expected, equal_nan=True)
+        assert np.allclose(np.nansum(posterior, axis=1), 1.)
+
+    def test_open_set(self):
+        posterior = llr2posterior(self.llr[:2], self.priors,
+                                  unknown_prior=0.4)
+        expected = self._naive(self.llr[:2], self.priors, 0.4)
+        expected[1, 1] = np.nan
+        assert np.allclose(posterior, expected, equal_nan=True)
+        assert np.all(np.nansum(posterior, axis=1) < 1.)
+
+    def test_overflow(self):
+        posterior = llr2posterior(self.llr[2:], self.priors,
+                                  unknown_prior=0.4)
+        assert np.all(np.isfinite(posterior))
+        assert np.isclose(np.sum(posterior), 1.)
+        assert posterior[0, 2] == 0.
+
+    def test_in_place(self):
+        llr = np.array(self.llr)
+        posterior = llr2posterior(llr, self.priors, out=llr)
+        assert posterior is llr
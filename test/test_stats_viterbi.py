@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright 2012-2013 Herve BREDIN (bredin@limsi.fr)
+
+# This file is part of PyAnnote.
+#
+#     PyAnnote is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     PyAnnote is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with PyAnnote.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import numpy as np
+from pyannote.stats.viterbi import viterbi_decoding
+
+
+class test_stats_viterbi(object):
+
+    def setup(self):
+        np.random.seed(1337)
+        self.emission = np.log(np.random.rand(8, 3))
+        self.transition = np.log(np.random.dirichlet(np.ones(3), size=3))
+        self.initial = np.log(np.random.dirichlet(np.ones(3)))
+
+    def teardown(self):
+        pass
+
+    def _durations(self, sequence):
+        """Durations of all but the last run of identical states"""
+        changes = np.where(np.diff(sequence))[0]
+        bounds = np.hstack([[0], changes + 1])
+        return sequence[bounds[:-1]], np.diff(bounds)
+
+    def _brute_force(self, min_duration):
+        best, best_score = None, -np.inf
+        T, K = self.emission.shape
+        for sequence in itertools.product(range(K), repeat=T):
+            sequence = np.array(sequence)
+            states, durations = self._durations(sequence)
+            if np.any(durations < np.asarray(min_duration)[states]):
+                continue
+            # the first min_duration - 1 self-transitions of each run
+            # are forced (hence free) in the expanded state space
+            transition = self.transition[sequence[:-1], sequence[1:]]
+            run = np.zeros((T, ), dtype=int)
+            for t in range(1, T):
+                if sequence[t] == sequence[t-1]:
+                    run[t] = run[t-1] + 1
+            forced = run[1:] < np.asarray(min_duration)[sequence[1:]]
+            transition[forced & (run[1:] > 0)] = 0.
+            score = self.initial[sequence[0]] + \
+                np.sum(self.emission[np.arange(T), sequence]) + \
+                np.sum(transition)
+            if score > best_score:
+                best, best_score = sequence, score
+        return best
+
+    def test_no_constraint(self):
+        sequence = viterbi_decoding(self.emission, self.transition,
+                                    initial=self.initial)
+        expected = self._brute_force(np.ones(3, dtype=int))
+        assert np.all(sequence == expected)
+
+    def test_min_duration(self):
+        min_duration = np.array([3, 1, 2])
+        sequence = viterbi_decoding(self.emission, self.transition,
+                                    initial=self.initial,
+                                    min_duration=min_duration)
+        expected = self._brute_force(min_duration)
+        assert np.all(sequence == expected)